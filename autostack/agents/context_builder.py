@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@Time: 2026/10/18
+@Author: zhengyu
+@File: context_builder
+@Desc 在 token 预算内组装已完成任务的上下文，供 perform_task / tasks_subdivision 使用
+"""
+
+import json
+import os
+import re
+from collections import defaultdict
+from typing import Callable, Optional
+from autostack.common.logs import logger
+from autostack.llm import Task, Action, ActionType
+from autostack.llm.token_counter import count_message_tokens, count_string_tokens
+
+DEFAULT_CONTEXT_TOKEN_BUDGET = 8000
+WORD_PATTERN = re.compile(r"[a-zA-Z_][a-zA-Z0-9_]+|[一-鿿]")
+
+
+class ContextBuilder:
+    """
+    上下文组装器
+    每个已完成任务有三种表示：完整（全部 Action）、压缩（截断 Action 内容）、仅任务描述。
+    最近的任务和与当前任务相关的任务优先保留完整表示，放不下时依次降级，仍放不下则丢弃。
+    """
+
+    def __init__(self, token_budget: Optional[int] = None, model: str = "gpt-4o", keep_recent: int = 2,
+                 max_action_chars: int = 1000, count_tokens: Optional[Callable[[str], int]] = None):
+        """
+        :param token_budget: 上下文的 token 预算，默认读取环境变量 LLM_CONTEXT_TOKEN_BUDGET
+        :param model: 用于计算 token 的模型
+        :param keep_recent: 优先保留完整内容的最近任务数
+        :param max_action_chars: 压缩表示中每个 Action 保留的最大字符数
+        :param count_tokens: 自定义 token 计数函数，默认使用 count_message_tokens
+        """
+        self.token_budget = token_budget or int(os.getenv("LLM_CONTEXT_TOKEN_BUDGET", DEFAULT_CONTEXT_TOKEN_BUDGET))
+        self.model = model
+        self.keep_recent = keep_recent
+        self.max_action_chars = max_action_chars
+        self._count_tokens = count_tokens
+        # 每个阶段累计丢弃的 token 数
+        self.dropped_tokens: dict[str, int] = defaultdict(int)
+
+    def count_tokens(self, text: str) -> int:
+        if self._count_tokens:
+            return self._count_tokens(text)
+        message = [{"role": "user", "content": text}]
+        try:
+            return count_message_tokens(message, self.model)
+        except NotImplementedError:
+            return count_message_tokens(message, "open-llm-model")
+
+    def build(self, tasks: list[Task], query: str = "", stage: str = "default") -> str:
+        """
+        组装上下文
+        :param tasks: 已完成的任务，按完成顺序排列
+        :param query: 当前任务描述，用于计算任务的相关性
+        :param stage: 阶段名称，用于统计丢弃的 token 数
+        :return: json 格式的任务执行记录
+        """
+        # 预检查：近似计数（通常偏高）在预算内时直接返回完整内容，不必逐个任务编码计数
+        if self._count_tokens is None:
+            full_context = json.dumps([task.to_dict() for task in tasks], indent=4, ensure_ascii=False)
+            if count_string_tokens(full_context, self.model, approximate=True) <= self.token_budget:
+                self.dropped_tokens.setdefault(stage, 0)
+                return full_context
+
+        query_words = self._words(query)
+        recent_start = len(tasks) - self.keep_recent
+        # 优先级：最近的任务 > 相关性高的任务 > 较新的任务
+        order = sorted(
+            range(len(tasks)),
+            key=lambda i: (i >= recent_start, self._relevance(tasks[i], query_words), i),
+            reverse=True
+        )
+
+        remaining = self.token_budget
+        chosen: dict[int, dict] = {}
+        # 各种表示被采用的任务数：完整、压缩、仅描述、丢弃
+        levels = [0, 0, 0, 0]
+        full_tokens_total = 0
+        used_tokens = 0
+        for i in order:
+            task = tasks[i]
+            representations = (task.to_dict, lambda: self._compact(task), task.get_task_desc)
+            full_tokens = None
+            for level, representation in enumerate(representations):
+                content = representation()
+                # 按最终输出中列表元素的缩进格式计数
+                tokens = self.count_tokens(json.dumps([content], indent=4, ensure_ascii=False))
+                full_tokens = tokens if full_tokens is None else full_tokens
+                if tokens <= remaining:
+                    chosen[i] = content
+                    remaining -= tokens
+                    used_tokens += tokens
+                    levels[level] += 1
+                    break
+            else:
+                levels[3] += 1
+            full_tokens_total += full_tokens
+
+        dropped = full_tokens_total - used_tokens
+        self.dropped_tokens[stage] += dropped
+        logger.info(
+            f"[{stage}] 上下文 {used_tokens}/{self.token_budget} tokens，任务 完整 {levels[0]} / 压缩 {levels[1]} / "
+            f"仅描述 {levels[2]} / 丢弃 {levels[3]}，丢弃 {dropped} tokens"
+        )
+        return json.dumps([chosen[i] for i in sorted(chosen)], indent=4, ensure_ascii=False)
+
+    def _compact(self, task: Task) -> dict:
+        """压缩表示：保留文件内容的开头和命令输出的结尾"""
+        task_dict = task.to_dict()
+        task_dict["result"] = [self._compact_action(action) for action in task.result or []]
+        return task_dict
+
+    def _compact_action(self, action: Action) -> dict:
+        action_dict = action.to_dict()
+        limit = self.max_action_chars
+        if action.type == ActionType.FILE and len(action.content) > limit:
+            action_dict["content"] = action.content[:limit] + f"\n...(省略 {len(action.content) - limit} 字符)"
+        if action.type == ActionType.COMMAND and action.result and len(action.result) > limit:
+            # 命令输出的错误信息通常在结尾
+            action_dict["result"] = f"(省略 {len(action.result) - limit} 字符)...\n" + action.result[-limit:]
+        return action_dict
+
+    @staticmethod
+    def _words(text: str) -> set[str]:
+        return {word.lower() for word in WORD_PATTERN.findall(text or "")}
+
+    def _relevance(self, task: Task, query_words: set[str]) -> float:
+        if not query_words:
+            return 0.0
+        return len(query_words & self._words(task.task_desc)) / len(query_words)
+
+    def report(self) -> dict[str, int]:
+        """返回每个阶段累计丢弃的 token 数"""
+        return dict(self.dropped_tokens)
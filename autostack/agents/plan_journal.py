@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+@Time: 2026/10/18
+@Author: zhengyu
+@File: plan_journal
+@Desc 计划的事件日志：每次变更追加一行 json，定期写入快照并清空日志，加载时回放快照之后的事件
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Optional, Union
+from autostack.common.logs import logger
+from autostack.llm import Action, Plan, Task
+
+JOURNAL_FILE = "plan_journal.jsonl"
+SNAPSHOT_FILE = "plan_snapshot.json"
+DEFAULT_SNAPSHOT_EVERY = 50
+
+
+class PlanJournal:
+    """
+    计划事件日志
+    事件类型：
+        goal         设置目标，开始新的计划
+        add_tasks    添加任务
+        task_result  记录任务的执行结果
+        finish_task  完成任务
+    每个事件带有递增的 seq，快照记录已包含的最大 seq，回放时跳过快照之前的事件。
+    每次追加后 fsync，进程崩溃最多丢失正在写入的一个事件。
+    """
+
+    def __init__(self, directory: Union[Path, str], snapshot_every: int = DEFAULT_SNAPSHOT_EVERY):
+        self.directory = Path(directory)
+        self.journal_path = self.directory / JOURNAL_FILE
+        self.snapshot_path = self.directory / SNAPSHOT_FILE
+        self.snapshot_every = snapshot_every
+        self.seq = 0
+        self._since_snapshot = 0
+        self._lock = threading.Lock()
+
+    def exists(self) -> bool:
+        return self.journal_path.exists() or self.snapshot_path.exists()
+
+    def reset(self):
+        """开始新的计划，删除旧的日志和快照"""
+        with self._lock:
+            for path in (self.journal_path, self.snapshot_path):
+                if path.exists():
+                    path.unlink()
+            self.seq = 0
+            self._since_snapshot = 0
+
+    def append(self, event: str, **data) -> int:
+        with self._lock:
+            self.seq += 1
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"seq": self.seq, "event": event, **data}, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._since_snapshot += 1
+            return self.seq
+
+    def should_snapshot(self) -> bool:
+        return self._since_snapshot >= self.snapshot_every
+
+    def record_goal(self, goal: str):
+        self.append("goal", goal=goal)
+
+    def record_tasks(self, tasks: list[Task]):
+        self.append("add_tasks", tasks=[task.model_dump(mode="json") for task in tasks])
+
+    def record_task_result(self, task: Task):
+        self.append("task_result", task_id=task.task_id,
+                    result=[action.model_dump(mode="json") for action in task.result or []])
+
+    def record_finish(self, task_id: str):
+        self.append("finish_task", task_id=task_id)
+
+    def snapshot(self, plan: Plan):
+        """写入快照并清空日志，快照先写临时文件再替换，任何时刻崩溃都能恢复"""
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp = self.snapshot_path.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"seq": self.seq, "plan": plan.model_dump(mode="json")}, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.snapshot_path)
+            # 快照已包含全部事件，清空日志
+            open(self.journal_path, "w").close()
+            self._since_snapshot = 0
+
+    def load(self) -> Optional[Plan]:
+        """从快照和日志恢复计划，没有记录时返回 None"""
+        plan, seq = None, 0
+        if self.snapshot_path.exists():
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            plan, seq = Plan(**snapshot["plan"]), snapshot["seq"]
+        replayed = 0
+        if self.journal_path.exists():
+            valid_size = 0  # 最后一个完整事件结束的位置
+            with open(self.journal_path, "rb") as f:
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("missing newline")
+                        event = json.loads(line)
+                    except ValueError:
+                        # 崩溃时写了一半的最后一行
+                        logger.warning(f"忽略不完整的计划事件: {line[:100].decode('utf-8', 'replace')}")
+                        break
+                    valid_size += len(line)
+                    if event["seq"] <= seq:
+                        continue
+                    plan = self.apply(plan, event)
+                    seq = event["seq"]
+                    replayed += 1
+            # 截掉不完整的部分，否则之后追加的事件会接在这一行后面，一起被当作不完整的行丢弃
+            if valid_size < self.journal_path.stat().st_size:
+                with open(self.journal_path, "r+b") as f:
+                    f.truncate(valid_size)
+                    f.flush()
+                    os.fsync(f.fileno())
+        self.seq = seq
+        self._since_snapshot = replayed
+        if plan:
+            logger.info(f"计划已恢复：{len(plan.tasks)} 个任务，回放 {replayed} 个事件")
+        return plan
+
+    @staticmethod
+    def apply(plan: Optional[Plan], event: dict) -> Optional[Plan]:
+        """将一个事件应用到计划上"""
+        kind = event["event"]
+        if kind == "goal":
+            return Plan(goal=event["goal"])
+        if plan is None:
+            logger.warning(f"计划不存在，忽略事件: {kind}")
+            return plan
+        if kind == "add_tasks":
+            plan.add_tasks([Task(**task) for task in event["tasks"]])
+        elif kind == "task_result":
+            task = plan.get_task(event["task_id"])
+            if task:
+                task.result = [Action(**action) for action in event["result"]]
+        elif kind == "finish_task":
+            task = plan.get_task(event["task_id"])
+            if task:
+                task.is_finished = True
+                plan._update_current_task()
+        return plan
@@ -14,6 +14,8 @@ import pickle
 from autostack.common.logs import logger
 from typing import List, Union, Optional
 from .base_agent import BaseAgent
+from .context_builder import ContextBuilder
+from .plan_journal import PlanJournal
 from autostack.llm import Message, Plan, Task
 from autostack.project import Project
 from autostack.utils import PromptUtil, MarkdownUtil
@@ -21,9 +23,18 @@ from autostack.utils import PromptUtil, MarkdownUtil
 
 class Planner:
 
-    def __init__(self, agent: BaseAgent):
+    def __init__(self, agent: BaseAgent, context_budget: Optional[int] = None):
         self.plan: Optional[Plan] = None
         self.agent = agent
+        self.context_builder = ContextBuilder(token_budget=context_budget, model=agent.llm.model)
+        self._journal: Optional[PlanJournal] = None
+
+    @property
+    def journal(self) -> PlanJournal:
+        """计划事件日志，保存在项目的 resources 目录下（agent.project 在 Planner 创建之后才设置）"""
+        if self._journal is None:
+            self._journal = PlanJournal(self.agent.project.resources)
+        return self._journal
 
     @property
     def current_task_id(self):
@@ -40,10 +51,12 @@ class Planner:
         :param goal: 计划的目标
         """
         self.plan = Plan(goal=goal)
+        self.journal.reset()
+        self.journal.record_goal(goal)
         self._split_plan()
 
     def update_plan(self, max_tasks: int = 5, max_retries: int = 3):
-        context = self.get_useful_memories()
+        context = self.get_useful_memories(stage="tasks_subdivision")
         self._split_plan(context=context, max_tasks=max_tasks)
 
     def _split_plan(self, context: str = "", max_tasks: int = 7):
@@ -59,11 +72,12 @@ class Planner:
             "existing_tasks": unfinished_tasks_str
         })
 
-        tasks_str_json = self.agent.llm.completion(subdivide_plan_prompt)
+        tasks_str_json = self.agent.llm.completion(subdivide_plan_prompt, stage="tasks_subdivision")
         tasks_str = MarkdownUtil.parse_code_block(tasks_str_json, "json")
         tmp_tasks = json.loads(tasks_str[0])
         tasks = [Task(**task) for task in tmp_tasks]
         self.plan.add_tasks(tasks)
+        self.journal.record_tasks(tasks)
 
     def process_task_result(self, task_result):
         """
@@ -94,22 +108,31 @@ class Planner:
             "task_result": self.current_task.result
         })
 
-        res = self.agent.llm.completion(prompt)
+        res = self.agent.llm.completion(prompt, stage="task_is_success")
         return res
 
     def confirm_task(self):
         """ 确认任务 """
+        task_id = self.current_task_id
         self.current_task.is_finished = True
 
         self.plan.finish_current_task()
+        self.journal.record_finish(task_id)
+        if self.journal.should_snapshot():
+            self.save()
 
-    def get_useful_memories(self) -> str:
-        """返回有用的记忆，目前即是返回任务的执行记录"""
-
-        finished_tasks_dict = [task.to_dict() for task in self.plan.get_finished_tasks()]
-        finished_tasks_memories = json.dumps(finished_tasks_dict, indent=4, ensure_ascii=False)
+    def record_task_result(self, task: Task):
+        """记录任务的执行结果"""
+        self.journal.record_task_result(task)
 
-        return finished_tasks_memories
+    def get_useful_memories(self, stage: str = "default") -> str:
+        """
+        返回有用的记忆，目前即是返回任务的执行记录
+        记录按 token 预算裁剪，最近的和与当前任务相关的任务优先保留完整内容
+        :param stage: 调用阶段，用于统计各阶段丢弃的 token 数
+        """
+        query = self.current_task.task_desc if self.current_task else ""
+        return self.context_builder.build(self.plan.get_finished_tasks(), query=query, stage=stage)
 
     def get_plan_status(self) -> str:
         """
@@ -144,13 +167,28 @@ class Planner:
         return prompt
 
     def save(self):
-        with open(self.agent.project.resources / "plan.json", 'wb') as f:
-            pickle.dump(self, f)
+        """写入计划快照并清空事件日志"""
+        self.journal.snapshot(self.plan)
+
+    def restore(self) -> bool:
+        """从事件日志恢复计划，没有记录时返回 False"""
+        plan = self.journal.load()
+        if plan is None:
+            return False
+        self.plan = plan
+        return True
 
     @staticmethod
-    def load(project_resources_path):
-        """从文件加载planner的内容"""
+    def load(project_resources_path, agent: BaseAgent = None):
+        """
+        从文件加载planner的内容
+        优先从事件日志恢复（需要 agent），没有事件日志时读取旧版本 pickle 格式的 plan.json
+        """
+        if agent is not None and PlanJournal(project_resources_path).exists():
+            planner = Planner(agent)
+            planner._journal = PlanJournal(project_resources_path)
+            planner.restore()
+            return planner
         filepath = project_resources_path / "plan.json"
         with open(filepath, 'rb') as f:
             return pickle.load(f)
-
@@ -7,11 +7,17 @@
 @Desc zhengyu 2024/12/13 13:54. + cause
 """
 
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
 from .base_agent import BaseAgent
 from autostack.common.const import CONTAINER_WORKDIR
-from autostack.llm import Task, LLM, Action, ActionType
+from autostack.common.logs import logger
+from autostack.llm import Task, LLM, Action, ActionType, BudgetExceededError
 from autostack.project import Project
-from autostack.utils import PromptUtil, parse_bolt_artifacts, FileUtil, PathUtil, DockerUtil
+from autostack.utils import PromptUtil, parse_bolt_artifacts, BoltArtifactStreamParser, FileUtil, PathUtil
+from autostack.container import ContainerRegistry
 
 COMPOSE_GOAL = """
 根据需求文档和设计好的数据库设计文档，使用nestjs和prisma，postgresql为我实现这个项目。
@@ -27,7 +33,7 @@ COMPOSE_GOAL = """
 
 
 class Programmer(BaseAgent):
-    def __init__(self, tools, project: Project, verbose=False, max_iter=10):
+    def __init__(self, tools, project: Project, verbose=False, max_iter=10, stream=False):
         # 调用父类的构造方法
         llm = LLM(
             system_prompt=PromptUtil.prompt_handle("programmer_system_prompt.prompt")
@@ -35,20 +41,37 @@ class Programmer(BaseAgent):
         super().__init__(tools, llm, verbose, max_iter)
 
         self.project = project
-        self.container = DockerUtil(self.project.root)
+        # 与 main 共用项目的容器，容器中的 CONTAINER_WORKDIR 对应 project_home
+        self.container = ContainerRegistry.get(self.project.project_home)
+        # 流式模式下，每个 boltAction 闭合后立即执行，文件写入和命令执行与 LLM 生成重叠
+        self.stream = stream
 
-    def run(self):
+    def run(self, resume: bool = False):
         """
         根据已有项目信息进行任务的开发
+        :param resume: 是否从上次保存的计划继续执行，没有保存的计划时重新规划
         """
-        # 首先根据这个任务进行任务分析，细化一个可执行的任务列表
-        goal = COMPOSE_GOAL.format(
-            requirement_doc=self.project.requirement_doc,
-            database_design_doc=self.project.database_design_doc
-        )
-        self.planner.set_goal(goal=goal)
+        # 每次 LLM 调用前都会检查预算，超出预算可能发生在规划、执行或更新计划的任意一步
+        try:
+            self._run(resume)
+        except BudgetExceededError as e:
+            logger.error(f"LLM 花费超出预算，停止执行任务：{e}")
+
+    def _run(self, resume: bool):
+        if not (resume and self.planner.restore()):
+            # 首先根据这个任务进行任务分析，细化一个可执行的任务列表
+            goal = COMPOSE_GOAL.format(
+                requirement_doc=self.project.requirement_doc,
+                database_design_doc=self.project.database_design_doc
+            )
+            self.planner.set_goal(goal=goal)
         # 开始执行任务列表的任务
         while self.planner.current_task:
+            if resume and self._is_task_on_disk(self.planner.current_task):
+                # 上次已执行完但没来得及确认的任务，文件都已写入，不再重复调用 LLM
+                logger.info(f"任务已完成，跳过：{self.planner.current_task.task_desc}")
+                self.planner.confirm_task()
+                continue
             # 执行计划器的当前任务
             self.perform_task()
             # 确认任务是否完成
@@ -64,39 +87,78 @@ class Programmer(BaseAgent):
         code_generate_prompt = PromptUtil.prompt_handle("perform_task.prompt", {
             "task_desc": self.planner.current_task.task_desc,
             "cwd": CONTAINER_WORKDIR,
-            "context": self.planner.plan.goal + '\n\n' + self.planner.get_useful_memories(),
+            "context": self.planner.plan.goal + '\n\n' + self.planner.get_useful_memories(stage="perform_task"),
         })
-        res = self.llm.completion(code_generate_prompt)
-        bolt_artifacts = parse_bolt_artifacts(res)
-        task_actions: list[Action] = []
-        for bolt_artifact in bolt_artifacts:
-            bolt_actions = bolt_artifact.get("boltActions")
-            for bolt_action in bolt_actions:
-                if bolt_action.get("type") == "file":
-                    filepath = bolt_action.get("filepath")
+        if self.stream:
+            task_actions = self._perform_actions_stream(code_generate_prompt)
+        else:
+            res = self.llm.completion(code_generate_prompt, stage="perform_task")
+            bolt_artifacts = parse_bolt_artifacts(res)
+            task_actions: list[Action] = []
+            for bolt_artifact in bolt_artifacts:
+                for bolt_action in bolt_artifact.get("boltActions"):
+                    action = self._perform_action(bolt_action)
+                    if action:
+                        task_actions.append(action)
+        self.planner.current_task.result = task_actions
+        self.planner.record_task_result(self.planner.current_task)
+
+    @staticmethod
+    def _is_task_on_disk(task: Task) -> bool:
+        """任务已记录执行结果，并且其中的文件都已按相同内容写入"""
+        if not task.result:
+            return False
+        for action in task.result:
+            if action.type != ActionType.FILE:
+                continue
+            path = Path(action.path) if action.path else None
+            if not path or not path.is_file() or not action.content_hash:
+                return False
+            if hashlib.sha256(path.read_text(encoding="utf-8").encode("utf-8")).hexdigest() != action.content_hash:
+                return False
+        return True
 
-                    # 虚拟机路径与宿主机路径转换 将/app 转换为project_path
-                    win_filepath = PathUtil.switch_linux_to_windows(self.project.root, filepath, CONTAINER_WORKDIR)
-                    content = bolt_action.get("content")
-                    result = FileUtil.write_file(win_filepath, content)
+    def _perform_actions_stream(self, prompt: str) -> list[Action]:
+        """
+        流式获取 LLM 响应，每解析出一个完整的 boltAction 就提交执行
+        使用单线程执行器，保证 action 按出现顺序执行，同时不阻塞后续 token 的接收
+        """
+        parser = BoltArtifactStreamParser()
+        futures = []
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            for chunk in self.llm.completion_stream(prompt, stage="perform_task"):
+                for bolt_action in parser.feed(chunk):
+                    futures.append(executor.submit(self._perform_action, bolt_action))
+            parser.close()
+            task_actions = [future.result() for future in futures]
+        return [action for action in task_actions if action]
 
-                    action: Action = Action(
-                        type=ActionType.FILE,
-                        content=content,
-                        result="write success" if result else "write failed",
-                    )
-                    task_actions.append(action)
+    def _perform_action(self, bolt_action: dict) -> Optional[Action]:
+        """执行单个 boltAction：写文件或在容器中执行命令"""
+        if bolt_action.get("type") == "file":
+            filepath = bolt_action.get("filepath")
 
-                elif bolt_action.get("type") == "shell":
-                    shellpath = bolt_action.get("shellpath")
-                    command = bolt_action.get("content")
-                    task_result = self.container.execute_command(command, shellpath)
+            # 虚拟机路径与宿主机路径转换 将/app 转换为project_path
+            win_filepath = PathUtil.switch_linux_to_windows(self.project.project_home, filepath, CONTAINER_WORKDIR)
+            content = bolt_action.get("content")
+            result = FileUtil.write_file(win_filepath, content)
 
-                    action: Action = Action(
-                        type=ActionType.COMMAND,
-                        content=command,
-                        result=task_result
-                    )
-                    task_actions.append(action)
-        self.planner.current_task.result = task_actions
+            return Action(
+                type=ActionType.FILE,
+                content=content,
+                result="write success" if result else "write failed",
+                path=str(win_filepath),
+                content_hash=hashlib.sha256(content.encode("utf-8")).hexdigest(),
+            )
+
+        elif bolt_action.get("type") == "shell":
+            shellpath = bolt_action.get("shellpath")
+            command = bolt_action.get("content")
+            task_result = self.container.execute_command(command, shellpath)
 
+            return Action(
+                type=ActionType.COMMAND,
+                content=command,
+                result=task_result
+            )
+        return None
@@ -19,6 +19,8 @@ def get_package_root():
 
 ROOT = get_package_root()
 PROMPT_ROOT = ROOT / "autostack" / "prompt"
+TEMPLATE_ROOT = ROOT / "templates"
 DEFAULT_WORKSPACE_ROOT = ROOT / "workspace"
+DEFAULT_CACHE_ROOT = DEFAULT_WORKSPACE_ROOT / ".cache"
 CONTAINER_WORKDIR = "/app"
 
@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18
+@Author  : Rex
+@File    : reflink.py
+@Desc    : 写时复制的文件复制，文件系统不支持时普通复制
+"""
+import shutil
+from pathlib import Path
+from typing import Union
+
+try:
+    import fcntl
+    FICLONE = 0x40049409  # linux/fs.h: _IOW(0x94, 9, int)
+except ImportError:  # Windows
+    fcntl = None
+
+
+def reflink_or_copy(src: Union[Path, str], dst: Union[Path, str]) -> bool:
+    """
+    优先使用 reflink（btrfs、xfs 等支持写时复制的文件系统）复制文件，不支持时普通复制
+    不使用硬链接：复制出的文件可能被原地改写，硬链接会同时改掉源文件
+    :return: 是否使用了 reflink
+    """
+    if fcntl is not None:
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            shutil.copystat(src, dst)
+            return True
+        except OSError:
+            pass
+    shutil.copy2(src, dst)
+    return False
@@ -5,4 +5,10 @@
 @Author  : Rex
 @File    : __init__.py.py
 """
-from .docker_container import DockerContainer
\ No newline at end of file
+from .client import get_docker_client, remove_orphans
+from .docker_container import DockerContainer, CommandResult, CONTAINER_LABEL
+from .container_pool import ContainerPool, wait_until_ready, POOL_LABEL
+from .container_registry import ContainerRegistry
+from .command_classifier import CommandResultClassifier, CommandVerdict
+from .log_sink import CommandLogSink
+from .npm_cache import NodeModulesCache, npm_install_command
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18
+@Author  : Rex
+@File    : client.py
+@Desc    : 延迟创建的 docker 客户端，导入模块时不连接 docker 守护进程
+"""
+import os
+import socket
+import threading
+import docker
+from autostack.common import logger
+
+# 创建容器的进程，格式为 <主机名>:<pid>，用于清理异常退出的进程遗留的容器
+OWNER_LABEL = "autostack.owner"
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_docker_client():
+    """进程内共享的 docker 客户端，首次调用时创建"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                logger.info("创建 Docker 客户端...")
+                _client = docker.from_env()
+                logger.info("Docker 客户端创建成功！")
+    return _client
+
+
+def owner_labels() -> dict:
+    """标记当前进程创建的容器"""
+    return {OWNER_LABEL: f"{socket.gethostname()}:{os.getpid()}"}
+
+
+def _is_owner_alive(owner: str) -> bool:
+    host, _, pid = owner.rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        # 其他主机创建的容器无法判断，保留
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def remove_orphans(label: str, client=None) -> int:
+    """
+    删除带有 label 且创建进程已经退出的容器
+    :return: 删除的容器数
+    """
+    client = client or get_docker_client()
+    removed = 0
+    for container in client.containers.list(all=True, filters={"label": label}):
+        owner = container.labels.get(OWNER_LABEL, "")
+        if owner and _is_owner_alive(owner):
+            continue
+        try:
+            container.remove(force=True)
+            removed += 1
+        except Exception as e:
+            logger.warning(f"删除遗留容器 {container.short_id} 失败: {e}")
+    if removed:
+        logger.info(f"已删除 {removed} 个遗留容器（{label}）")
+    return removed
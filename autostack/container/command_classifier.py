@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18
+@Author  : Rex
+@File    : command_classifier.py
+@Desc    : 根据退出码和日志规则判断命令是否执行成功，只有无法确定时才询问 LLM
+"""
+import re
+import threading
+from collections import Counter
+from typing import Callable, NamedTuple, Optional
+from autostack.common import logger
+from .docker_container import CommandResult
+from .log_sink import ERROR_LINE_PATTERN
+
+# 白名单：出现时视为成功（Apple 芯片上 Rosetta 转译的已知问题，不影响命令结果）
+ALLOW_PATTERNS = [
+    re.compile(r"assertion failed \[block != nullptr\]: BasicBlock requested for unrecognized address"),
+]
+# 明确的错误：npm、tsc、prisma、nest 等工具的错误输出格式
+ERROR_PATTERNS = [
+    re.compile(r"^npm ERR!", re.M),
+    re.compile(r"error TS\d+:"),
+    re.compile(r"\bError: P\d{4}\b"),
+    re.compile(r"Command failed with exit code [1-9]"),
+    re.compile(r"exit code:? [1-9]\d*", re.I),
+    re.compile(r"Cannot find module '"),
+    re.compile(r"^\s*(SyntaxError|TypeError|ReferenceError):", re.M),
+    re.compile(r"^fatal:", re.M),
+]
+# 可疑的字样：可能只是警告或文件名的一部分，需要进一步判断
+SUSPICIOUS_PATTERN = ERROR_LINE_PATTERN
+
+DECISION_PATHS = ("allow_rule", "exit_code", "error_rule", "no_error", "llm", "fallback")
+
+
+class CommandVerdict(NamedTuple):
+    success: bool
+    path: str  # 作出判断的依据，见 DECISION_PATHS
+    reason: str
+
+
+class CommandResultClassifier:
+    """
+    命令结果分类器，判断顺序：
+    1. 白名单规则命中，视为成功
+    2. 退出码非 0，视为失败
+    3. 明确的错误规则命中：退出码未知时视为失败，退出码为 0 时交给 LLM
+    4. 退出码为 0，视为成功
+    5. 退出码未知：没有可疑字样视为成功，否则交给 LLM
+    没有提供 llm_judge 时，无法确定的情况以退出码为准，退出码未知则视为失败。
+    """
+
+    def __init__(self, llm_judge: Optional[Callable[[str, str], bool]] = None, max_log_chars: int = 4000):
+        """
+        :param llm_judge: 询问 LLM 的函数，参数为 (命令, 日志摘要)，返回是否成功
+        :param max_log_chars: 发送给 LLM 的日志最大字符数
+        """
+        self.llm_judge = llm_judge
+        self.max_log_chars = max_log_chars
+        self.metrics: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def classify(self, result: CommandResult) -> CommandVerdict:
+        verdict = self._classify(result)
+        with self._lock:
+            self.metrics[verdict.path] += 1
+        logger.info(f"命令 {result.command} 判定为 {'成功' if verdict.success else '失败'}"
+                    f"（{verdict.path}: {verdict.reason}）")
+        return verdict
+
+    def _classify(self, result: CommandResult) -> CommandVerdict:
+        output = result.output or ""
+        for pattern in ALLOW_PATTERNS:
+            if pattern.search(output):
+                return CommandVerdict(True, "allow_rule", pattern.pattern)
+        if result.exit_code not in (None, 0):
+            return CommandVerdict(False, "exit_code", f"exit code {result.exit_code}")
+
+        error = next((match for pattern in ERROR_PATTERNS if (match := pattern.search(output))), None)
+        if error and result.exit_code is None:
+            return CommandVerdict(False, "error_rule", error.group(0).strip())
+        if error:
+            return self._ask_llm(result, f"exit code 0 但包含 {error.group(0).strip()}")
+        if result.exit_code == 0:
+            return CommandVerdict(True, "exit_code", "exit code 0")
+
+        suspicious = SUSPICIOUS_PATTERN.search(output)
+        if not suspicious:
+            return CommandVerdict(True, "no_error", "没有错误字样")
+        return self._ask_llm(result, f"包含 {suspicious.group(0)}")
+
+    def _ask_llm(self, result: CommandResult, reason: str) -> CommandVerdict:
+        if self.llm_judge is None:
+            return CommandVerdict(result.exit_code == 0, "fallback", reason)
+        success = self.llm_judge(result.command, self.digest(result.output))
+        return CommandVerdict(success, "llm", reason)
+
+    def digest(self, output: str) -> str:
+        """日志摘要：可疑的行加上日志结尾，不超过 max_log_chars"""
+        if len(output) <= self.max_log_chars:
+            return output
+        half = self.max_log_chars // 2
+        suspicious_lines = [line for line in output.splitlines() if SUSPICIOUS_PATTERN.search(line)]
+        head = "\n".join(suspicious_lines)[:half]
+        return f"{head}\n...\n{output[-(self.max_log_chars - len(head)):]}"
+
+    def report(self) -> dict[str, int]:
+        """各判断依据的次数，llm 的占比越低越好"""
+        with self._lock:
+            return {path: self.metrics.get(path, 0) for path in DECISION_PATHS}
@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18
+@Author  : Rex
+@File    : container_pool.py
+@Desc    : 预热容器池，容器启动并就绪 postgresql 后放入池中，按项目取用，用完回收
+"""
+import os
+import queue
+import random
+import shlex
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Optional, Union
+from autostack.common import logger, CONTAINER_WORKDIR
+from autostack.common.const import DEFAULT_WORKSPACE_ROOT
+from .client import get_docker_client, owner_labels
+from .npm_cache import npm_cache_volumes
+
+DEFAULT_IMAGE = "zhengyuzhang/nestjs:latest"
+DEFAULT_POOL_SIZE = 2
+# 预热容器挂载整个工作空间，取用时再将 CONTAINER_WORKDIR 链接到具体项目
+POOL_WORKSPACE = "/workspace"
+POOL_LABEL = "autostack.pool"
+
+
+def wait_until_ready(container, probe: Optional[str] = None, timeout: float = 60, interval: float = 0.5) -> bool:
+    """
+    就绪探针：等待容器进入 running 状态，并且 probe 命令返回 0
+    :param container: docker 容器
+    :param probe: 探测命令，为空时只检查容器状态
+    :param timeout: 超时时间（秒）
+    :param interval: 探测间隔（秒）
+    :return: 是否在超时前就绪
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        container.reload()
+        if container.status == "running":
+            if not probe or container.exec_run(probe).exit_code == 0:
+                return True
+        time.sleep(interval)
+    logger.error(f"容器 {container.short_id} 在 {timeout}s 内未就绪: {probe or 'running'}")
+    return False
+
+
+class ContainerPool:
+    """
+    预热容器池
+    池中的容器已启动 postgresql 并通过 pg_isready 探测，取用时只需链接项目目录。
+    容器用完后直接删除（数据库中残留上一个项目的数据，不复用），并在后台补充新的容器。
+    """
+
+    def __init__(self, client=None, size: Optional[int] = None, image: str = DEFAULT_IMAGE,
+                 workspace_root: Union[Path, str] = DEFAULT_WORKSPACE_ROOT, ready_timeout: float = 60):
+        """
+        :param client: docker 客户端，默认使用共享的客户端
+        :param size: 预热容器数，默认读取环境变量 CONTAINER_POOL_SIZE
+        :param image: 镜像名称
+        :param workspace_root: 本机工作空间，项目必须位于其中才能从池中取用
+        :param ready_timeout: 就绪探测的超时时间（秒）
+        """
+        self._client = client
+        self.size = size if size is not None else int(os.getenv("CONTAINER_POOL_SIZE", DEFAULT_POOL_SIZE))
+        self.image = image
+        self.workspace_root = Path(workspace_root).resolve()
+        self.ready_timeout = ready_timeout
+        self._idle: queue.Queue = queue.Queue()
+        self._in_use: set[str] = set()
+        self._lock = threading.Lock()
+        self._warming = 0
+        self._warmers: set[threading.Thread] = set()
+        self._starting: dict[str, object] = {}  # 正在预热、尚未放入池中的容器
+        self._closed = False
+
+    def start(self, wait: bool = False):
+        """
+        补充预热容器直到池满
+        :param wait: 是否等待预热完成，默认在后台预热
+        """
+        threads = [self._spawn_warmer() for _ in range(self._missing())]
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def acquire(self, project_path: Union[Path, str], timeout: Optional[float] = None):
+        """
+        取出一个预热容器并将 CONTAINER_WORKDIR 链接到项目目录
+        :param project_path: 本机项目路径，必须位于 workspace_root 内
+        :param timeout: 等待空闲容器的超时时间，默认使用 ready_timeout
+        :return: 容器，项目不在工作空间内或等待超时返回 None
+        """
+        try:
+            relative_path = Path(project_path).resolve().relative_to(self.workspace_root)
+        except ValueError:
+            logger.warning(f"项目 {project_path} 不在工作空间 {self.workspace_root} 内，无法使用容器池")
+            return None
+
+        if self._idle.empty():
+            self.start()
+        try:
+            container = self._idle.get(timeout=timeout if timeout is not None else self.ready_timeout)
+        except queue.Empty:
+            logger.error("等待预热容器超时")
+            return None
+        # 取走一个后立即在后台补充
+        self.start()
+
+        target = f"{POOL_WORKSPACE}/{relative_path.as_posix()}"
+        workdir, target = shlex.quote(CONTAINER_WORKDIR), shlex.quote(target)
+        result = container.exec_run(["sh", "-c", f"rm -rf {workdir} && ln -s {target} {workdir}"])
+        if result.exit_code != 0:
+            logger.error(f"链接项目目录失败: {result.output}")
+            self._remove(container)
+            return None
+        with self._lock:
+            self._in_use.add(container.id)
+        logger.info(f"从容器池取用容器 {container.short_id} -> {relative_path}")
+        return container
+
+    def release(self, container):
+        """归还容器：删除容器并补充新的预热容器"""
+        with self._lock:
+            self._in_use.discard(container.id)
+        self._remove(container)
+        if not self._closed:
+            self.start()
+
+    def shutdown(self, timeout: Optional[float] = None):
+        """
+        不再补充，删除正在预热和空闲的容器，已取用的容器由使用方释放
+        :param timeout: 等待预热线程结束的超时时间，默认使用 ready_timeout
+        """
+        with self._lock:
+            self._closed = True
+            starting = list(self._starting.values())
+            warmers = list(self._warmers)
+        # 正在预热的容器直接删除，预热线程中的就绪探测随之失败
+        for container in starting:
+            self._remove(container)
+        for thread in warmers:
+            thread.join(timeout if timeout is not None else self.ready_timeout)
+        while not self._idle.empty():
+            self._remove(self._idle.get_nowait())
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = get_docker_client()
+        return self._client
+
+    @property
+    def idle_count(self) -> int:
+        return self._idle.qsize()
+
+    def _missing(self) -> int:
+        with self._lock:
+            if self._closed:
+                return 0
+            missing = max(self.size - self._idle.qsize() - self._warming, 0)
+            self._warming += missing
+            return missing
+
+    def _spawn_warmer(self) -> threading.Thread:
+        thread = threading.Thread(target=self._warm, daemon=True)
+        with self._lock:
+            self._warmers.add(thread)
+        thread.start()
+        return thread
+
+    def _warm(self):
+        """启动一个容器，启动 postgresql 并等待就绪后放入池中"""
+        container = None
+        try:
+            container = self.client.containers.run(
+                self.image,
+                name=f"autostack_pool_{uuid.uuid4().hex[:8]}",
+                command="tail -f /dev/null",
+                volumes={str(self.workspace_root): {'bind': POOL_WORKSPACE, 'mode': 'rw'}, **npm_cache_volumes()},
+                ports={'3000/tcp': random.randint(30000, 50000)},
+                labels={POOL_LABEL: "warm", **owner_labels()},
+                detach=True,
+            )
+            with self._lock:
+                if self._closed:
+                    raise RuntimeError("容器池已关闭")
+                self._starting[container.id] = container
+            if not wait_until_ready(container, timeout=self.ready_timeout):
+                raise RuntimeError("容器未启动")
+            container.exec_run("ln -sf /usr/share/zoneinfo/Asia/Shanghai /etc/localtime")
+            container.exec_run("service postgresql start")
+            if not wait_until_ready(container, "pg_isready", timeout=self.ready_timeout):
+                raise RuntimeError("postgresql 未就绪")
+            with self._lock:
+                self._starting.pop(container.id, None)
+                closed = self._closed
+                if not closed:
+                    self._idle.put(container)
+            if closed:
+                self._remove(container)
+            else:
+                logger.info(f"预热容器就绪: {container.short_id}")
+        except Exception as e:
+            if self._closed:
+                logger.info(f"容器池已关闭，停止预热: {e}")
+            else:
+                logger.error(f"预热容器失败: {e}")
+            if container is not None:
+                with self._lock:
+                    self._starting.pop(container.id, None)
+                self._remove(container)
+        finally:
+            with self._lock:
+                self._warming -= 1
+                self._warmers.discard(threading.current_thread())
+
+    @staticmethod
+    def _remove(container):
+        try:
+            container.remove(force=True)
+        except Exception as e:
+            logger.warning(f"删除容器 {container.short_id} 失败: {e}")
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18
+@Author  : Rex
+@File    : container_registry.py
+@Desc    : 按项目管理容器，同一项目共用一个容器，不同项目互不影响
+"""
+import threading
+from pathlib import Path
+from typing import Optional, Union
+from autostack.common import logger
+from .container_pool import ContainerPool
+from .docker_container import DockerContainer
+
+
+class ContainerRegistry:
+    """
+    进程内的项目容器注册表，以项目路径为键
+    每个项目的锁互相独立，多个线程可以同时为不同项目启动容器
+    """
+    _containers: dict[Path, DockerContainer] = {}
+    _locks: dict[Path, threading.Lock] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, project_path: Union[Path, str], pool: Optional[ContainerPool] = None) -> DockerContainer:
+        """
+        获取项目的容器，不存在时启动
+        :param project_path: 本机项目路径
+        :param pool: 预热容器池
+        """
+        key = Path(project_path).resolve()
+        with cls._lock:
+            project_lock = cls._locks.setdefault(key, threading.Lock())
+        with project_lock:
+            container = cls._containers.get(key)
+            if container is None:
+                container = DockerContainer(project_path, pool=pool)
+                cls._containers[key] = container
+            return container
+
+    @classmethod
+    def release(cls, project_path: Union[Path, str]):
+        """释放项目的容器"""
+        key = Path(project_path).resolve()
+        with cls._lock:
+            container = cls._containers.pop(key, None)
+            cls._locks.pop(key, None)
+        if container:
+            logger.info(f"释放容器: {container.name}")
+            container.release()
+
+    @classmethod
+    def release_all(cls):
+        with cls._lock:
+            keys = list(cls._containers)
+        for key in keys:
+            cls.release(key)
+
+    @classmethod
+    def projects(cls) -> list[Path]:
+        with cls._lock:
+            return list(cls._containers)
@@ -1,100 +1,179 @@
+from concurrent.futures import Future
 from pathlib import Path
-from typing import Union
+from typing import NamedTuple, Optional, Union
 from autostack.common import logger
 from autostack.common import CONTAINER_WORKDIR
-import docker
-import random
+from .client import get_docker_client, owner_labels
+from .container_pool import ContainerPool, wait_until_ready
+from .log_sink import CommandLogSink
+from .npm_cache import npm_cache_volumes
+import os
 import time
+import random
 import threading
+import uuid
 import re
 
-# 创建 Docker 客户端
-client = docker.from_env()
+
+CONTAINER_LABEL = "autostack.project"
+
+
+class CommandResult(NamedTuple):
+    """命令执行结果"""
+    command: str
+    output: str
+    exit_code: Optional[int]  # 无法获取时为 None
+    log_path: Optional[Path] = None  # 完整日志文件
 
 
-# 全局唯一的Docker_Util
 class DockerContainer:
     """
     在docker容器中执行的shell 工具类
+    每个实例对应一个项目的容器，容器名称唯一，多个项目可以在同一进程中并行构建
     """
-    _instance = None
-    _container = None
-
-    def __new__(cls, project_path: Union[Path, str]):
-        if cls._instance is None:
-            cls._instance = super(DockerContainer, cls).__new__(cls)
-            cls._instance.project_path = project_path
-            cls._container = cls._start_container(project_path)
-            if cls._container:
-                cls._instance.execute_command(command="service postgresql restart")
-                # 设置容器时间
-                cls._instance.execute_command(command="ln -sf /usr/share/zoneinfo/Asia/Shanghai /etc/localtime")
-        return cls._instance
-
-    @classmethod
-    def _start_container(cls, project_path: Union[Path, str], image_name: str = 'zhengyuzhang/nestjs:latest'):
+
+    def __init__(self, project_path: Union[Path, str], pool: Optional[ContainerPool] = None,
+                 image_name: str = 'zhengyuzhang/nestjs:latest'):
+        """
+        :param project_path: 本机项目路径
+        :param pool: 预热容器池，从池中取到容器时不必重新启动容器和 postgresql
+        :param image_name: 镜像名称，不使用容器池时生效
+        """
+        self.project_path = project_path
+        # 完整的命令日志写入该目录，默认读取环境变量 COMMAND_LOG_DIR，为空时不写文件
+        self.log_dir = Path(os.environ["COMMAND_LOG_DIR"]) if os.getenv("COMMAND_LOG_DIR") else None
+        self.name = self.make_name(project_path)
+        self._pool = None
+        self._container = pool.acquire(project_path) if pool else None
+        if self._container:
+            self._pool = pool
+            return
+        self._container = self._start_container(project_path, image_name)
+        if self._container:
+            self.execute_command(command="service postgresql restart")
+            wait_until_ready(self._container, "pg_isready")
+            # 设置容器时间
+            self.execute_command(command="ln -sf /usr/share/zoneinfo/Asia/Shanghai /etc/localtime")
+
+    @staticmethod
+    def make_name(project_path: Union[Path, str]) -> str:
+        """容器名称：autostack_<项目目录名>_<随机后缀>，避免不同项目、不同进程之间冲突"""
+        project_name = re.sub(r"[^a-zA-Z0-9_.-]", "_", Path(project_path).name) or "project"
+        return f"autostack_{project_name}_{uuid.uuid4().hex[:8]}"
+
+    def _start_container(self, project_path: Union[Path, str], image_name: str):
         """
         根据镜像名称启动容器，挂载本地项目并映射端口
         @:param project_path: 本机项目路径
         @:param image_name: 镜像名称，默认nestjs/cli
         """
         try:
-            logger.info(f"正在启动容器")
+            logger.info(f"正在启动容器: {self.name}")
             port = random.randint(30000, 50000)
             # 启动容器，映射容器的 3000 端口到宿主机的随机端口
-            container = client.containers.run(
+            container = get_docker_client().containers.run(
                 image_name,
+                name=self.name,
                 command="tail -f /dev/null",  # 启动容器后保持容器运行，不执行其他命令
-                volumes={project_path: {'bind': CONTAINER_WORKDIR, 'mode': 'rw'}},  # 将本地项目目录挂载到容器内
+                # 将本地项目目录挂载到容器内，npm 缓存使用共享的 volume
+                volumes={str(project_path): {'bind': CONTAINER_WORKDIR, 'mode': 'rw'}, **npm_cache_volumes()},
                 working_dir=CONTAINER_WORKDIR,  # 容器内的工作目录
                 ports={'3000/tcp': port},  # None 表示随机端口
                 detach=True,  # 后台运行容器
-                restart_policy={"Name": "always"}  # 确保容器重启策略为“总是重启”
+                # 不自动重启，由 release 删除；进程异常退出时通过标签清理（remove_orphans）
+                labels={CONTAINER_LABEL: self.name, **owner_labels()},
             )
-            time.sleep(5)  # ⌛️等待容器启动以及文件映射到容器, 可以根据实际情况调整时间
+            wait_until_ready(container)  # ⌛️等待容器启动以及文件映射到容器
             logger.info(f"容器启动成功: {container.short_id}")
             return container
         except Exception as e:
             logger.error(f"容器启动失败: {e}")
             return None
 
-    def execute_command(self, command, workdir: Union[str, Path] = CONTAINER_WORKDIR, detach=False, stream=True):
+    def execute(self, command: str, workdir: Union[str, Path] = CONTAINER_WORKDIR) -> CommandResult:
         """
+        执行命令并获取退出码
         :param command:   执行的命令
         :param workdir:   命令执行目录
-        :param detach:
-        :param stream:
-        :return:
+        :return: 命令输出摘要和退出码，命令无法执行时退出码为 -1
         """
         logger.info(f"执行命令: {command}")
+        spill_path = None
+        if self.log_dir:
+            spill_path = self.log_dir / f"{time.strftime('%Y%m%d_%H%M%S')}_{re.sub(r'[^a-zA-Z0-9]+', '_', command)[:40]}.log"
         try:
-            # 在容器中执行命令
-            exec_log = self._container.exec_run(command, tty=True, stream=stream, detach=detach, workdir=workdir)
-            logs = ""
-            for log in exec_log[1]:
-                single_word = log.decode("utf-8").strip()
-                # # 过滤掉 ANSI 转义序列
-                # cleaned_string = re.sub(r'\x1b\[[0-9;]*[mGK]', '', single_word)
-                # if cleaned_string.find("\\") == -1 and cleaned_string.find("-") == -1 and cleaned_string.find("/") == -1 and cleaned_string.find("|") == -1:
-                #     logger.info(cleaned_string)
-                # else:
-                #     print("loading", end="", flush=True)
-                logger.info(single_word)
-                logs += single_word
-            return logs
+            # 使用底层 api 执行，结束后可以通过 exec_inspect 获取退出码
+            api = self._container.client.api
+            exec_id = api.exec_create(self._container.id, command, tty=True, workdir=str(workdir))["Id"]
+            # 输出可能有几 MB，只保留摘要
+            with CommandLogSink(spill_path=spill_path) as sink:
+                for log in api.exec_start(exec_id, stream=True):
+                    sink.write(log)
+            logger.info(f"命令输出 {sink.total_lines} 行，{sink.total_bytes} 字节")
+            return CommandResult(command, sink.digest(), api.exec_inspect(exec_id).get("ExitCode"), spill_path)
         except Exception as e:
             logger.error(f"执行命令失败: {e}")
-            return None
+            return CommandResult(command, str(e), -1)
 
-    def execute_command_thread(self, command: str, workdir: Union[str, Path] = CONTAINER_WORKDIR, detach=False, stream=True):
+    def execute_command(self, command, workdir: Union[str, Path] = CONTAINER_WORKDIR, detach=False, stream=True):
+        """
+        :param command:   执行的命令
+        :param workdir:   命令执行目录
+        :param detach:    是否后台执行，后台执行时不等待输出
+        :param stream:
+        :return: 命令输出，执行失败返回 None
+        """
+        if detach:
+            logger.info(f"后台执行命令: {command}")
+            self._container.exec_run(command, tty=True, detach=True, workdir=workdir)
+            return ""
+        result = self.execute(command, workdir)
+        return None if result.exit_code == -1 else result.output
+
+    def execute_command_thread(self, command: str, workdir: Union[str, Path] = CONTAINER_WORKDIR, detach=False,
+                               stream=True) -> Future:
         """
         多线程执行
         :param stream:
         :param detach:
         :param workdir:
         :param command:
-        :return:
+        :return: Future，结果为 execute_command 的返回值
         """
-        thread = threading.Thread(target=self.execute_command, args=(command, workdir, detach, stream))
-        thread.start()
-        return thread
+        return self._submit(self.execute_command, command, workdir, detach, stream)
+
+    def execute_async(self, command: str, workdir: Union[str, Path] = CONTAINER_WORKDIR) -> Future:
+        """
+        后台执行命令，可以在需要结果时再等待
+        :return: Future，结果为 CommandResult
+        """
+        return self._submit(self.execute, command, workdir)
+
+    @staticmethod
+    def _submit(func, *args) -> Future:
+        """在后台线程中执行，异常通过 Future 传递给等待方"""
+        future = Future()
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(func(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, daemon=True).start()
+        return future
+
+    def release(self):
+        """释放容器，来自容器池的容器交还给容器池回收，否则直接删除"""
+        if not self._container:
+            return
+        if self._pool:
+            self._pool.release(self._container)
+        else:
+            try:
+                self._container.remove(force=True)
+            except Exception as e:
+                logger.warning(f"删除容器 {self.name} 失败: {e}")
+        self._container = None
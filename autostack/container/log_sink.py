@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18
+@Author  : Rex
+@File    : log_sink.py
+@Desc    : 命令输出的流式收集，只在内存中保留开头、结尾和错误行，完整日志可以写入文件
+"""
+import codecs
+import re
+import time
+from collections import deque
+from pathlib import Path
+from typing import Optional, Union
+from autostack.common import logger
+
+ANSI_PATTERN = re.compile(r"\x1b\[[0-9;?]*[A-Za-z]|\x1b\][^\x07]*\x07")
+ERROR_LINE_PATTERN = re.compile(r"\b(error|errors|fail|failed|failure|fatal)\b|npm ERR!", re.I)
+# 未换行部分的最大长度，超出时作为一行处理
+MAX_PARTIAL_CHARS = 64 * 1024
+
+
+class CommandLogSink:
+    """
+    命令日志收集器
+    - 按行处理输出，去掉 ANSI 转义序列，\\r 覆盖的进度条只保留最后一次刷新
+    - 未换行的部分只保留最后一个 \\r 之后的内容，超过 MAX_PARTIAL_CHARS 时作为一行处理，内存占用有上限
+    - 内存中只保留前 head_lines 行、后 tail_lines 行和最多 max_error_lines 个错误行
+    - 指定 spill_path 时完整日志写入文件
+    - 控制台输出限速，每 echo_interval 秒最多输出一行，错误行总是输出
+    """
+
+    def __init__(self, head_lines: int = 50, tail_lines: int = 200, max_error_lines: int = 100,
+                 spill_path: Optional[Union[Path, str]] = None, echo_interval: float = 0.5):
+        self.head_lines = head_lines
+        self.max_error_lines = max_error_lines
+        self.echo_interval = echo_interval
+        self.spill_path = Path(spill_path) if spill_path else None
+        self.head: list[str] = []
+        self.tail: deque[tuple[int, str]] = deque(maxlen=tail_lines)
+        self.errors: list[tuple[int, str]] = []  # (行号, 内容)
+        self.total_lines = 0
+        self.total_bytes = 0
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._partial = ""
+        self._last_echo = 0.0
+        self._suppressed = 0
+        self._spill = None
+        if self.spill_path:
+            self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+            self._spill = open(self.spill_path, "w", encoding="utf-8")
+
+    def write(self, chunk: Union[bytes, str]):
+        if isinstance(chunk, bytes):
+            self.total_bytes += len(chunk)
+            chunk = self._decoder.decode(chunk)
+        else:
+            self.total_bytes += len(chunk.encode("utf-8"))
+        lines = (self._partial + chunk).split("\n")
+        partial = lines.pop()
+        for line in lines:
+            self._add_line(line)
+        # 只有 \r 没有 \n 的进度输出，之前的内容已被覆盖；结尾的 \r 可能属于 \r\n，保留
+        before, sep, after = partial.rpartition("\r")
+        if sep:
+            partial = after if after else before.rsplit("\r", 1)[-1] + "\r"
+        if len(partial) > MAX_PARTIAL_CHARS:
+            self._add_line(partial)
+            partial = ""
+        self._partial = partial
+
+    def close(self):
+        """处理最后不完整的一行，关闭日志文件"""
+        rest = self._partial + self._decoder.decode(b"", final=True)
+        self._partial = ""
+        if rest:
+            self._add_line(rest)
+        if self._suppressed:
+            logger.info(f"...（共省略 {self._suppressed} 行输出）")
+            self._suppressed = 0
+        if self._spill:
+            self._spill.close()
+            self._spill = None
+
+    def _add_line(self, line: str):
+        # 进度条通过 \r 回到行首重绘，只保留最后一次
+        line = ANSI_PATTERN.sub("", line.rstrip("\r").rsplit("\r", 1)[-1]).rstrip()
+        self.total_lines += 1
+        if self._spill:
+            self._spill.write(line + "\n")
+        if len(self.head) < self.head_lines:
+            self.head.append(line)
+        else:
+            self.tail.append((self.total_lines, line))
+        is_error = bool(ERROR_LINE_PATTERN.search(line))
+        if is_error and len(self.errors) < self.max_error_lines:
+            self.errors.append((self.total_lines, line))
+        self._echo(line, is_error)
+
+    def _echo(self, line: str, is_error: bool):
+        now = time.monotonic()
+        if not is_error and now - self._last_echo < self.echo_interval:
+            self._suppressed += 1
+            return
+        self._last_echo = now
+        if self._suppressed:
+            line = f"{line}  （省略 {self._suppressed} 行）"
+            self._suppressed = 0
+        logger.info(line)
+
+    def digest(self) -> str:
+        """日志摘要：开头、被省略部分中的错误行、结尾"""
+        if not self.tail:
+            return "\n".join(self.head)
+        first_tail = self.tail[0][0]
+        omitted = first_tail - len(self.head) - 1
+        parts = list(self.head)
+        if omitted > 0:
+            omitted_errors = [f"{no}: {line}" for no, line in self.errors if len(self.head) < no < first_tail]
+            parts.append(f"...（省略 {omitted} 行，其中错误行 {len(omitted_errors)} 行）...")
+            parts.extend(omitted_errors)
+            if omitted_errors:
+                parts.append("...")
+        parts.extend(line for _, line in self.tail)
+        return "\n".join(parts)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18
+@Author  : Rex
+@File    : npm_cache.py
+@Desc    : 项目间共享 npm 缓存和 node_modules，避免每个项目都重新下载依赖
+"""
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Optional, Union
+from autostack.common import logger
+from autostack.common.const import DEFAULT_CACHE_ROOT
+from autostack.common.reflink import reflink_or_copy
+
+# npm 下载缓存放在 docker volume 中，所有容器共用
+NPM_CACHE_VOLUME = "autostack_npm_cache"
+NPM_CACHE_MOUNT = "/root/.npm"
+# 安装后由 prisma generate 等按项目生成的目录，不进入缓存
+NODE_MODULES_EXCLUDE_DIRS = (".prisma", ".cache")
+
+
+def npm_cache_volumes() -> dict:
+    """挂载 npm 缓存 volume 的 volumes 参数"""
+    return {NPM_CACHE_VOLUME: {'bind': NPM_CACHE_MOUNT, 'mode': 'rw'}}
+
+
+def npm_install_command(force: bool = True) -> str:
+    """
+    安装依赖的命令，优先使用缓存；设置环境变量 NPM_REGISTRY 时使用指定的 registry（例如本地的 verdaccio）
+    """
+    command = "npm install --prefer-offline --no-audit --no-fund"
+    if force:
+        command += " --force"
+    registry = os.getenv("NPM_REGISTRY")
+    if registry:
+        command += f" --registry {registry}"
+    return command
+
+
+class NodeModulesCache:
+    """
+    按依赖计算 key 的 node_modules 缓存
+    key 只取 package.json 中的依赖，项目名称等字段不影响 key。不使用 package-lock.json：restore 在 npm install 之前执行，
+    此时模板中还没有锁文件，而 save 在安装之后执行，npm 已经写入锁文件，两次计算的 key 会不同。
+    保存和恢复都使用 reflink，不支持时复制；不使用硬链接，prisma generate 和 postinstall 脚本会原地改写
+    node_modules 中的文件，硬链接会同时改掉缓存和其他项目。
+    """
+
+    def __init__(self, cache_root: Union[Path, str] = DEFAULT_CACHE_ROOT / "node_modules"):
+        self.cache_root = Path(cache_root)
+
+    @staticmethod
+    def key(project_path: Union[Path, str]) -> Optional[str]:
+        project_path = Path(project_path)
+        package_json = project_path / "package.json"
+        if not package_json.exists():
+            return None
+        package = json.loads(package_json.read_text(encoding="utf-8"))
+        digest = hashlib.sha256(json.dumps(
+            {name: package.get(name, {}) for name in ("dependencies", "devDependencies", "overrides")},
+            sort_keys=True
+        ).encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    def restore(self, project_path: Union[Path, str]) -> bool:
+        """将缓存的 node_modules 链接到项目中，项目已有 node_modules 或没有缓存时返回 False"""
+        project_path = Path(project_path)
+        key = self.key(project_path)
+        cached = self.cache_root / key / "node_modules" if key else None
+        target = project_path / "node_modules"
+        if cached is None or not cached.exists() or target.exists():
+            return False
+        files = self._copy_tree(cached, target)
+        logger.info(f"从缓存恢复 node_modules（{key}），共 {files} 个文件")
+        return True
+
+    def save(self, project_path: Union[Path, str]) -> bool:
+        """安装成功后将项目的 node_modules 存入缓存，已有相同 key 的缓存时跳过"""
+        project_path = Path(project_path)
+        key = self.key(project_path)
+        source = project_path / "node_modules"
+        if not key or not source.exists() or (self.cache_root / key).exists():
+            return False
+        # 先写入临时目录再重命名，避免其他进程读到不完整的缓存
+        tmp = self.cache_root / f".{key}.{uuid.uuid4().hex[:8]}"
+        try:
+            files = self._copy_tree(source, tmp / "node_modules", NODE_MODULES_EXCLUDE_DIRS)
+            tmp.rename(self.cache_root / key)
+        except OSError as e:
+            logger.warning(f"保存 node_modules 缓存失败: {e}")
+            shutil.rmtree(tmp, ignore_errors=True)
+            return False
+        logger.info(f"node_modules 已缓存（{key}），共 {files} 个文件")
+        return True
+
+    @staticmethod
+    def _copy_tree(source: Path, target: Path, exclude_dirs: tuple[str, ...] = ()) -> int:
+        """按 source 的目录结构复制文件，符号链接原样重建，跳过 exclude_dirs 中的目录，返回文件数"""
+        files = 0
+        for root, dirs, filenames in os.walk(source):
+            relative = Path(root).relative_to(source)
+            dirs[:] = [d for d in dirs if d not in exclude_dirs]
+            (target / relative).mkdir(parents=True, exist_ok=True)
+            # os.walk 不会进入指向目录的符号链接，需要单独处理
+            for name in [d for d in dirs if (Path(root) / d).is_symlink()]:
+                dirs.remove(name)
+                os.symlink(os.readlink(Path(root) / name), target / relative / name)
+            for name in filenames:
+                src, dst = Path(root) / name, target / relative / name
+                if src.is_symlink():
+                    os.symlink(os.readlink(src), dst)
+                else:
+                    reflink_or_copy(src, dst)
+                files += 1
+        return files
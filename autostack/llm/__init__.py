@@ -1,2 +1,4 @@
-from .llm import LLM
+from .llm import LLM, AsyncLLM
+from .llm_cache import LLMCache
 from .schema import Message, Plan, Task, Action, ActionType
+from .llm_cost import CostManager, CostLedger, BudgetExceededError
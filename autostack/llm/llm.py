@@ -1,10 +1,15 @@
 import os
-from openai import OpenAI
-from typing import Optional, Union
+import time
+import asyncio
+from openai import OpenAI, AsyncOpenAI, BadRequestError
+from typing import Iterator, Optional, Union
 from dotenv import load_dotenv
 from autostack.common.const import ROOT
 from .schema import Message
-from autostack.common.logs import logger
+from .llm_cache import LLMCache
+from .llm_cost import CostManager, CostLedger, LedgerEntry, get_default_cost_manager, get_default_ledger
+from .token_counter import count_string_tokens
+from autostack.common.logs import logger, log_llm_stream
 
 load_dotenv(ROOT / "autostack" / "env" / "llm.env")
 
@@ -13,7 +18,10 @@ class LLM:
     def __init__(self, api_key: Optional[str] = None, 
                  base_url: Optional[str] = None, 
                  system_prompt: Optional[str] = None,
-                 model: Optional[str] = None
+                 model: Optional[str] = None,
+                 cache: Optional[LLMCache] = None,
+                 cost_manager: Optional[CostManager] = None,
+                 ledger: Optional[CostLedger] = None
                  ):
         
         self.api_key = api_key or os.getenv("LLM_API_KEY")
@@ -21,15 +29,39 @@ class LLM:
         self.system_prompt = system_prompt or os.getenv("LLM_SYSTEM_PROMPT", "You are a helpful assistant.")
         self.model = model or os.getenv("LLM_MODEL", "gpt-4o")
         self.client = OpenAI(api_key=self.api_key, base_url=self.base_url)
+        # 响应缓存默认关闭，通过参数传入或设置环境变量 LLM_CACHE_ENABLED=true 开启
+        if cache is None and os.getenv("LLM_CACHE_ENABLED", "false").lower() in ("1", "true", "yes"):
+            cache = LLMCache.from_env()
+        self.cache = cache
+        # 默认使用进程内共享的成本管理器和账本，预算对所有 LLM 实例生效
+        self.cost_manager = cost_manager or get_default_cost_manager()
+        self.ledger = ledger or get_default_ledger()
+        # 流式响应是否请求 usage（stream_options），不支持该参数的服务端会返回 400，此时关闭后重试
+        self.stream_usage = os.getenv("LLM_STREAM_USAGE", "true").lower() in ("1", "true", "yes")
 
-    def completion(self, messages: Union[str, Message, list[dict], list[Message], list[str]]):
+    def completion(self, messages: Union[str, Message, list[dict], list[Message], list[str]], use_cache: bool = True,
+                   stage: str = ""):
+        """
+        :param messages: 消息
+        :param use_cache: 是否使用响应缓存
+        :param stage: 调用阶段，例如 gen_prd、perform_task，用于按阶段统计耗时和花费
+        """
         logger.info(f"LLM completion with messages: \n{messages}")
+        formatted_messages = self.format_msg(messages)
+        cache_key, cached = self._read_cache(formatted_messages, use_cache, stage)
+        if cached is not None:
+            return cached
+        self.cost_manager.check_budget()
+        start = time.perf_counter()
         resp = self.client.chat.completions.create(
             model=self.model, 
-            messages=self.format_msg(messages),
+            messages=formatted_messages,
             timeout=600
         )
+        self._record_usage(stage, resp.usage, time.perf_counter() - start)
         result = resp.choices[0].message.content
+        if cache_key and result is not None:
+            self.cache.set(cache_key, self.model, result)
         # # 适配 deepseek
         # if "<think>" in result:
         #     logger.info(f"LLM completion response: {result.split('</think>')[0].split('<think>')[1]}")
@@ -37,6 +69,98 @@ class LLM:
         #     # logger.info(f"LLM completion response: {result}")
         return result
 
+    def completion_stream(self, messages: Union[str, Message, list[dict], list[Message], list[str]],
+                          use_cache: bool = True, stage: str = "") -> Iterator[str]:
+        """
+        流式返回 LLM 的响应片段，每个片段同时输出到 log_llm_stream
+        命中缓存时一次性返回完整内容，流结束后将完整响应写入缓存
+        """
+        logger.info(f"LLM stream completion with messages: \n{messages}")
+        formatted_messages = self.format_msg(messages)
+        cache_key, cached = self._read_cache(formatted_messages, use_cache, stage)
+        if cached is not None:
+            yield cached
+            return
+        self.cost_manager.check_budget()
+        start = time.perf_counter()
+        resp = self._create_stream(formatted_messages)
+        collected = []
+        usage = None
+        for chunk in resp:
+            # 开启 include_usage 后，最后一个 chunk 的 choices 为空，只携带 usage
+            usage = getattr(chunk, "usage", None) or usage
+            if not chunk.choices:
+                continue
+            content = chunk.choices[0].delta.content
+            if content:
+                log_llm_stream(content)
+                collected.append(content)
+                yield content
+        log_llm_stream("\n")
+        result = "".join(collected)
+        if usage is None:
+            # 服务端不支持 include_usage 时按字符串估算
+            prompt = "".join(message["content"] for message in formatted_messages)
+            usage = {
+                "prompt_tokens": count_string_tokens(prompt, self.model, approximate=True),
+                "completion_tokens": count_string_tokens(result, self.model, approximate=True),
+            }
+        self._record_usage(stage, usage, time.perf_counter() - start)
+        if cache_key:
+            self.cache.set(cache_key, self.model, result)
+
+    def _create_stream(self, formatted_messages: list[dict]):
+        kwargs = {"stream_options": {"include_usage": True}} if self.stream_usage else {}
+        try:
+            return self.client.chat.completions.create(
+                model=self.model,
+                messages=formatted_messages,
+                timeout=600,
+                stream=True,
+                **kwargs
+            )
+        except BadRequestError as e:
+            if not kwargs:
+                raise
+            logger.warning(f"服务端不支持 stream_options，不再请求 usage: {e}")
+            self.stream_usage = False
+            return self._create_stream(formatted_messages)
+
+    def _read_cache(self, formatted_messages: list[dict], use_cache: bool,
+                    stage: str = "") -> tuple[Optional[str], Optional[str]]:
+        """查询响应缓存，返回 (缓存键, 缓存内容)，未开启缓存时缓存键为 None"""
+        if not self.cache or not use_cache:
+            return None, None
+        start = time.perf_counter()
+        cache_key = LLMCache.make_key(self.model, formatted_messages)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"LLM cache hit: {cache_key}")
+            self.ledger.record(LedgerEntry(stage=stage, model=self.model, cached=True,
+                                           latency=time.perf_counter() - start))
+        return cache_key, cached
+
+    def _record_usage(self, stage: str, usage, latency: float):
+        """将一次调用的 token 用量计入成本管理器，并写入账本"""
+        if not isinstance(usage, dict):
+            usage = {"prompt_tokens": getattr(usage, "prompt_tokens", 0),
+                     "completion_tokens": getattr(usage, "completion_tokens", 0)}
+        # 部分兼容 openai 协议的服务不返回 usage
+        prompt_tokens, completion_tokens = [
+            value if isinstance(value, int) else 0
+            for value in (usage.get("prompt_tokens"), usage.get("completion_tokens"))
+        ]
+        total_cost = self.cost_manager.total_cost
+        self.cost_manager.update_cost(prompt_tokens, completion_tokens, self.model)
+        self.ledger.record(LedgerEntry(
+            stage=stage,
+            model=self.model,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            latency=latency,
+            cost=self.cost_manager.total_cost - total_cost,
+        ))
+
     def format_msg(self, messages: Union[str, Message, list[dict], list[Message], list[str]]) -> list[dict]:
         """convert messages to list[dict]."""
 
@@ -60,3 +184,70 @@ class LLM:
         processed_messages.insert(0, {"role": "system", "content": self.system_prompt})
         return processed_messages
 
+
+class AsyncLLM(LLM):
+    """
+    基于 AsyncOpenAI 的异步 LLM 客户端，通过信号量限制并发请求数
+    """
+
+    def __init__(self, api_key: Optional[str] = None,
+                 base_url: Optional[str] = None,
+                 system_prompt: Optional[str] = None,
+                 model: Optional[str] = None,
+                 cache: Optional[LLMCache] = None,
+                 cost_manager: Optional[CostManager] = None,
+                 ledger: Optional[CostLedger] = None,
+                 max_concurrency: Optional[int] = None
+                 ):
+        super().__init__(api_key, base_url, system_prompt, model, cache, cost_manager, ledger)
+        self.aclient = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url)
+        self.max_concurrency = max_concurrency or int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+        # asyncio 的信号量与事件循环绑定，事件循环变化时需要重新创建
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def acompletion(self, messages: Union[str, Message, list[dict], list[Message], list[str]],
+                          use_cache: bool = True, stage: str = "") -> str:
+        logger.info(f"LLM async completion with messages: \n{messages}")
+        formatted_messages = self.format_msg(messages)
+        cache_key, cached = self._read_cache(formatted_messages, use_cache, stage)
+        if cached is not None:
+            return cached
+        async with self._get_semaphore():
+            self.cost_manager.check_budget()
+            start = time.perf_counter()
+            resp = await self.aclient.chat.completions.create(
+                model=self.model,
+                messages=formatted_messages,
+                timeout=600
+            )
+            self._record_usage(stage, resp.usage, time.perf_counter() - start)
+        result = resp.choices[0].message.content
+        if cache_key and result is not None:
+            self.cache.set(cache_key, self.model, result)
+        return result
+
+    async def abatch_completion(self, messages_list: list[Union[str, Message, list[dict], list[Message], list[str]]],
+                                use_cache: bool = True, stage: str = "") -> list[str]:
+        """
+        并发执行多个请求，并发数受 max_concurrency 限制，结果与输入顺序一致
+        :param messages_list: 每个元素为一次 completion 的 messages
+        :param use_cache: 是否使用响应缓存
+        :param stage: 调用阶段
+        :return: 与 messages_list 一一对应的响应列表
+        """
+        return list(await asyncio.gather(
+            *(self.acompletion(messages, use_cache, stage) for messages in messages_list)
+        ))
+
+    def batch_completion(self, messages_list: list[Union[str, Message, list[dict], list[Message], list[str]]],
+                         use_cache: bool = True, stage: str = "") -> list[str]:
+        """abatch_completion 的同步入口，不能在已运行的事件循环中调用"""
+        return asyncio.run(self.abatch_completion(messages_list, use_cache, stage))
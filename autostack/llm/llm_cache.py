@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+LLM 响应缓存
+@Time    : 2026/10/18
+@Author  : Rex
+@File    : llm_cache.py
+@Desc    : 以 model + 格式化后的消息内容做哈希作为键，将 LLM 的响应持久化到 SQLite 中，
+           相同的请求再次发送时直接返回缓存内容，支持按大小/时间淘汰以及命中统计。
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import NamedTuple, Optional, Union
+
+from autostack.common.const import DEFAULT_CACHE_ROOT
+from autostack.common.logs import logger
+
+DEFAULT_LLM_CACHE_PATH = DEFAULT_CACHE_ROOT / "llm_cache.db"
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    bytes_saved: int
+    entries: int
+    size_bytes: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class LLMCache:
+    """
+    基于 SQLite 的 LLM 响应缓存，多线程安全。
+    响应内容使用 zlib 压缩后存储，size 记录的是压缩后的字节数。
+    """
+    _shared: dict[str, "LLMCache"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, db_path: Union[str, Path] = None,
+                 max_size_bytes: Optional[int] = 512 * 1024 * 1024,
+                 max_age_seconds: Optional[float] = 30 * 24 * 3600):
+        """
+        :param db_path: 缓存数据库路径，默认 workspace/.cache/llm_cache.db
+        :param max_size_bytes: 缓存的最大字节数（压缩后），超出后按最近访问时间淘汰，None 表示不限制
+        :param max_age_seconds: 缓存的最长保留时间，None 表示不过期
+        """
+        self.db_path = Path(db_path) if db_path else DEFAULT_LLM_CACHE_PATH
+        self.max_size_bytes = max_size_bytes
+        self.max_age_seconds = max_age_seconds
+
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+        self._lock = threading.Lock()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, "
+            "model TEXT NOT NULL, "
+            "response BLOB NOT NULL, "
+            "raw_size INTEGER NOT NULL, "
+            "size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, "
+            "last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)")
+        self._conn.commit()
+
+    @classmethod
+    def from_env(cls) -> "LLMCache":
+        """
+        根据环境变量获取缓存：LLM_CACHE_PATH、LLM_CACHE_MAX_SIZE_MB、LLM_CACHE_MAX_AGE_DAYS
+        同一路径在进程内共享一个实例，多个 LLM 对象的命中统计汇总在一起
+        """
+        db_path = os.getenv("LLM_CACHE_PATH") or str(DEFAULT_LLM_CACHE_PATH)
+        with cls._shared_lock:
+            if db_path not in cls._shared:
+                cls._shared[db_path] = cls._create_from_env(db_path)
+            return cls._shared[db_path]
+
+    @classmethod
+    def _create_from_env(cls, db_path: str) -> "LLMCache":
+        max_size_mb = os.getenv("LLM_CACHE_MAX_SIZE_MB")
+        max_age_days = os.getenv("LLM_CACHE_MAX_AGE_DAYS")
+        kwargs = {}
+        if max_size_mb:
+            kwargs["max_size_bytes"] = int(float(max_size_mb) * 1024 * 1024)
+        if max_age_days:
+            kwargs["max_age_seconds"] = float(max_age_days) * 24 * 3600
+        return cls(db_path=db_path, **kwargs)
+
+    @staticmethod
+    def make_key(model: str, messages: list[dict]) -> str:
+        """
+        根据模型和 format_msg 的输出生成缓存键
+        只使用 role 和 content，Message 中的 timestamp、id 每次都不同，不能参与哈希
+        """
+        payload = json.dumps(
+            {"model": model, "messages": [[msg.get("role"), msg.get("content")] for msg in messages]},
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """读取缓存，未命中或已过期返回 None"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, raw_size, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or self._is_expired(row[2], now):
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            self.bytes_saved += row[1]
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def set(self, key: str, model: str, response: str):
+        """写入缓存，写入后执行一次淘汰"""
+        raw = response.encode("utf-8")
+        data = zlib.compress(raw)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, raw_size, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, model, data, len(raw), len(data), now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def evict(self):
+        """按过期时间和总大小淘汰缓存"""
+        with self._lock:
+            self._evict(time.time())
+            self._conn.commit()
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return CacheStats(self.hits, self.misses, self.bytes_saved, entries, size)
+
+    def log_stats(self):
+        stats = self.stats
+        logger.info(
+            f"LLM cache | hits: {stats.hits} | misses: {stats.misses} | hit rate: {stats.hit_rate:.1%} | "
+            f"bytes saved: {stats.bytes_saved} | entries: {stats.entries} | size: {stats.size_bytes} bytes"
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self.max_age_seconds is not None and now - created_at > self.max_age_seconds
+
+    def _evict(self, now: float):
+        """调用方需持有锁"""
+        if self.max_age_seconds is not None:
+            self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.max_age_seconds,))
+        if self.max_size_bytes is None:
+            return
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_size_bytes:
+            return
+        # 按最近访问时间从旧到新淘汰，直到总大小满足限制
+        expired_keys = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC"):
+            if total <= self.max_size_bytes:
+                break
+            expired_keys.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", expired_keys)
@@ -6,15 +6,24 @@
 @Desc    : mashenquan, 2023/8/28. Separate the `CostManager` class to support user-level cost accounting.
 """
 
+import json
+import os
 import re
-from typing import NamedTuple
+import threading
+import time
+from pathlib import Path
+from typing import NamedTuple, Optional, Union
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from autostack.common.logs import logger
 from autostack.llm.token_counter import FIREWORKS_GRADE_TOKEN_COSTS, TOKEN_COSTS
 
 
+class BudgetExceededError(Exception):
+    """累计花费达到 max_budget 时抛出"""
+
+
 class Costs(NamedTuple):
     total_prompt_tokens: int
     total_completion_tokens: int
@@ -28,7 +37,7 @@ class CostManager(BaseModel):
     total_prompt_tokens: int = 0
     total_completion_tokens: int = 0
     total_budget: float = 0
-    max_budget: float = 10.0
+    max_budget: float = 0  # <= 0 表示不限制
     total_cost: float = 0
     token_costs: dict[str, dict[str, float]] = TOKEN_COSTS  # different model's token cost
 
@@ -59,6 +68,13 @@ class CostManager(BaseModel):
             f"Current cost: ${cost:.3f}, prompt_tokens: {prompt_tokens}, completion_tokens: {completion_tokens}"
         )
 
+    def check_budget(self):
+        """累计花费达到 max_budget 时抛出 BudgetExceededError，max_budget <= 0 表示不限制"""
+        if 0 < self.max_budget <= self.total_cost:
+            raise BudgetExceededError(
+                f"Total running cost ${self.total_cost:.3f} reached max budget ${self.max_budget:.3f}."
+            )
+
     def get_total_prompt_tokens(self):
         """
         Get the total number of prompt tokens.
@@ -147,3 +163,111 @@ class FireworksCostManager(CostManager):
             f"Total running cost: ${self.total_cost:.4f}"
             f"Current cost: ${cost:.4f}, prompt_tokens: {prompt_tokens}, completion_tokens: {completion_tokens}"
         )
+
+
+class LedgerEntry(BaseModel):
+    """一次 LLM 调用的记录"""
+    timestamp: float = Field(default_factory=time.time)
+    stage: str = ""
+    model: str = ""
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency: float = 0.0
+    cost: float = 0.0
+    cached: bool = False
+
+
+def _percentile(values: list[float], q: float) -> float:
+    """线性插值的百分位数"""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    position = (len(values) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+class CostLedger:
+    """
+    LLM 调用账本，可按阶段汇总耗时和花费
+    指定 path 时每次调用以一行 json 追加写入文件，否则只记录在内存中
+    """
+
+    def __init__(self, path: Union[str, Path] = None):
+        self.path = Path(path) if path else None
+        self.entries: list[LedgerEntry] = []  # 当前进程内的记录
+        self._lock = threading.Lock()
+
+    def record(self, entry: LedgerEntry):
+        with self._lock:
+            self.entries.append(entry)
+            if self.path is None:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(entry.model_dump_json() + "\n")
+
+    def load(self) -> list[LedgerEntry]:
+        """读取账本文件中的全部记录，没有账本文件时返回内存中的记录"""
+        if self.path is None:
+            return list(self.entries)
+        if not self.path.exists():
+            return []
+        with open(self.path, "r", encoding="utf-8") as f:
+            return [LedgerEntry(**json.loads(line)) for line in f if line.strip()]
+
+    def report(self, entries: Optional[list[LedgerEntry]] = None) -> dict[str, dict]:
+        """
+        按阶段汇总
+        :param entries: 参与汇总的记录，默认为当前进程内的记录
+        :return: {stage: {calls, cached, prompt_tokens, completion_tokens, cost, latency_p50, latency_p95}}
+        """
+        entries = self.entries if entries is None else entries
+        stages: dict[str, list[LedgerEntry]] = {}
+        for entry in entries:
+            stages.setdefault(entry.stage or "default", []).append(entry)
+
+        report = {}
+        for stage, stage_entries in stages.items():
+            latencies = [entry.latency for entry in stage_entries if not entry.cached]
+            report[stage] = {
+                "calls": len(stage_entries),
+                "cached": sum(1 for entry in stage_entries if entry.cached),
+                "prompt_tokens": sum(entry.prompt_tokens for entry in stage_entries),
+                "completion_tokens": sum(entry.completion_tokens for entry in stage_entries),
+                "cost": sum(entry.cost for entry in stage_entries),
+                "latency_p50": _percentile(latencies, 0.5),
+                "latency_p95": _percentile(latencies, 0.95),
+            }
+        return report
+
+    def format_report(self, entries: Optional[list[LedgerEntry]] = None) -> str:
+        lines = [f"{'stage':<24}{'calls':>7}{'cached':>8}{'prompt':>10}{'completion':>12}{'cost($)':>10}"
+                 f"{'p50(s)':>9}{'p95(s)':>9}"]
+        for stage, item in self.report(entries).items():
+            lines.append(
+                f"{stage:<24}{item['calls']:>7}{item['cached']:>8}{item['prompt_tokens']:>10}"
+                f"{item['completion_tokens']:>12}{item['cost']:>10.4f}{item['latency_p50']:>9.2f}{item['latency_p95']:>9.2f}"
+            )
+        return "\n".join(lines)
+
+
+_default_cost_manager: Optional[CostManager] = None
+_default_ledger: Optional[CostLedger] = None
+
+
+def get_default_cost_manager() -> CostManager:
+    """进程内共享的成本管理器，预算读取环境变量 LLM_MAX_BUDGET，未设置时不限制"""
+    global _default_cost_manager
+    if _default_cost_manager is None:
+        _default_cost_manager = CostManager(max_budget=float(os.getenv("LLM_MAX_BUDGET") or 0))
+    return _default_cost_manager
+
+
+def get_default_ledger() -> CostLedger:
+    """进程内共享的账本，设置环境变量 LLM_LEDGER_PATH 时写入该文件，否则只记录在内存中"""
+    global _default_ledger
+    if _default_ledger is None:
+        _default_ledger = CostLedger(os.getenv("LLM_LEDGER_PATH"))
+    return _default_ledger
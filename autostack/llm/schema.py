@@ -1,5 +1,6 @@
 from datetime import datetime
 import uuid
+from typing import Optional
 from enum import Enum
 from pydantic import (
     BaseModel,
@@ -44,6 +45,8 @@ class Action(BaseModel):
     type: ActionType = Field(default=ActionType.FILE)
     content: str
     result: str
+    path: str = ""  # 文件类型的 Action 写入的本机路径
+    content_hash: str = ""  # 文件内容的 sha256，用于断点续跑时判断文件是否已写入
 
     def to_dict(self):
         return {
@@ -56,7 +59,7 @@ class Action(BaseModel):
 class Task(BaseModel):
     task_id: str = ""
     task_desc: str = ""  # 具体的任务描述
-    result: list[Action] = ""
+    result: list[Action] = []
     is_success: bool = False
     is_finished: bool = False
 
@@ -101,10 +104,41 @@ class Plan(BaseModel):
     is_finished: bool = False
     is_refined: bool = False
 
+    # task_id -> Task 的索引，以及第一个未完成任务的位置（之前的任务都已完成）
+    _task_index: dict[str, Task] = PrivateAttr(default_factory=dict)
+    _indexed_tasks: Optional[list[Task]] = PrivateAttr(default=None)
+    _indexed_len: int = PrivateAttr(default=0)
+    _cursor: int = PrivateAttr(default=0)
+
+    def model_post_init(self, __context):
+        self._reindex()
+
+    def _reindex(self):
+        """重建索引，tasks 被整体替换或在 Plan 之外被修改时调用"""
+        self._task_index = {task.task_id: task for task in self.tasks}
+        self._indexed_tasks = self.tasks
+        self._indexed_len = len(self.tasks)
+        self._cursor = 0
+        self._advance_cursor()
+
+    def _ensure_index(self):
+        # 只做 O(1) 的检查：列表被替换或长度变化时重建
+        if self._indexed_tasks is not self.tasks or self._indexed_len != len(self.tasks):
+            self._reindex()
+
+    def _advance_cursor(self):
+        while self._cursor < len(self.tasks) and self.tasks[self._cursor].is_finished:
+            self._cursor += 1
+
     @property
     def current_task(self) -> Task:
         """ 根据current_task_id 在任务列表中查找当前任务 """
-        return next((task for task in self.tasks if task.task_id == self.current_task_id), None)
+        self._ensure_index()
+        return self._task_index.get(self.current_task_id)
+
+    def get_task(self, task_id: str) -> Optional[Task]:
+        self._ensure_index()
+        return self._task_index.get(task_id)
 
     def add_tasks(self, tasks: list[Task]):
         """
@@ -117,15 +151,10 @@ class Plan(BaseModel):
         """
         if not tasks:
             return
-
-        # Topologically sort the new tasks to ensure correct dependency order
-        new_tasks = tasks
-
-        if not self.tasks:
-            # If there are no existing tasks, set the new tasks as the current tasks
-            self.tasks = new_tasks
-        else:
-            self.tasks.append(*new_tasks)
+        self._ensure_index()
+        self.tasks.extend(tasks)
+        self._task_index.update((task.task_id, task) for task in tasks)
+        self._indexed_len = len(self.tasks)
         self._update_current_task()
 
     def add_task(self, new_task: Task):
@@ -138,16 +167,19 @@ class Plan(BaseModel):
         Returns:
             None
         """
-        self.tasks.append(new_task)
-        self._update_current_task()
+        self.add_tasks([new_task])
 
     def _update_current_task(self):
-        current_task_id = ""
-        for task in self.tasks:
-            if not task.is_finished:
-                current_task_id = task.task_id
-                break
-        self.current_task_id = current_task_id  # all tasks finished
+        """
+        当前任务为第一个未完成的任务，游标只向后移动
+        已完成的任务重新变为未完成（Task.reset）后需要调用 _reindex
+        """
+        self._ensure_index()
+        self._advance_cursor()
+        if self._cursor < len(self.tasks):
+            self.current_task_id = self.tasks[self._cursor].task_id
+        else:
+            self.current_task_id = ""  # all tasks finished
 
     def finish_current_task(self):
         """Finish current task, set Task.is_finished=True, set current task to next task"""
@@ -161,12 +193,14 @@ class Plan(BaseModel):
         Returns:
             list[Task]: list of finished tasks
         """
-        return [task for task in self.tasks if task.is_finished]
+        self._ensure_index()
+        return self.tasks[:self._cursor] + [task for task in self.tasks[self._cursor:] if task.is_finished]
 
     # 获取未完成的任务列表
     def get_unfinished_tasks(self) -> list[Task]:
         """return all unfinished tasks in correct linearized order"""
-        return [task for task in self.tasks if not task.is_finished]
+        self._ensure_index()
+        return [task for task in self.tasks[self._cursor:] if not task.is_finished]
 
 
 if __name__ == "__main__":
@@ -10,8 +10,15 @@ ref3: https://github.com/Significant-Gravitas/Auto-GPT/blob/master/autogpt/llm/t
 ref4: https://github.com/hwchase17/langchain/blob/master/langchain/chat_models/openai.py
 ref5: https://ai.google.dev/models/gemini
 """
+import math
+import re
+from functools import lru_cache
+from typing import Optional
+
 import tiktoken
 
+from autostack.common.logs import logger
+
 TOKEN_COSTS = {
     "gpt-3.5-turbo": {"prompt": 0.0015, "completion": 0.002},
     "gpt-3.5-turbo-0301": {"prompt": 0.0015, "completion": 0.002},
@@ -199,42 +206,83 @@ TOKEN_MAX = {
 }
 
 
-def count_message_tokens(messages, model="gpt-3.5-turbo-0125"):
-    """Return the number of tokens used by a list of messages."""
+# 会随时间更新的模型别名，按固定版本计算 token
+MODEL_ALIASES = {
+    "gpt-3.5-turbo": "gpt-3.5-turbo-0125",
+    "gpt-4": "gpt-4-0613",
+}
+
+TOKENS_PER_MESSAGE_3_MODELS = {
+    "gpt-3.5-turbo-0613",
+    "gpt-3.5-turbo-16k-0613",
+    "gpt-35-turbo",
+    "gpt-35-turbo-16k",
+    "gpt-3.5-turbo-16k",
+    "gpt-3.5-turbo-1106",
+    "gpt-3.5-turbo-0125",
+    "gpt-4-0314",
+    "gpt-4-32k-0314",
+    "gpt-4-0613",
+    "gpt-4-32k-0613",
+    "gpt-4-turbo-preview",
+    "gpt-4-0125-preview",
+    "gpt-4-1106-preview",
+    "gpt-4-vision-preview",
+    "gpt-4-1106-vision-preview",
+    "gpt-4o",
+    "gpt-4o-mini",
+}
+
+CJK_PATTERN = re.compile(r"[\u3000-\u303f\u3400-\u4dbf\u4e00-\u9fff\uff00-\uffef]")
+
+
+@lru_cache(maxsize=None)
+def _warn_once(message: str):
+    logger.warning(message)
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str) -> tiktoken.Encoding:
+    """
+    获取模型对应的 tiktoken 编码，结果按模型缓存
+    编码文件无法加载时（例如离线环境）抛出异常，失败不缓存，下次调用重新加载
+    """
     try:
-        encoding = tiktoken.encoding_for_model(model)
+        return tiktoken.encoding_for_model(model)
     except KeyError:
-        print("Warning: model not found. Using cl100k_base encoding.")
-        encoding = tiktoken.get_encoding("cl100k_base")
-    if model in {
-        "gpt-3.5-turbo-0613",
-        "gpt-3.5-turbo-16k-0613",
-        "gpt-35-turbo",
-        "gpt-35-turbo-16k",
-        "gpt-3.5-turbo-16k",
-        "gpt-3.5-turbo-1106",
-        "gpt-3.5-turbo-0125",
-        "gpt-4-0314",
-        "gpt-4-32k-0314",
-        "gpt-4-0613",
-        "gpt-4-32k-0613",
-        "gpt-4-turbo-preview",
-        "gpt-4-0125-preview",
-        "gpt-4-1106-preview",
-        "gpt-4-vision-preview",
-        "gpt-4-1106-vision-preview",
-    }:
+        _warn_once(f"Warning: model {model} not found. Using cl100k_base encoding.")
+    return tiktoken.get_encoding("cl100k_base")
+
+
+def _get_encoding_or_none(model: str) -> Optional[tiktoken.Encoding]:
+    """编码无法加载时返回 None，调用方退化为近似计数"""
+    try:
+        return get_encoding(model)
+    except Exception as e:
+        _warn_once(f"Warning: failed to load encoding for {model}: {e}. Using approximate token count.")
+        return None
+
+
+def count_approximate_tokens(string: str) -> int:
+    """
+    快速估算 token 数，不做编码，用于预算的预检查
+    中日韩字符按每字 1 个 token，其余字符按每 3 个字符 1 个 token，通常略高于实际值
+    """
+    cjk_count = len(CJK_PATTERN.findall(string))
+    return cjk_count + math.ceil((len(string) - cjk_count) / 3)
+
+
+def count_message_tokens(messages, model="gpt-3.5-turbo-0125", approximate: bool = False):
+    """Return the number of tokens used by a list of messages."""
+    if model in MODEL_ALIASES:
+        _warn_once(f"Warning: {model} may update over time. Returning num tokens assuming {MODEL_ALIASES[model]}.")
+        model = MODEL_ALIASES[model]
+    if model in TOKENS_PER_MESSAGE_3_MODELS:
         tokens_per_message = 3  # # every reply is primed with <|start|>assistant<|message|>
         tokens_per_name = 1
     elif model == "gpt-3.5-turbo-0301":
         tokens_per_message = 4  # every message follows <|start|>{role/name}\n{content}<|end|>\n
         tokens_per_name = -1  # if there's a name, the role is omitted
-    elif "gpt-3.5-turbo" == model:
-        print("Warning: gpt-3.5-turbo may update over time. Returning num tokens assuming gpt-3.5-turbo-0125.")
-        return count_message_tokens(messages, model="gpt-3.5-turbo-0125")
-    elif "gpt-4" == model:
-        print("Warning: gpt-4 may update over time. Returning num tokens assuming gpt-4-0613.")
-        return count_message_tokens(messages, model="gpt-4-0613")
     elif "open-llm-model" == model:
         """
         For self-hosted open_llm api, they include lots of different models. The message tokens calculation is
@@ -248,6 +296,7 @@ def count_message_tokens(messages, model="gpt-3.5-turbo-0125"):
             f"See https://cookbook.openai.com/examples/how_to_count_tokens_with_tiktoken "
             f"for information on how messages are converted to tokens."
         )
+    contents = []
     num_tokens = 0
     for message in messages:
         num_tokens += tokens_per_message
@@ -258,32 +307,53 @@ def count_message_tokens(messages, model="gpt-3.5-turbo-0125"):
                 for item in value:
                     if isinstance(item, dict) and item.get("type") in ["text"]:
                         content = item.get("text", "")
-            num_tokens += len(encoding.encode(content))
+            contents.append(content)
             if key == "name":
                 num_tokens += tokens_per_name
+    num_tokens += sum(count_batch(contents, model, approximate=approximate))
     num_tokens += 3  # every reply is primed with <|start|>assistant<|message|>
     return num_tokens
 
 
-def count_string_tokens(string: str, model_name: str) -> int:
+def count_string_tokens(string: str, model_name: str, approximate: bool = False) -> int:
     """
     Returns the number of tokens in a text string.
 
     Args:
         string (str): The text string.
         model_name (str): The name of the encoding to use. (e.g., "gpt-3.5-turbo")
+        approximate (bool): Estimate the count without encoding.
 
     Returns:
         int: The number of tokens in the text string.
     """
-    try:
-        encoding = tiktoken.encoding_for_model(model_name)
-    except KeyError:
-        print("Warning: model not found. Using cl100k_base encoding.")
-        encoding = tiktoken.get_encoding("cl100k_base")
+    encoding = None if approximate else _get_encoding_or_none(model_name)
+    if encoding is None:
+        return count_approximate_tokens(string)
     return len(encoding.encode(string))
 
 
+def count_batch(strings: list[str], model: str, approximate: bool = False, num_threads: int = 8) -> list[int]:
+    """
+    Returns the number of tokens of each string, encoding them in parallel.
+
+    Args:
+        strings (list[str]): The text strings.
+        model (str): The model name.
+        approximate (bool): Estimate the count without encoding.
+        num_threads (int): Number of threads used by tiktoken's encode_batch.
+
+    Returns:
+        list[int]: The number of tokens of each string.
+    """
+    encoding = None if approximate else _get_encoding_or_none(model)
+    if encoding is None:
+        return [count_approximate_tokens(string) for string in strings]
+    if len(strings) <= 1:
+        return [len(encoding.encode(string)) for string in strings]
+    return [len(tokens) for tokens in encoding.encode_batch(strings, num_threads=num_threads)]
+
+
 def get_max_completion_tokens(messages: list[dict], model: str, default: int) -> int:
     """Calculate the maximum number of completion tokens for a given model and list of messages.
 
@@ -1,31 +1,60 @@
 import json
 from autostack.llm import LLM
+from autostack.llm.llm_cost import get_default_ledger
 from autostack.project import init_project, load_project
 from autostack.common import logger
-from autostack.utils import MarkdownUtil, PromptUtil
-from autostack.container import DockerContainer
+from autostack.utils import MarkdownUtil, PromptUtil, TemplateRegistry
+from autostack.container import DockerContainer, ContainerPool, ContainerRegistry, CommandResult, \
+    CommandResultClassifier, NodeModulesCache, npm_install_command, remove_orphans, CONTAINER_LABEL, POOL_LABEL
 
 llm = LLM()
+# 预热容器池，在等待用户输入和生成项目期间启动容器
+container_pool = ContainerPool()
+node_modules_cache = NodeModulesCache()
 
 
-def run_command(container: DockerContainer, command: str) -> str:
-    """运行命令"""
-    res_log = container.execute_command(command)
+def llm_judge(command: str, log: str) -> bool:
+    """无法通过规则判断时，询问 LLM 命令是否执行成功"""
     isSuccess_prompt = PromptUtil.prompt_handle("command_is_exec_success.prompt", {
         "command": command,
-        "result": res_log
+        "result": log
     })
-    response = llm.completion(isSuccess_prompt)
-    if json.loads(MarkdownUtil.parse_code_block(response, "json")[0])["result"] == "fail":
-        logger.error(res_log)
+    response = llm.completion(isSuccess_prompt, stage="command_is_exec_success")
+    return json.loads(MarkdownUtil.parse_code_block(response, "json")[0])["result"] != "fail"
+
+
+command_classifier = CommandResultClassifier(llm_judge=llm_judge)
+
+
+def check_result(result: CommandResult) -> str:
+    """检查命令执行结果，失败时退出"""
+    if not command_classifier.classify(result).success:
+        logger.error(result.output)
         exit()
+    return result.output
+
+
+def run_command(container: DockerContainer, command: str) -> str:
+    """运行命令"""
+    return check_result(container.execute(command))
 
 
 def initialize_project(project_name: str, project_desc: str):
-    """初始化项目"""
-    current_project = init_project(project_name, project_desc)
+    """初始化项目，模板复制完成后即在容器中安装依赖，与后续的 LLM 生成阶段并行"""
+    install = {}
+
+    def start_install(project):
+        # 依赖相同的项目直接复用已缓存的 node_modules，npm install 只做校验
+        node_modules_cache.restore(project.project_home)
+        container = ContainerRegistry.get(project.project_home, pool=container_pool)
+        install["future"] = container.execute_async(npm_install_command())
+
+    current_project = init_project(project_name, project_desc, on_template_ready=start_install)
     current_project.save()
-    container = DockerContainer(current_project.project_home)
+    container = ContainerRegistry.get(current_project.project_home, pool=container_pool)
+    # 任何阶段失败时 init_project 都会抛出异常，能执行到这里说明 on_template_ready 已经开始安装
+    check_result(install["future"].result())
+    node_modules_cache.save(current_project.project_home)
 
     return current_project, container
 
@@ -33,34 +62,62 @@ def initialize_project(project_name: str, project_desc: str):
 def load_existing_project(project_name_by_snake: str):
     """加载已有项目"""
     current_project = load_project(project_name_by_snake)
-    container = DockerContainer(current_project.project_home)
+    container = ContainerRegistry.get(current_project.project_home, pool=container_pool)
     return current_project, container
 
 
 def main():
+    TemplateRegistry.preload()
+    # 清理之前异常退出的进程遗留的容器
+    for label in (CONTAINER_LABEL, POOL_LABEL):
+        remove_orphans(label)
+    container_pool.start()
+    try:
+        run()
+    finally:
+        # 删除项目容器和未使用的预热容器
+        ContainerRegistry.release_all()
+        container_pool.shutdown()
+        logger.info(f"命令结果判定统计：{command_classifier.report()}")
+        logger.info(f"LLM 调用统计：\n{get_default_ledger().format_report()}")
+
+
+def run():
     while True:
         choice = input("需要新建项目还是从已有的项目中加载？\n1.新建\n2.加载\n请选择（1-2）：")
         if choice == "1":
             project_name = input("请输入项目名称（中文）：")
             project_desc = input("请输入对该项目的描述（越具体越好）：")
             current_project, container = initialize_project(project_name, project_desc)
-            run_command(container, "npm install --force")
+            build_state = current_project.build_state
+            build_state.mark_done("install")
             run_command(container, "npx prisma format")
             run_command(container, "npx prisma migrate dev --name init")
+            build_state.mark_done("migrate")
             run_command(container, "npm run build")
+            build_state.mark_done("build")
             run_command(container, "npm run start")
             break
         elif choice == "2":
             project_name_by_snake = input("请输入已存在的项目目录名：")
             current_project, container = load_existing_project(project_name_by_snake)
-            choice2 = input("是否需要重新安装依赖？\ny.yes\nn.no\n请选择（y or n）：")
-            if choice2.lower()[0] == "y":
-                run_command(container, "npm install --force")
-            choice2 = input("是否需要重新迁移数据库？\ny.yes\nn.no\n请选择（y or n）：")
-            if choice2.lower()[0] == "y":
+            # 根据构建状态清单只执行输入有变化的步骤
+            build_state = current_project.build_state
+            steps = build_state.needed_steps()
+            if "install" in steps:
+                run_command(container, npm_install_command())
+                build_state.mark_done("install")
+            if "migrate" in steps:
+                # schema 有变化，生成新的迁移并应用
                 run_command(container, "npx prisma format")
                 run_command(container, "npx prisma migrate dev --name init")
-            run_command(container, "npm run build")
+                build_state.mark_done("migrate")
+            else:
+                # 数据库在容器中且没有持久化，每次都是新的空库，已有的迁移总是需要应用（已应用时为空操作）
+                run_command(container, "npx prisma migrate deploy")
+            if "build" in steps:
+                run_command(container, "npm run build")
+                build_state.mark_done("build")
             run_command(container, "npm run start")
             break
         else:
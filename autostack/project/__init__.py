@@ -1,2 +1,5 @@
-from .project import Project, init_project, load_project
-from .module import Module
\ No newline at end of file
+from .project import Project, DatabaseConfig, init_project, load_project
+from .module import Module
+from .pipeline import Pipeline
+from .build_state import BuildState
+from .index_inference import IndexInference
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18
+@Author  : Rex
+@File    : build_state.py
+@Desc    : 记录项目各构建步骤输入文件的哈希，加载已有项目时只执行输入有变化的步骤
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Union
+from autostack.common.logs import logger
+
+BUILD_STATE_FILE = "build_state.json"
+# 各步骤的输入文件（相对项目目录，目录表示其下的全部文件）和产物
+# migrate 只表示迁移文件已按当前 schema 生成；数据库在容器中且不持久化，是否已应用迁移不由这里判断，
+# 加载项目时总是执行 prisma migrate deploy
+BUILD_STEPS = {
+    "install": {"inputs": ["package.json", "package-lock.json"], "output": "node_modules"},
+    "migrate": {"inputs": ["prisma/schema.prisma"], "output": None},
+    "build": {
+        "inputs": ["package.json", "prisma/schema.prisma", "src", "tsconfig.json", "tsconfig.build.json",
+                   "nest-cli.json"],
+        "output": "dist",
+    },
+}
+
+
+class BuildState:
+    """
+    构建状态清单，保存在项目 resources 目录下
+    steps 记录每个步骤上次成功时输入文件的哈希；files 缓存每个文件的 (mtime_ns, size, sha256)，
+    文件未被修改时不必重新读取内容。
+    """
+
+    def __init__(self, project_home: Union[Path, str], resources: Union[Path, str]):
+        self.project_home = Path(project_home)
+        self.path = Path(resources) / BUILD_STATE_FILE
+        self.steps: dict[str, str] = {}
+        self.files: dict[str, list] = {}
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                self.steps, self.files = data.get("steps", {}), data.get("files", {})
+            except (ValueError, AttributeError) as e:
+                logger.warning(f"构建状态文件损坏，将重新构建: {e}")
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"steps": self.steps, "files": self.files}, indent=2), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def _file_hash(self, relative: str) -> str:
+        path = self.project_home / relative
+        stat = path.stat()
+        cached = self.files.get(relative)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        self.files[relative] = [stat.st_mtime_ns, stat.st_size, digest]
+        return digest
+
+    def _input_files(self, inputs: list[str]) -> list[str]:
+        files = []
+        for item in inputs:
+            path = self.project_home / item
+            if path.is_file():
+                files.append(item)
+            elif path.is_dir():
+                files.extend(p.relative_to(self.project_home).as_posix() for p in path.rglob("*") if p.is_file())
+        return sorted(set(files))
+
+    def compute(self, step: str) -> str:
+        """计算步骤输入文件的整体哈希"""
+        digest = hashlib.sha256()
+        for relative in self._input_files(BUILD_STEPS[step]["inputs"]):
+            digest.update(f"{relative}\0{self._file_hash(relative)}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+    def is_needed(self, step: str) -> bool:
+        output = BUILD_STEPS[step]["output"]
+        if output and not (self.project_home / output).exists():
+            return True
+        return self.steps.get(step) != self.compute(step)
+
+    def needed_steps(self) -> list[str]:
+        """需要执行的步骤，按 BUILD_STEPS 的顺序"""
+        steps = [step for step in BUILD_STEPS if self.is_needed(step)]
+        logger.info(f"需要执行的构建步骤：{steps or '无'}")
+        return steps
+
+    def mark_done(self, step: str):
+        """步骤成功后记录当前输入的哈希"""
+        self.steps[step] = self.compute(step)
+        self.save()
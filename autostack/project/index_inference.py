@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18
+@Author  : Rex
+@File    : index_inference.py
+@Desc    : 根据 prisma schema 的字段推断索引，在 prisma migrate 之前写入 schema.prisma
+"""
+import re
+from pathlib import Path
+from typing import NamedTuple, Union
+from autostack.common.logs import logger
+from autostack.utils import FileUtil, PrismaParser, PrismaParseError
+from autostack.utils.prisma_parser import PrismaAttribute, PrismaModel, PrismaSchema
+
+# 状态字段名
+STATUS_FIELD_PATTERN = re.compile(r"^(status|state|type|kind|category)$", re.IGNORECASE)
+# 时间字段名，例如 createdAt、created_at、publishedAt
+TIMESTAMP_FIELD_PATTERN = re.compile(r"^(created|updated|published|deleted)_?at$", re.IGNORECASE)
+# 常按值查找单条记录的字段名
+LOOKUP_FIELD_PATTERN = re.compile(r"^(email|username|user_name|slug)$", re.IGNORECASE)
+INDEX_FIELDS_PATTERN = re.compile(r"\[([^\]]*)\]")
+
+
+class InferredIndex(NamedTuple):
+    model: str
+    fields: tuple[str, ...]
+    reason: str
+
+    @property
+    def statement(self) -> str:
+        return f"@@index([{', '.join(self.fields)}])"
+
+
+class IndexInference:
+    """
+    索引推断，只添加 @@index，不添加 @@unique 等改变数据约束的属性：
+        外键        @relation(fields: [...]) 的字段，关联查询和级联删除按外键查找
+        查找        email、username、slug 等字符串字段，业务代码常按它们查找单条记录（例如登录）
+        状态/枚举    enum 字段和 status、type 等字段，业务代码常按它们筛选
+        时间        createdAt 等时间字段，业务代码常按时间排序或按范围查询
+    生成的模板只按主键查找，分页按 id 排序，主键已有索引；后三类索引供 Programmer 之后实现的业务查询使用。
+    已被现有索引覆盖（为其前缀）的字段不再添加。
+    """
+
+    @staticmethod
+    def index_fields(attribute: PrismaAttribute) -> tuple[str, ...]:
+        """@@index([a, b(sort: Desc)], map: "x") -> (a, b)"""
+        match = INDEX_FIELDS_PATTERN.search(attribute.args)
+        if not match:
+            return ()
+        return tuple(re.match(r"\w+", item.strip()).group()
+                     for item in match.group(1).split(",") if re.match(r"\w+", item.strip()))
+
+    @staticmethod
+    def existing_indexes(model: PrismaModel) -> list[tuple[str, ...]]:
+        indexes = [(field.name,) for field in model.fields
+                   if field.get_attribute("id") or field.get_attribute("unique")]
+        indexes.extend(IndexInference.index_fields(attribute) for attribute in model.attributes
+                       if attribute.name in ("id", "index", "unique"))
+        return indexes
+
+    @staticmethod
+    def infer_model(schema: PrismaSchema, model: PrismaModel) -> list[InferredIndex]:
+        existing = IndexInference.existing_indexes(model)
+        inferred: list[InferredIndex] = []
+
+        def add(fields: tuple[str, ...], reason: str):
+            # 已有索引以这些字段开头时，可以直接使用已有索引
+            if not fields or any(index[:len(fields)] == fields for index in existing):
+                return
+            existing.append(fields)
+            inferred.append(InferredIndex(model.name, fields, reason))
+
+        for field in model.fields:
+            if field.type == "String" and not field.is_list and LOOKUP_FIELD_PATTERN.match(field.name):
+                add((field.name,), f"常按 {field.name} 查找单条记录")
+        for field in model.fields:
+            relation = field.get_attribute("relation")
+            if relation and schema.is_relation(field):
+                fields = IndexInference.index_fields(relation)
+                add(fields, f"外键，关联 {field.type}（{field.name}）")
+        for field in model.fields:
+            if field.is_list or schema.is_relation(field):
+                continue
+            if schema.get_enum(field.type):
+                add((field.name,), f"枚举 {field.type}，常按其筛选")
+            elif STATUS_FIELD_PATTERN.match(field.name):
+                add((field.name,), "状态字段，常按其筛选")
+            elif field.type == "DateTime" and TIMESTAMP_FIELD_PATTERN.match(field.name):
+                add((field.name,), "时间字段，常按其排序或按范围查询")
+        return inferred
+
+    @staticmethod
+    def infer(schema: PrismaSchema) -> list[InferredIndex]:
+        return [index for model in schema.models for index in IndexInference.infer_model(schema, model)]
+
+    @staticmethod
+    def apply(content: str) -> tuple[str, list[InferredIndex]]:
+        """
+        将推断的索引写入 schema 内容，插入在对应 model 的结束大括号之前
+        :return: (新的 schema 内容, 添加的索引)
+        """
+        indexes = IndexInference.infer(PrismaParser.parse(content))
+        if not indexes:
+            return content, []
+        by_model: dict[str, list[InferredIndex]] = {}
+        for index in indexes:
+            by_model.setdefault(index.model, []).append(index)
+
+        lines, output, current = content.splitlines(), [], None
+        for line in lines:
+            code, _ = PrismaParser.split_comment(line.strip())
+            match = re.match(r"^model\s+(\w+)\s*\{$", code)
+            if match:
+                current = match.group(1)
+            elif code == "}" and current is not None:
+                if current in by_model:
+                    output.append("")
+                    output.extend(f"  {index.statement} // {index.reason}" for index in by_model[current])
+                current = None
+            output.append(line)
+        return "\n".join(output) + ("\n" if content.endswith("\n") else ""), indexes
+
+    @staticmethod
+    def apply_file(schema_path: Union[Path, str]) -> list[InferredIndex]:
+        """推断并写入 schema.prisma，解析失败时不修改文件"""
+        content = FileUtil.read_file(schema_path)
+        try:
+            content, indexes = IndexInference.apply(content)
+        except PrismaParseError as e:
+            logger.warning(f"prisma schema 解析失败，跳过索引推断: {e}")
+            return []
+        for index in indexes:
+            logger.info(f"添加索引 {index.model} {index.statement}: {index.reason}")
+        if indexes:
+            FileUtil.write_file(schema_path, content)
+        return indexes
@@ -1,6 +1,6 @@
 import os
 from typing import List, Optional, Union
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class Attribute(BaseModel):
@@ -75,6 +75,8 @@ class Module(BaseModel):
     created: Optional[bool] = False  # 模块是否已经创建
     # 模块接口列表
     apis: List[ModuleApi] = []
+    # 查询缓存的过期时间（秒），0 表示不缓存，默认取环境变量 MODULE_CACHE_TTL
+    cache_ttl: int = Field(default_factory=lambda: int(os.getenv("MODULE_CACHE_TTL", "0")))
 
     @staticmethod
     def get_schema():
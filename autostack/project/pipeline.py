@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18
+@Author  : Rex
+@File    : pipeline.py
+@Desc    : 按依赖关系并发执行的阶段调度器，输出各阶段耗时和关键路径
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Iterable, NamedTuple, Optional
+from autostack.common.logs import logger
+
+
+class Stage(NamedTuple):
+    name: str
+    func: Callable[[dict[str, Any]], Any]  # 参数为已完成阶段的结果 {阶段名: 结果}
+    deps: tuple[str, ...]
+
+
+class StageTiming(NamedTuple):
+    start: float  # 相对流水线开始的秒数
+    end: float
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class Pipeline:
+    """
+    阶段依赖图的调度器
+    依赖全部完成的阶段立即提交到线程池执行，任一阶段失败时不再提交新的阶段，等待已提交的阶段结束后抛出异常。
+    """
+
+    def __init__(self, name: str = "pipeline", max_workers: Optional[int] = None):
+        self.name = name
+        self.max_workers = max_workers
+        self.stages: dict[str, Stage] = {}
+        self.results: dict[str, Any] = {}
+        self.timings: dict[str, StageTiming] = {}
+        self.wall_time = 0.0
+
+    def add(self, name: str, func: Callable[[dict[str, Any]], Any], deps: Iterable[str] = ()) -> "Pipeline":
+        if name in self.stages:
+            raise ValueError(f"阶段 {name} 已存在")
+        self.stages[name] = Stage(name, func, tuple(deps))
+        return self
+
+    def _validate(self):
+        for stage in self.stages.values():
+            for dep in stage.deps:
+                if dep not in self.stages:
+                    raise ValueError(f"阶段 {stage.name} 依赖的 {dep} 不存在")
+        # 拓扑排序检查环
+        visited, visiting = set(), set()
+
+        def visit(name):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"阶段依赖存在环: {name}")
+            visiting.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    def run(self) -> dict[str, Any]:
+        """执行全部阶段，返回 {阶段名: 结果}"""
+        self._validate()
+        pending = dict(self.stages)
+        begin = time.perf_counter()
+        starts: dict[str, float] = {}
+        error: Optional[BaseException] = None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name) as executor:
+            running = {}
+
+            def submit_ready():
+                for name, stage in list(pending.items()):
+                    if all(dep in self.results for dep in stage.deps):
+                        del pending[name]
+                        starts[name] = time.perf_counter() - begin
+                        running[executor.submit(stage.func, self.results)] = name
+
+            submit_ready()
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    self.timings[name] = StageTiming(starts[name], time.perf_counter() - begin)
+                    if future.exception() is not None:
+                        logger.error(f"阶段 {name} 执行失败: {future.exception()}")
+                        error = error or future.exception()
+                    else:
+                        self.results[name] = future.result()
+                if error is None:
+                    submit_ready()
+
+        self.wall_time = time.perf_counter() - begin
+        logger.info(self.format_report())
+        if error is not None:
+            raise error
+        return self.results
+
+    def critical_path(self) -> tuple[list[str], float]:
+        """
+        关键路径：按阶段耗时计算的最长依赖链
+        :return: (阶段名列表, 总耗时)
+        """
+        longest: dict[str, tuple[float, list[str]]] = {}
+
+        def visit(name) -> tuple[float, list[str]]:
+            if name not in longest:
+                best = max((visit(dep) for dep in self.stages[name].deps if dep in self.timings),
+                           key=lambda item: item[0], default=(0.0, []))
+                longest[name] = (best[0] + self.timings[name].duration, best[1] + [name])
+            return longest[name]
+
+        paths = [visit(name) for name in self.timings]
+        if not paths:
+            return [], 0.0
+        total, path = max(paths, key=lambda item: item[0])
+        return path, total
+
+    def format_report(self) -> str:
+        path, total = self.critical_path()
+        lines = [f"[{self.name}] 总耗时 {self.wall_time:.2f}s，关键路径 {total:.2f}s: {' -> '.join(path)}"]
+        for name, timing in sorted(self.timings.items(), key=lambda item: item[1].start):
+            mark = "*" if name in path else " "
+            lines.append(f"{mark} {name:<20}{timing.start:>8.2f}s{timing.end:>8.2f}s{timing.duration:>8.2f}s")
+        return "\n".join(lines)
@@ -1,14 +1,28 @@
 import json
 import uuid
-from typing import List, Optional, Union, Any
+from typing import Any, Callable, List, Optional, Union
 from pathlib import Path
-from pydantic import BaseModel
-from autostack.utils import MarkdownUtil, FileTreeUtil, FileUtil, PromptUtil
+from pydantic import BaseModel, Field
+from autostack.utils import MarkdownUtil, FileTreeUtil, FileUtil, PromptUtil, PrismaParser, PrismaParseError
 from autostack.common.const import DEFAULT_WORKSPACE_ROOT
 from autostack.llm import LLM
 from autostack.common.logs import logger
 from autostack.template_handler import NestTemplateHandler
+from autostack.template_handler.nest_template_handler import DATABASE_POOL_DEFAULTS
 from .module import Module, Entity
+from .pipeline import Pipeline
+from .build_state import BuildState
+from .index_inference import IndexInference
+
+
+class DatabaseConfig(BaseModel):
+    """生成项目的数据库连接池配置，写入项目的 .env"""
+    connection_limit: int = DATABASE_POOL_DEFAULTS["connection_limit"]
+    pool_timeout: int = DATABASE_POOL_DEFAULTS["pool_timeout"]
+    connect_timeout: int = DATABASE_POOL_DEFAULTS["connect_timeout"]
+    statement_timeout: int = DATABASE_POOL_DEFAULTS["statement_timeout"]
+    transaction_max_wait: int = DATABASE_POOL_DEFAULTS["transaction_max_wait"]
+    transaction_timeout: int = DATABASE_POOL_DEFAULTS["transaction_timeout"]
 
 
 # @singleton
@@ -24,6 +38,7 @@ class Project(BaseModel):
     project_home: Optional[Path] = None
     resources: Optional[Path] = None
     docs: Optional[Path] = None
+    database: DatabaseConfig = Field(default_factory=DatabaseConfig)  # 数据库连接池配置
 
     def __init__(self, **data):
         super().__init__(**data)
@@ -56,12 +71,24 @@ class Project(BaseModel):
     def prisma_schema(self):
         return FileUtil.read_file(self.project_home / "prisma" / "schema.prisma")
 
+    @property
+    def build_state(self) -> BuildState:
+        """构建状态清单，用于判断依赖安装、数据库迁移、编译是否需要重新执行"""
+        return BuildState(self.project_home, self.resources)
+
     def add_module(self, module: Module):
         """添加模块到项目"""
         NestTemplateHandler.create_module(self.project_home, module.serialize)
         module.created = True
         self.modules.append(module)
 
+    def add_modules(self, modules: List[Module]):
+        """批量添加模块到项目"""
+        NestTemplateHandler.create_modules(self.project_home, [module.serialize for module in modules])
+        for module in modules:
+            module.created = True
+        self.modules.extend(modules)
+
     def update_module_status(self, module_name: str, status: str):
         """更新指定模块的状态"""
         for module in self.modules:
@@ -102,125 +129,171 @@ class Project(BaseModel):
         self.save()
 
 
-def init_project(project_name: str, project_desc: str, requirement_path: Path = None, modules: List[Module] = None):
+def init_project(project_name: str, project_desc: str, requirement_path: Path = None, modules: List[Module] = None,
+                 on_template_ready: Optional[Callable[["Project"], Any]] = None):
     """
         项目初始化工作：
             1、在默认的工作目录下创建项目文件夹
             2、在项目文件夹下创建docs和resources文件夹
             3、存储用户交互得数据，并使用prompt生成需求文档并存储到resources文件夹下
             4、然后通过project反向序列化得json，传递给项目初始化函数，进行项目初始化
+        各阶段按依赖关系并发执行：
+            snake_name ─> project_prepare ─┬─> prd_save ──> dbdd_save ─┐
+            prd_gen ─────> dbdd_gen ───────┼───────────────────────────┼─> prisma_schema ─┬─> entity_list ─> modules
+                                           └─> template_copy ──────────┘                   └─> prisma_index
+        :param on_template_ready: 模板复制完成后调用（package.json 此后不再变化），例如提前在容器中安装依赖，
+                                  与后续的 LLM 阶段并行执行
     """
     llm = LLM()
     logger.info(f"项目信息：\n项目名称：{project_name}\n项目描述：{project_desc}")
-    # 生成项目名称(用蛇形命名法命名)
-    gen_project_name_by_snake = PromptUtil.prompt_handle("gen_project_name_by_snake.prompt", {
-        "project_name": project_name
-    })
-    project_name_by_snake = llm.completion(gen_project_name_by_snake)
-
-    # 0. 初始化项目
-    logger.info(f" ==================== 开始准备项目:{project_name_by_snake} ====================")
-    project = Project(project_name=project_name,
-                      project_name_by_snake=project_name_by_snake,
-                      project_description=project_desc,
-                      requirement_path=requirement_path,
-                      modules=modules)
-
-    project.modules = modules if modules else []
-
-    # 存储用户的输入数据
-    user_data_content = f'{{"project_name": "{project_name}", "project_desc": "{project_desc}"}}'
-    FileUtil.write_file(project.resources / "user_data" / "user_data.json", user_data_content)
-
-    logger.info("==================== 项目准备完成！====================")
-
-    # 1、需求生成和存储
-
-    logger.info("==================== 开始生成需求文档 ====================")
-
-    gen_prd_prompt = PromptUtil.prompt_handle("gen_prd.prompt", {
-        "project_name": project_name,
-        "project_desc": project_desc
-    })
-    res_prd = llm.completion(gen_prd_prompt)
-    real_prd = MarkdownUtil.parse_code_block(res_prd, "markdown")
-
-    project.requirement_path = project.docs / "prd" / "requirement.md"
-    FileUtil.write_file(project.requirement_path, real_prd[0])
-
-    logger.info("==================== 需求文档生成完成！====================")
-
-    # 2、数据库设计文档生成
-
-    logger.info("==================== 开始生成数据库设计文档 ====================")
-    database_design_prompt = PromptUtil.prompt_handle("gen_dbdd.prompt", {
-        "prd_content": real_prd[0]
-    })
-    # 修改为根据用户描述生成数据库设计文档
-    # database_design_prompt = PromptUtil.prompt_handle("gen_dbdd_without_prd.prompt", {
-    #     "project_desc": project_desc
-    # })
-    database_design_doc = llm.completion(database_design_prompt)
-    database_design = MarkdownUtil.parse_code_block(database_design_doc, "markdown")
-    project.database_design_path = project.docs / "database_design" / "database_design.md"
-    FileUtil.write_file(project.database_design_path, database_design[0])
-
-    logger.info("==================== 数据库设计文档生成完成！====================")
-    # 3、项目初始化
-
-    logger.info("==================== 开始初始化项目 ====================")
-
-    NestTemplateHandler.create_project(project.project_home, project.serialize)
-
-    logger.info("==================== 项目初始化完成！====================")
-
-    # 4、数据库信息生成，prisma schema生成
-
-    logger.info("==================== 开始生成prisma schema ====================")
-
-    database_prompt = PromptUtil.prompt_handle("gen_prisma_schema.prompt", {
-        "database_design_doc": project.database_design_doc,
-        "prisma_schema": project.prisma_schema
-    })
-    database_res = llm.completion(database_prompt)
-    prisma_database = MarkdownUtil.parse_code_block(database_res, "prisma")
-    FileUtil.write_file(project.project_home / "prisma" / "schema.prisma", prisma_database[0])
-
-    logger.info("==================== prisma schema生成完成！====================")
-
-    # 5、依据prisma实体生成entity的json格式
-
-    logger.info("==================== 开始生成entity的json格式 ====================")
-
-    gen_entity_prompt = PromptUtil.prompt_handle("gen_entity_list.prompt", {
-        "schema_prisma": prisma_database[0],
-        "schema_json": Entity.get_schema(),
-    })
-    entity_res = llm.completion(gen_entity_prompt)
-    logger.info("entity_res: \n" + entity_res)
-    entity_str_list = MarkdownUtil.parse_code_block(entity_res, "json")
-    entity_list = [json.loads(entity) for entity in entity_str_list]
-    FileUtil.append_file(
-        project.resources / 'entity' / "entity_list.json",
-        json.dumps(entity_list, ensure_ascii=False, indent=4))
-
-    logger.info("==================== entity的json格式生成完成！====================")
-
-    # 6、将模块添加到项目
-
-    logger.info("==================== 开始添加模块到项目 ====================")
-    for entity in entity_list:
-        # json 格式化
-        module = Module(name=entity["name"],
-                        entity=Entity(name=entity["name"],
-                                      attributes=entity["attributes"],
-                                      description=entity["description"],
-                                      ))
-        project.add_module(module)
-
-    logger.info("==================== 模块添加完成！====================")
 
-    return project
+    def snake_name(results):
+        # 生成项目名称(用蛇形命名法命名)
+        gen_project_name_by_snake = PromptUtil.prompt_handle("gen_project_name_by_snake.prompt", {
+            "project_name": project_name
+        })
+        return llm.completion(gen_project_name_by_snake, stage="gen_project_name_by_snake")
+
+    def project_prepare(results):
+        # 0. 初始化项目
+        project_name_by_snake = results["snake_name"]
+        logger.info(f" ==================== 开始准备项目:{project_name_by_snake} ====================")
+        project = Project(project_name=project_name,
+                          project_name_by_snake=project_name_by_snake,
+                          project_description=project_desc,
+                          requirement_path=requirement_path,
+                          modules=modules)
+
+        project.modules = modules if modules else []
+
+        # 存储用户的输入数据
+        user_data_content = f'{{"project_name": "{project_name}", "project_desc": "{project_desc}"}}'
+        FileUtil.write_file(project.resources / "user_data" / "user_data.json", user_data_content)
+
+        logger.info("==================== 项目准备完成！====================")
+        return project
+
+    def prd_gen(results):
+        # 1、需求生成，只依赖用户输入
+        logger.info("==================== 开始生成需求文档 ====================")
+        gen_prd_prompt = PromptUtil.prompt_handle("gen_prd.prompt", {
+            "project_name": project_name,
+            "project_desc": project_desc
+        })
+        res_prd = llm.completion(gen_prd_prompt, stage="gen_prd")
+        return MarkdownUtil.parse_code_block(res_prd, "markdown")[0]
+
+    def prd_save(results):
+        project = results["project_prepare"]
+        project.requirement_path = project.docs / "prd" / "requirement.md"
+        FileUtil.write_file(project.requirement_path, results["prd_gen"])
+        logger.info("==================== 需求文档生成完成！====================")
+
+    def dbdd_gen(results):
+        # 2、数据库设计文档生成
+        logger.info("==================== 开始生成数据库设计文档 ====================")
+        database_design_prompt = PromptUtil.prompt_handle("gen_dbdd.prompt", {
+            "prd_content": results["prd_gen"]
+        })
+        # 修改为根据用户描述生成数据库设计文档
+        # database_design_prompt = PromptUtil.prompt_handle("gen_dbdd_without_prd.prompt", {
+        #     "project_desc": project_desc
+        # })
+        database_design_doc = llm.completion(database_design_prompt, stage="gen_dbdd")
+        return MarkdownUtil.parse_code_block(database_design_doc, "markdown")[0]
+
+    def dbdd_save(results):
+        project = results["project_prepare"]
+        project.database_design_path = project.docs / "database_design" / "database_design.md"
+        FileUtil.write_file(project.database_design_path, results["dbdd_gen"])
+        logger.info("==================== 数据库设计文档生成完成！====================")
+
+    def template_copy(results):
+        # 3、项目初始化，只依赖项目名称，与文档生成并行
+        project = results["project_prepare"]
+        logger.info("==================== 开始初始化项目 ====================")
+        NestTemplateHandler.create_project(project.project_home, project.serialize)
+        logger.info("==================== 项目初始化完成！====================")
+
+    def template_ready(results):
+        if on_template_ready:
+            on_template_ready(results["project_prepare"])
+
+    def prisma_schema(results):
+        # 4、数据库信息生成，prisma schema生成
+        project = results["project_prepare"]
+        logger.info("==================== 开始生成prisma schema ====================")
+        database_prompt = PromptUtil.prompt_handle("gen_prisma_schema.prompt", {
+            "database_design_doc": results["dbdd_gen"],
+            "prisma_schema": project.prisma_schema
+        })
+        database_res = llm.completion(database_prompt, stage="gen_prisma_schema")
+        prisma_database = MarkdownUtil.parse_code_block(database_res, "prisma")
+        FileUtil.write_file(project.project_home / "prisma" / "schema.prisma", prisma_database[0])
+        logger.info("==================== prisma schema生成完成！====================")
+        return prisma_database[0]
+
+    def prisma_index(results):
+        # 4.1、推断索引写入 schema.prisma，在 prisma migrate 之前完成
+        project = results["project_prepare"]
+        return IndexInference.apply_file(project.project_home / "prisma" / "schema.prisma")
+
+    def entity_list(results):
+        # 5、依据prisma实体生成entity的json格式，优先本地解析，解析失败时使用 LLM
+        project = results["project_prepare"]
+        logger.info("==================== 开始生成entity的json格式 ====================")
+        try:
+            entities = PrismaParser.to_entities(results["prisma_schema"])
+        except PrismaParseError as e:
+            logger.warning(f"prisma schema 解析失败，使用 LLM 生成实体: {e}")
+            entities = []
+        if not entities:
+            gen_entity_prompt = PromptUtil.prompt_handle("gen_entity_list.prompt", {
+                "schema_prisma": results["prisma_schema"],
+                "schema_json": Entity.get_schema(),
+            })
+            entity_res = llm.completion(gen_entity_prompt, stage="gen_entity_list")
+            logger.info("entity_res: \n" + entity_res)
+            entity_str_list = MarkdownUtil.parse_code_block(entity_res, "json")
+            entities = [json.loads(entity) for entity in entity_str_list]
+        FileUtil.append_file(
+            project.resources / 'entity' / "entity_list.json",
+            json.dumps(entities, ensure_ascii=False, indent=4))
+        logger.info("==================== entity的json格式生成完成！====================")
+        return entities
+
+    def add_modules(results):
+        # 6、将模块添加到项目
+        project = results["project_prepare"]
+        logger.info("==================== 开始添加模块到项目 ====================")
+        new_modules = []
+        for entity in results["entity_list"]:
+            # json 格式化
+            module = Module(name=entity["name"],
+                            entity=Entity(name=entity["name"],
+                                          attributes=entity["attributes"],
+                                          description=entity["description"],
+                                          ))
+            new_modules.append(module)
+        project.add_modules(new_modules)
+        logger.info("==================== 模块添加完成！====================")
+
+    pipeline = (
+        Pipeline("init_project")
+        .add("snake_name", snake_name)
+        .add("prd_gen", prd_gen)
+        .add("project_prepare", project_prepare, ["snake_name"])
+        .add("prd_save", prd_save, ["project_prepare", "prd_gen"])
+        .add("dbdd_gen", dbdd_gen, ["prd_gen"])
+        .add("dbdd_save", dbdd_save, ["project_prepare", "dbdd_gen"])
+        .add("template_copy", template_copy, ["project_prepare"])
+        .add("template_ready", template_ready, ["template_copy"])
+        .add("prisma_schema", prisma_schema, ["dbdd_save", "template_copy"])
+        .add("prisma_index", prisma_index, ["prisma_schema"])
+        .add("entity_list", entity_list, ["prisma_schema"])
+        .add("modules", add_modules, ["entity_list"])
+    )
+    return pipeline.run()["project_prepare"]
 
 
 def load_project(project_name_by_snake: str) -> Project:
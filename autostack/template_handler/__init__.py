@@ -6,3 +6,4 @@
 @File    : __init__.py.py
 """
 from .nest_template_handler import NestTemplateHandler
+from .skeleton import SkeletonManifest
@@ -6,10 +6,13 @@
 @File    : nest_template_handler.py.py
 """
 
+import time
+from concurrent.futures import ThreadPoolExecutor
 from string import Template
 from autostack.utils import NameRuleConverter, FileUtil
 from autostack.common.const import ROOT
 from autostack.common.logs import logger
+from .skeleton import SkeletonManifest
 import os
 
 BACKEND_TEMPLATE_DIR_PATH = ROOT / 'templates/backend/'
@@ -50,6 +53,20 @@ PRISMA_TO_TS = {
 
 PRISMA_FILE_TEMPLATE = "prisma/schema.prisma"
 
+# 数据库连接池配置的默认值，以 DB_ 前缀写入 .env，由 DATABASE_URL 和 PrismaService 引用
+DATABASE_POOL_DEFAULTS = {
+    "connection_limit": 10,  # 连接池大小
+    "pool_timeout": 10,  # 等待空闲连接的超时（秒）
+    "connect_timeout": 5,  # 建立连接的超时（秒）
+    "statement_timeout": 60000,  # 单条 SQL 的执行超时（毫秒），通过 options 传给 postgresql 的 statement_timeout
+    "transaction_max_wait": 2000,  # 交互式事务等待开始的超时（毫秒）
+    "transaction_timeout": 5000,  # 交互式事务的执行超时（毫秒）
+}
+# DATABASE_URL 中的连接池参数
+DATABASE_URL_POOL_PARAMS = ("connection_limit", "pool_timeout", "connect_timeout")
+# 会话启动参数，设置 postgresql 的 statement_timeout，超时后由数据库取消查询（socket_timeout 只是连接层的读超时）
+DATABASE_URL_STATEMENT_TIMEOUT = "&options=-c%20statement_timeout%3D${DB_STATEMENT_TIMEOUT}"
+
 
 class NestTemplateHandler:
 
@@ -108,47 +125,101 @@ class NestTemplateHandler:
         # 更改模板文件内容
         try:
             template = FileUtil.get_template(template_path)
+        except FileNotFoundError:
+            logger.error(f"模板文件未找到: {template_path}")
+            return
+        NestTemplateHandler.__render_template_to_file(target_path, template, info)
+
+    @staticmethod
+    def __render_template_to_file(target_path, template: Template, info):
+        """
+        使用已加载的模板生成文件
+        :param target_path: 目标文件地址
+        :param template: 模板
+        :param info: 实体信息
+        """
+        try:
             content = template.substitute(info)
 
             FileUtil.write_file(target_path, content)
             logger.info(f"文件 {target_path} 生成完成")
-        except FileNotFoundError:
-            logger.error(f"模板文件未找到: {template_path}")
         except KeyError as e:
             logger.error(f"模板变量缺失: {e}")
         except Exception as e:
             logger.error(f"文件 {target_path} 生成失败: {e}")
 
     @staticmethod
-    def create_module(project_path, module_info):
-        """
-        创建模块
-        """
-        # 将实体信息导入prisma
+    def __build_module_info(module_info):
+        """根据模块信息生成模板变量"""
         entity_name = module_info.get("name")
         entity = module_info.get("entity", [])
         attributions = entity.get("attributes", [])
-        info = {
+        return {
             "entity_lower_camel": NameRuleConverter.upper_camel_case_to_lower_camel_case(entity_name),
             "entity_upper_camel": entity_name,
             "entity_lower_underline": NameRuleConverter.to_underline(entity_name),
             "entity_attribute": NestTemplateHandler.__generate_nest_attributions(attributions, validate=False),
             "create_entity_dto_attribute": NestTemplateHandler.__generate_nest_attributions(attributions),
-            "update_entity_dto_attribute": NestTemplateHandler.__generate_nest_attributions(attributions)
+            "update_entity_dto_attribute": NestTemplateHandler.__generate_nest_attributions(attributions),
+            # 查询缓存的过期时间，模块中为秒，模板中为毫秒，0 表示不缓存
+            "cache_ttl": int(module_info.get("cache_ttl") or 0) * 1000,
         }
-        module_dir = project_path / "src" / NameRuleConverter.to_underline(entity_name)
-        # 创建文件
-        for file_type in MODULE_TEMPLATE_PATHS.keys():
-            # 获取模板文件相对路径
-            template_path = MODULE_TEMPLATE_PATHS[file_type]
-            # 更改模板文件名
-            new_file_path_template = Template(template_path[:-6])
-            new_file_path = new_file_path_template.substitute(info)
-            new_file_absolute_path = module_dir / new_file_path
+
+    @staticmethod
+    def create_module(project_path, module_info):
+        """
+        创建模块
+        """
+        NestTemplateHandler.create_modules(project_path, [module_info])
+
+    @staticmethod
+    def create_modules(project_path, modules_info, max_workers=None):
+        """
+        批量创建模块：模板只加载一次，模块文件在线程池中渲染并写入，app.module.ts 只改写一次
+        :param project_path: 项目地址
+        :param modules_info: 模块信息列表
+        :param max_workers: 线程池大小，默认由 ThreadPoolExecutor 决定
+        :return: 各阶段耗时（秒）
+        """
+        timings = {}
+
+        # 1. 加载模板
+        start = time.perf_counter()
+        templates = []
+        for template_path in MODULE_TEMPLATE_PATHS.values():
             template_absolute_path = BACKEND_TEMPLATE_DIR_PATH / "src" / "demo" / template_path
-            NestTemplateHandler.__generate_file_by_template(new_file_absolute_path, template_absolute_path, info)
-        # 添加模块至app.module.ts
-        NestTemplateHandler.__add_module_to_app(project_path, entity_name)
+            try:
+                template = FileUtil.get_template(template_absolute_path)
+            except FileNotFoundError:
+                logger.error(f"模板文件未找到: {template_absolute_path}")
+                continue
+            # 模板文件名去掉 .templ 后缀作为生成文件的路径模板
+            templates.append((Template(template_path[:-6]), template))
+        timings["load_templates"] = time.perf_counter() - start
+
+        # 2. 渲染并写入模块文件
+        start = time.perf_counter()
+
+        def render_module(module_info):
+            info = NestTemplateHandler.__build_module_info(module_info)
+            module_dir = project_path / "src" / info["entity_lower_underline"]
+            for new_file_path_template, template in templates:
+                new_file_path = new_file_path_template.substitute(info)
+                NestTemplateHandler.__render_template_to_file(module_dir / new_file_path, template, info)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(render_module, modules_info))
+        timings["render_and_write"] = time.perf_counter() - start
+
+        # 3. 添加模块至app.module.ts
+        start = time.perf_counter()
+        NestTemplateHandler.__add_modules_to_app(project_path, [module_info.get("name") for module_info in modules_info])
+        timings["patch_app_module"] = time.perf_counter() - start
+
+        logger.info(
+            f"{len(modules_info)} 个模块创建完成，耗时：" + ", ".join(f"{k}={v:.3f}s" for k, v in timings.items())
+        )
+        return timings
 
     @staticmethod
     def create_project(project_path, project_info):
@@ -162,32 +233,17 @@ class NestTemplateHandler:
             os.makedirs(project_path)
             logger.info(f"项目目录创建完成，项目目录：{project_path} ")
 
-        # 复制项目
-        FileUtil.copy_all_files(BACKEND_TEMPLATE_DIR_PATH, project_path)
-
-        # 生成package.json
+        # 按骨架清单一次复制，模块模板、.env 等不会进入项目
         package_info = {
             "project_name": project_name_by_snake,
             "project_description": project_info.get('project_description')
         }
-        NestTemplateHandler.__generate_file_by_template(
-            project_path / "package.json",
-            BACKEND_TEMPLATE_DIR_PATH / "package.json.templ",
-            package_info
-        )
-        # NestTemplateHandler.__generate_file_by_template(
-        #     project_path / "package-lock.json",
-        #     BACKEND_TEMPLATE_DIR_PATH / "package-lock.json.template",
-        #     package_info
-        # )
-        # 文件删除，删除模板文件
-        FileUtil.remove_file(project_path / ".env")
-        FileUtil.remove_dir(project_path / "src/demo")
-        FileUtil.remove_file(project_path / "package.json.templ")
-        # FileUtil.remove_file(project_path / "package-lock.json.template")
-        FileUtil.remove_file(project_path / "src/app.module.ts.templ")
+        SkeletonManifest.get(BACKEND_TEMPLATE_DIR_PATH).materialize(project_path, package_info)
 
         # 生成.env文件
+        database = {**DATABASE_POOL_DEFAULTS, **(project_info.get("database") or {})}
+        pool_params = "".join(f"&{name}=${{DB_{name.upper()}}}" for name in DATABASE_URL_POOL_PARAMS)
+        pool_params += DATABASE_URL_STATEMENT_TIMEOUT
         default_env = {
             "POSTGRES_USER": "postgres",
             "POSTGRES_PASSWORD": "postgres",
@@ -195,19 +251,20 @@ class NestTemplateHandler:
             "DB_HOST": "localhost",
             "DB_PORT": "5432",
             "DB_SCHEMA": project_name_by_snake,
+            **{f"DB_{name.upper()}": value for name, value in database.items()},
             "DATABASE_URL": "postgresql://${POSTGRES_USER}:${POSTGRES_PASSWORD}@${DB_HOST}:${DB_PORT}/${"
-                            "POSTGRES_DB}?schema=${DB_SCHEMA}&sslmode=prefer "
+                            "POSTGRES_DB}?schema=${DB_SCHEMA}&sslmode=prefer" + pool_params
         }
         # 生成.env文件, 数据库配置。⚠️ 不能使用模板替换，里面包含${}
         FileUtil.generate_env(default_env, project_path / ".env")
 
     @staticmethod
-    def __add_module_to_app(project_path, module_name):
+    def __add_modules_to_app(project_path, module_names):
         """
-        将模块信息添加至app.module.ts
+        将模块信息添加至app.module.ts，所有模块一次性写入
 
         :param project_path: 项目地址
-        :param module_name: 模块名称(大驼峰)
+        :param module_names: 模块名称列表(大驼峰)
         """
         app_module_code_path = project_path / 'src' / 'app.module.ts'
         app_module_code = FileUtil.read_file(app_module_code_path)
@@ -215,18 +272,21 @@ class NestTemplateHandler:
         lines = app_module_code.split("\n")
 
         # 找到导入部分并添加新的模块导入
-        module_name_underline = NameRuleConverter.to_underline(module_name)
-        import_line = f"import {{ {module_name}Module }} from './{module_name_underline}/{module_name_underline}.module';"
+        import_lines = []
+        for module_name in module_names:
+            module_name_underline = NameRuleConverter.to_underline(module_name)
+            import_lines.append(
+                f"import {{ {module_name}Module }} from './{module_name_underline}/{module_name_underline}.module';")
         for i, line in enumerate(lines):
             if line.strip() == "import { Module } from '@nestjs/common';":
-                lines.insert(i, import_line)
+                lines[i:i] = import_lines
                 break
 
         # 找到导入数组并添加新模块
         for i, line in enumerate(lines):
             if "imports: [" in line:
                 indent = line.split("imports: [")[0]
-                lines.insert(i + 1, f"{indent}  {module_name}Module,")
+                lines[i + 1:i + 1] = [f"{indent}  {module_name}Module," for module_name in module_names]
                 break
 
         # 用换行符做拼接
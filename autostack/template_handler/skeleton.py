@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18
+@Author  : Rex
+@File    : skeleton.py
+@Desc    : 项目骨架清单：预先计算需要复制和渲染的模板文件，一次过滤复制生成项目骨架
+"""
+import fnmatch
+import io
+import os
+import shutil
+import tarfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Union
+from autostack.common.logs import logger
+from autostack.common.reflink import reflink_or_copy
+from autostack.utils import FileUtil
+
+# 不进入项目的文件：.env 由项目单独生成，src/demo 和 *.templ 是模块模板
+SKELETON_EXCLUDE_PATTERNS = (".env", "src/demo/*", "*.templ", "node_modules/*")
+# 需要渲染的模板：{模板文件: 生成的文件}
+SKELETON_RENDER_FILES = {"package.json.templ": "package.json"}
+
+
+class SkeletonManifest:
+    """
+    项目骨架清单
+    files 为需要原样复制的文件，renders 为需要渲染的模板，均为相对模板目录的 posix 路径。
+    同一模板目录的清单只计算一次。
+    """
+    _manifests: dict[Path, "SkeletonManifest"] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, template_dir: Union[Path, str], files: list[str], renders: dict[str, str]):
+        self.template_dir = Path(template_dir)
+        self.files = files
+        self.renders = renders
+
+    @classmethod
+    def get(cls, template_dir: Union[Path, str]) -> "SkeletonManifest":
+        key = Path(template_dir).resolve()
+        with cls._lock:
+            if key not in cls._manifests:
+                cls._manifests[key] = cls.build(key)
+            return cls._manifests[key]
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._manifests.clear()
+
+    @staticmethod
+    def build(template_dir: Union[Path, str], exclude_patterns=SKELETON_EXCLUDE_PATTERNS,
+              render_files: Optional[dict[str, str]] = None) -> "SkeletonManifest":
+        """扫描模板目录生成清单"""
+        template_dir = Path(template_dir)
+        render_files = SKELETON_RENDER_FILES if render_files is None else render_files
+        files = []
+        for root, dirs, filenames in os.walk(template_dir):
+            relative_root = Path(root).relative_to(template_dir)
+            # 被排除的目录不再进入
+            dirs[:] = [d for d in dirs
+                       if not any(fnmatch.fnmatch((relative_root / d).as_posix() + "/*", p) for p in exclude_patterns)]
+            for name in filenames:
+                relative = (relative_root / name).as_posix()
+                if relative in render_files:
+                    continue
+                if any(fnmatch.fnmatch(relative, pattern) for pattern in exclude_patterns):
+                    continue
+                files.append(relative)
+        renders = {src: dst for src, dst in render_files.items() if (template_dir / src).exists()}
+        return SkeletonManifest(template_dir, sorted(files), renders)
+
+    def materialize(self, target_dir: Union[Path, str], context: dict, reflink: bool = True) -> dict[str, float]:
+        """
+        生成项目骨架
+        :param target_dir: 项目目录
+        :param context: 渲染模板的变量
+        :param reflink: 是否尝试 reflink（项目文件会被原地改写，例如 app.module.ts，不能硬链接到模板）
+        :return: 各步骤耗时（秒）
+        """
+        target_dir = Path(target_dir)
+        timings = {}
+        start = time.perf_counter()
+        for directory in sorted({str(Path(file).parent) for file in self.files}):
+            (target_dir / directory).mkdir(parents=True, exist_ok=True)
+        reflinked = 0
+        for file in self.files:
+            if reflink:
+                reflinked += reflink_or_copy(self.template_dir / file, target_dir / file)
+            else:
+                shutil.copy2(self.template_dir / file, target_dir / file)
+        timings["copy"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for dst, content in self.render(context).items():
+            FileUtil.write_file(target_dir / dst, content)
+        timings["render"] = time.perf_counter() - start
+        logger.info(f"项目骨架生成完成：复制 {len(self.files)} 个文件（reflink {reflinked} 个），"
+                    f"渲染 {len(self.renders)} 个文件，耗时 {sum(timings.values()):.3f}s")
+        return timings
+
+    def render(self, context: dict) -> dict[str, str]:
+        """渲染模板，返回 {生成的文件: 内容}"""
+        return {dst: FileUtil.get_template(self.template_dir / src).substitute(context)
+                for src, dst in self.renders.items()}
+
+    def to_tar(self, context: dict, extra_files: Optional[dict[str, str]] = None) -> bytes:
+        """
+        导出为 tar 包，可以通过 container.put_archive 直接写入容器
+        :param context: 渲染模板的变量
+        :param extra_files: 额外写入的文件 {路径: 内容}，例如 .env
+        """
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w") as tar:
+            for file in self.files:
+                tar.add(self.template_dir / file, arcname=file)
+            generated = self.render(context)
+            generated.update(extra_files or {})
+            for path, content in generated.items():
+                data = content.encode("utf-8")
+                info = tarfile.TarInfo(path)
+                info.size = len(data)
+                info.mtime = int(time.time())
+                info.mode = 0o644
+                tar.addfile(info, io.BytesIO(data))
+        return buffer.getvalue()
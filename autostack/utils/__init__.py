@@ -1,8 +1,9 @@
 from .file_util import FileUtil
-from .response_parse import parse_bolt_artifacts
+from .response_parse import parse_bolt_artifacts, BoltArtifactStreamParser
 from .name_rule_convert import NameRuleConverter
 from .file_tree_utll import FileTreeUtil
 from .markdown_util import MarkdownUtil
 from .prompt_util import PromptUtil
+from .template_registry import TemplateRegistry
 from .path_util import PathUtil
-from .shell_util import DockerUtil
+from .prisma_parser import PrismaParser, PrismaParseError
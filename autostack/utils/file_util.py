@@ -7,8 +7,8 @@
 """
 import os
 import shutil
-from string import Template
 from autostack.common.logs import logger
+from .template_registry import TemplateRegistry
 
 
 class FileUtil:
@@ -105,11 +105,7 @@ class FileUtil:
         :param template_file_path: 模板文件地址
         :return: 模板文件文本
         """
-        template_str = None
-        with open(template_file_path, 'r', encoding='utf-8') as template_file:
-            template_str = template_file.read()
-
-        return Template(template_str)
+        return TemplateRegistry.get(template_file_path)
 
     @staticmethod
     def copy_all_files(src_dir, dest_dir):
@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Time    : 2026/10/18
+@Author  : Rex
+@File    : prisma_parser.py
+@Desc    : schema.prisma 解析器：生成 model、enum、字段、属性和注释的语法树，并直接转换为实体列表
+"""
+import re
+from typing import NamedTuple, Optional
+
+# 支持的顶层块，view、type（mongodb 复合类型）等暂不支持，解析时报错由调用方回退到 LLM
+SUPPORTED_BLOCKS = ("model", "enum", "datasource", "generator")
+SCALAR_TYPES = ("String", "Boolean", "Int", "BigInt", "Float", "Decimal", "DateTime", "Json", "Bytes")
+
+BLOCK_PATTERN = re.compile(r"^(\w+)\s+(\w+)\s*\{\s*$")
+FIELD_PATTERN = re.compile(r"^(\w+)\s+(\w+(?:\(\s*\"[^\"]*\"\s*\))?)(\[\])?(\?)?(?:\s+(.*))?$")
+ATTRIBUTE_NAME_PATTERN = re.compile(r"@@?[\w.]+")
+
+
+class PrismaParseError(ValueError):
+    def __init__(self, message: str, line: int = 0):
+        super().__init__(f"第 {line} 行: {message}" if line else message)
+        self.line = line
+
+
+class PrismaAttribute(NamedTuple):
+    name: str  # 不含 @，例如 id、default、relation、index
+    args: str = ""  # 括号内的原始参数，例如 fields: [userId], references: [id]
+
+
+class PrismaField(NamedTuple):
+    name: str
+    type: str
+    optional: bool = False
+    is_list: bool = False
+    attributes: tuple[PrismaAttribute, ...] = ()
+    comment: str = ""
+    line: int = 0
+
+    def get_attribute(self, name: str) -> Optional[PrismaAttribute]:
+        return next((attribute for attribute in self.attributes if attribute.name == name), None)
+
+
+class PrismaModel(NamedTuple):
+    name: str
+    fields: tuple[PrismaField, ...] = ()
+    attributes: tuple[PrismaAttribute, ...] = ()  # @@ 块属性
+    comment: str = ""
+
+
+class PrismaEnum(NamedTuple):
+    name: str
+    values: tuple[str, ...] = ()
+    comment: str = ""
+
+
+class PrismaSchema(NamedTuple):
+    models: tuple[PrismaModel, ...] = ()
+    enums: tuple[PrismaEnum, ...] = ()
+
+    def get_model(self, name: str) -> Optional[PrismaModel]:
+        return next((model for model in self.models if model.name == name), None)
+
+    def get_enum(self, name: str) -> Optional[PrismaEnum]:
+        return next((enum for enum in self.enums if enum.name == name), None)
+
+    def is_relation(self, field: PrismaField) -> bool:
+        return self.get_model(field.type) is not None
+
+    def to_entities(self) -> list[dict]:
+        """
+        转换为实体列表，格式与 Entity.get_schema() 一致（即 entity_list.json 的内容）
+        标量数组类型为 StringArray 等形式，enum 字段按 String 处理并在注释中列出可选值，关联字段的类型为 model 名称
+        """
+        entities = []
+        for model in self.models:
+            attributes = []
+            for field in model.fields:
+                field_type, comment = field.type, field.comment or field.name
+                enum = self.get_enum(field.type)
+                if enum:
+                    field_type = "String"
+                    comment += f"（可选值：{', '.join(enum.values)}）"
+                if field.is_list and field_type in SCALAR_TYPES:
+                    field_type += "Array"
+                attributes.append({
+                    "name": field.name,
+                    "type": field_type,
+                    "required": not field.optional,
+                    "comment": comment,
+                })
+            entities.append({
+                "name": model.name,
+                "description": model.comment or model.name,
+                "attributes": attributes,
+            })
+        return entities
+
+
+class PrismaParser:
+    """
+    schema.prisma 解析器
+    只处理 model、enum、datasource、generator 四种块，datasource 和 generator 的内容不解析；
+    /// 文档注释和行尾 // 注释作为 model、字段、enum 的注释。
+    """
+
+    @staticmethod
+    def split_comment(line: str) -> tuple[str, str]:
+        """拆分代码和行尾注释，忽略字符串中的 //"""
+        in_string = False
+        for i, char in enumerate(line):
+            if char == '"' and (i == 0 or line[i - 1] != "\\"):
+                in_string = not in_string
+            elif not in_string and line.startswith("//", i):
+                return line[:i].rstrip(), line[i:].lstrip("/").strip()
+        return line.rstrip(), ""
+
+    @staticmethod
+    def parse_attributes(text: str, line: int = 0) -> tuple[PrismaAttribute, ...]:
+        """解析 @id @default(uuid()) @relation(fields: [a], references: [id]) 形式的属性"""
+        attributes, pos = [], 0
+        while pos < len(text):
+            if text[pos].isspace():
+                pos += 1
+                continue
+            match = ATTRIBUTE_NAME_PATTERN.match(text, pos)
+            if not match:
+                raise PrismaParseError(f"无法解析的属性: {text[pos:]}", line)
+            name, pos, args = match.group().lstrip("@"), match.end(), ""
+            if pos < len(text) and text[pos] == "(":
+                depth, start, in_string = 0, pos + 1, False
+                while pos < len(text):
+                    char = text[pos]
+                    if char == '"' and text[pos - 1] != "\\":
+                        in_string = not in_string
+                    elif not in_string and char in "([":
+                        depth += 1
+                    elif not in_string and char in ")]":
+                        depth -= 1
+                        if depth == 0:
+                            break
+                    pos += 1
+                if depth != 0:
+                    raise PrismaParseError(f"属性 @{name} 的括号不匹配", line)
+                args, pos = text[start:pos].strip(), pos + 1
+            attributes.append(PrismaAttribute(name, args))
+        return tuple(attributes)
+
+    @staticmethod
+    def parse(content: str) -> PrismaSchema:
+        models, enums = [], []
+        block: Optional[tuple[str, str, str, int]] = None  # (类型, 名称, 注释, 起始行)
+        body: list = []  # model 的字段或 enum 的值
+        block_attributes: list[PrismaAttribute] = []
+        doc: list[str] = []
+        for number, raw in enumerate(content.splitlines(), start=1):
+            stripped = raw.strip()
+            if stripped.startswith("///"):
+                doc.append(stripped[3:].strip())
+                continue
+            code, comment = PrismaParser.split_comment(stripped)
+            if not code:
+                if not stripped:
+                    doc = []
+                continue
+            comment = " ".join(doc + ([comment] if comment else []))
+            doc = []
+
+            if block is None:
+                match = BLOCK_PATTERN.match(code)
+                if not match:
+                    raise PrismaParseError(f"无法识别的内容: {code}", number)
+                if match.group(1) not in SUPPORTED_BLOCKS:
+                    raise PrismaParseError(f"不支持的块类型: {match.group(1)}", number)
+                block, body, block_attributes = (match.group(1), match.group(2), comment, number), [], []
+                continue
+
+            kind, name, block_comment, _ = block
+            if code == "}":
+                if kind == "model":
+                    models.append(PrismaModel(name, tuple(body), tuple(block_attributes), block_comment))
+                elif kind == "enum":
+                    enums.append(PrismaEnum(name, tuple(body), block_comment))
+                block = None
+                continue
+            if "{" in code or "}" in code:
+                raise PrismaParseError(f"块 {name} 中的大括号不匹配: {code}", number)
+
+            if kind == "model":
+                if code.startswith("@@"):
+                    block_attributes.extend(PrismaParser.parse_attributes(code, number))
+                    continue
+                match = FIELD_PATTERN.match(code)
+                if not match:
+                    raise PrismaParseError(f"无法解析的字段: {code}", number)
+                field_name, field_type, is_list, optional, attributes = match.groups()
+                if is_list and optional:
+                    raise PrismaParseError(f"列表字段不能为可选: {code}", number)
+                body.append(PrismaField(
+                    name=field_name,
+                    type=field_type,
+                    optional=bool(optional),
+                    is_list=bool(is_list),
+                    attributes=PrismaParser.parse_attributes(attributes or "", number),
+                    comment=comment,
+                    line=number,
+                ))
+            elif kind == "enum":
+                value = code.split()[0]
+                if not re.fullmatch(r"\w+", value):
+                    raise PrismaParseError(f"无法解析的枚举值: {code}", number)
+                body.append(value)
+        if block is not None:
+            raise PrismaParseError(f"块 {block[1]} 没有结束", block[3])
+        return PrismaParser.validate(PrismaSchema(tuple(models), tuple(enums)))
+
+    @staticmethod
+    def validate(schema: PrismaSchema) -> PrismaSchema:
+        """检查字段类型都是标量、enum 或 model"""
+        names = {model.name for model in schema.models} | {enum.name for enum in schema.enums}
+        for model in schema.models:
+            for field in model.fields:
+                if field.type not in SCALAR_TYPES and field.type not in names:
+                    raise PrismaParseError(f"{model.name}.{field.name} 的类型 {field.type} 未定义", field.line)
+        return schema
+
+    @staticmethod
+    def to_entities(content: str) -> list[dict]:
+        """解析 schema.prisma 并转换为实体列表"""
+        return PrismaParser.parse(content).to_entities()
@@ -6,8 +6,8 @@
 @Author  : Rex
 @File    : prompt_util.py
 """
-from string import Template
 from autostack.common.const import PROMPT_ROOT
+from .template_registry import TemplateRegistry
 
 
 class PromptUtil:
@@ -23,8 +23,7 @@ class PromptUtil:
         :param args: 提示词待替换待内容
         :return: 替换后的提示词
         """
-        with open(PROMPT_ROOT / prompt_name, 'r', encoding='utf-8') as file:
-            prompt_template = Template(file.read())
+        prompt_template = TemplateRegistry.get(PROMPT_ROOT / prompt_name)
 
         prompt = prompt_template.substitute(*args)
         return prompt
@@ -10,6 +10,14 @@ import re
 import json
 
 
+# 正则表达式提取 boltArtifact 和 boltAction 标签的内容
+ARTIFACT_PATTERN = re.compile(r'<boltArtifact.*?id="(.*?)".*?title="(.*?)">(.*?)</boltArtifact>', re.DOTALL)
+ARTIFACT_OPEN_PATTERN = re.compile(r'<boltArtifact.*?id="(.*?)".*?title="(.*?)">', re.DOTALL)
+ACTION_PATTERN = re.compile(r'(?i)<boltAction\s+type="(.*?)".*?(filePath|shellPath)="(.*?)"\s*>(.*?)</boltAction>', re.DOTALL)
+ARTIFACT_CLOSE_TAG = "</boltArtifact>"
+ACTION_CLOSE_TAG = "</boltAction>"
+
+
 # 创建一个对AI内容进行解析，并操作的类
 class ResponseHandler:
     def __init__(self, content):
@@ -17,16 +25,21 @@ class ResponseHandler:
         self.task_list = parse_bolt_artifacts(content)
 
 
+def _to_action_data(action) -> dict:
+    action_type, path_type, path_value, action_content = action
+    return {
+        "type": action_type,
+        f"{path_type.lower()}": path_value,
+        "content": action_content.strip()
+    }
+
+
 def parse_bolt_artifacts(content):
     # 使用正则表达式提取所有的 <boltArtifact> 和 <boltAction> 标签
     bolt_artifacts = []
 
-    # 正则表达式提取 boltArtifact 和 boltAction 标签的内容
-    artifact_pattern = re.compile(r'<boltArtifact.*?id="(.*?)".*?title="(.*?)">(.*?)</boltArtifact>', re.DOTALL)
-    action_pattern = re.compile(r'(?i)<boltAction\s+type="(.*?)".*?(filePath|shellPath)="(.*?)"\s*>(.*?)</boltAction>', re.DOTALL)
-
     # 查找所有符合 <boltArtifact> 的块
-    artifacts = artifact_pattern.findall(content)
+    artifacts = ARTIFACT_PATTERN.findall(content)
 
     for artifact in artifacts:
         artifact_id, artifact_title, actions_content = artifact
@@ -37,15 +50,9 @@ def parse_bolt_artifacts(content):
         }
 
         # 查找该 <boltArtifact> 内部的所有 <boltAction>
-        actions = action_pattern.findall(actions_content)
+        actions = ACTION_PATTERN.findall(actions_content)
         for action in actions:
-            action_type, path_type, path_value, action_content = action
-            action_data = {
-                "type": action_type,
-                f"{path_type.lower()}": path_value,
-                "content": action_content.strip()
-            }
-            artifact_data["boltActions"].append(action_data)
+            artifact_data["boltActions"].append(_to_action_data(action))
 
         bolt_artifacts.append(artifact_data)
 
@@ -53,6 +60,67 @@ def parse_bolt_artifacts(content):
     return bolt_artifacts
 
 
+class BoltArtifactStreamParser:
+    """
+    <boltArtifact>/<boltAction> 的增量解析器，用于流式响应
+    每次 feed 一段文本，返回这段文本中刚刚闭合的 boltAction，action 的格式与 parse_bolt_artifacts 一致
+    """
+
+    def __init__(self):
+        self.artifacts = []
+        self._buffer = ""  # 尚未解析的文本
+        self._current_artifact = None
+
+    def feed(self, chunk: str) -> list[dict]:
+        """
+        追加一段文本
+        :param chunk: 流式响应的文本片段
+        :return: 新闭合的 boltAction 列表
+        """
+        self._buffer += chunk
+        completed_actions = []
+        while True:
+            if self._current_artifact is None:
+                match = ARTIFACT_OPEN_PATTERN.search(self._buffer)
+                if not match:
+                    # 只保留可能是未完整标签的部分，避免缓冲区无限增长
+                    tag_start = self._buffer.rfind("<")
+                    self._buffer = self._buffer[tag_start:] if tag_start != -1 else ""
+                    break
+                artifact_id, artifact_title = match.groups()
+                self._current_artifact = {
+                    "id": artifact_id,
+                    "title": artifact_title,
+                    "boltActions": []
+                }
+                self.artifacts.append(self._current_artifact)
+                self._buffer = self._buffer[match.end():]
+                continue
+
+            action_end = self._buffer.find(ACTION_CLOSE_TAG)
+            artifact_end = self._buffer.find(ARTIFACT_CLOSE_TAG)
+            if action_end != -1 and (artifact_end == -1 or action_end < artifact_end):
+                action_end += len(ACTION_CLOSE_TAG)
+                match = ACTION_PATTERN.search(self._buffer[:action_end])
+                if match:
+                    action_data = _to_action_data(match.groups())
+                    self._current_artifact["boltActions"].append(action_data)
+                    completed_actions.append(action_data)
+                self._buffer = self._buffer[action_end:]
+            elif artifact_end != -1:
+                self._current_artifact = None
+                self._buffer = self._buffer[artifact_end + len(ARTIFACT_CLOSE_TAG):]
+            else:
+                break
+        return completed_actions
+
+    def close(self) -> list[dict]:
+        """流结束，返回解析到的所有 boltArtifact"""
+        self._buffer = ""
+        self._current_artifact = None
+        return self.artifacts
+
+
 if __name__ == '__main__':
     res = """
     基于上述高校学生管理系统的需求文档，我建议将这个项目命名为“EduManage”。
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+模板注册表
+@Time    : 2026/10/18
+@Author  : Rex
+@File    : template_registry.py
+@Desc    : 进程级的模板缓存，.prompt 和 .templ 文件只加载一次，文件修改后按 mtime 自动重新加载
+"""
+import os
+import threading
+from collections import Counter
+from pathlib import Path
+from string import Template
+from typing import Iterable, Union
+from autostack.common.const import PROMPT_ROOT, TEMPLATE_ROOT
+from autostack.common.logs import logger
+
+TEMPLATE_SUFFIXES = (".prompt", ".templ")
+
+
+class TemplateRegistry:
+    """
+    模板注册表，所有方法都是类方法，整个进程共享一份缓存
+    """
+    _templates: dict[str, tuple[tuple[int, int], Template]] = {}
+    _hits: Counter = Counter()
+    _loads: Counter = Counter()
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, template_path: Union[str, Path]) -> Template:
+        """
+        获取模板，文件的 mtime 或大小变化时重新加载
+        :param template_path: 模板文件地址
+        :return: 模板
+        """
+        path = os.path.abspath(template_path)
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        entry = cls._templates.get(path)
+        if entry and entry[0] == version:
+            cls._hits[path] += 1
+            return entry[1]
+
+        with open(path, 'r', encoding='utf-8') as template_file:
+            template = Template(template_file.read())
+        with cls._lock:
+            cls._templates[path] = (version, template)
+            cls._loads[path] += 1
+        return template
+
+    @classmethod
+    def preload(cls, roots: Iterable[Union[str, Path]] = None) -> int:
+        """
+        预加载目录下的所有模板
+        :param roots: 模板目录，默认为 PROMPT_ROOT 和 templates/backend
+        :return: 加载的模板数量
+        """
+        roots = roots or [PROMPT_ROOT, TEMPLATE_ROOT / "backend"]
+        count = 0
+        for root in roots:
+            for dir_path, _, file_names in os.walk(root):
+                for file_name in file_names:
+                    if file_name.endswith(TEMPLATE_SUFFIXES):
+                        cls.get(os.path.join(dir_path, file_name))
+                        count += 1
+        logger.info(f"预加载模板 {count} 个")
+        return count
+
+    @classmethod
+    def stats(cls) -> dict[str, dict[str, int]]:
+        """返回每个模板的命中次数和加载次数"""
+        return {path: {"hits": cls._hits[path], "loads": cls._loads[path]} for path in cls._templates}
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._templates.clear()
+            cls._hits.clear()
+            cls._loads.clear()
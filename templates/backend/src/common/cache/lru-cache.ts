@@ -0,0 +1,92 @@
+// 进程内的 LRU 缓存，不依赖 redis 等外部服务
+export const DEFAULT_MAX_ENTRIES = 1000;
+
+export interface LruCacheOptions {
+    // 过期时间（毫秒），为 0 时不缓存
+    ttl: number;
+    // 最大条目数，超出时淘汰最久未使用的条目
+    max?: number;
+}
+
+interface Entry<V> {
+    value: V;
+    expiresAt: number;
+}
+
+/**
+ * LRU 缓存
+ * Map 按插入顺序迭代，命中时删除后重新插入即移动到末尾，淘汰时删除第一个条目。
+ */
+export class LruCache<V = any> {
+    private readonly entries = new Map<string, Entry<V>>();
+    private readonly ttl: number;
+    private readonly max: number;
+    // clear() 时递增，用于丢弃清空前开始、清空后才返回的查询结果
+    private generation = 0;
+
+    constructor(options: LruCacheOptions) {
+        this.ttl = options.ttl;
+        this.max = options.max ?? DEFAULT_MAX_ENTRIES;
+    }
+
+    get enabled(): boolean {
+        return this.ttl > 0;
+    }
+
+    get size(): number {
+        return this.entries.size;
+    }
+
+    get(key: string): V | undefined {
+        const entry = this.entries.get(key);
+        if (!entry) {
+            return undefined;
+        }
+        this.entries.delete(key);
+        if (entry.expiresAt <= Date.now()) {
+            return undefined;
+        }
+        this.entries.set(key, entry);
+        return entry.value;
+    }
+
+    set(key: string, value: V): void {
+        if (!this.enabled) {
+            return;
+        }
+        this.entries.delete(key);
+        this.entries.set(key, { value, expiresAt: Date.now() + this.ttl });
+        if (this.entries.size > this.max) {
+            this.entries.delete(this.entries.keys().next().value);
+        }
+    }
+
+    delete(key: string): void {
+        this.entries.delete(key);
+    }
+
+    clear(): void {
+        this.entries.clear();
+        this.generation++;
+    }
+
+    /**
+     * 读穿缓存：命中时直接返回，否则调用 loader 并缓存结果
+     * 加载期间缓存被清空（有写操作）时，结果可能是写之前的数据，只返回不缓存
+     */
+    async getOrLoad(key: string, loader: () => Promise<V>): Promise<V> {
+        if (!this.enabled) {
+            return loader();
+        }
+        const cached = this.get(key);
+        if (cached !== undefined) {
+            return cached;
+        }
+        const generation = this.generation;
+        const value = await loader();
+        if (generation === this.generation) {
+            this.set(key, value);
+        }
+        return value;
+    }
+}
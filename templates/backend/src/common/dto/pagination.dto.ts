@@ -0,0 +1,57 @@
+import { ApiPropertyOptional } from '@nestjs/swagger';
+import { Type } from 'class-transformer';
+import { IsInt, IsOptional, IsString, Max, Min } from 'class-validator';
+
+// 每页默认条数和最大条数，避免一次查询整张表
+export const DEFAULT_TAKE = 20;
+export const MAX_TAKE = 100;
+
+/**
+ * 分页查询参数
+ * 传入 cursor 时使用游标分页（从 cursor 的下一条开始），否则使用 skip 偏移分页；
+ * 两种方式都按 id 升序排列，保证翻页结果稳定。
+ */
+export class PaginationQueryDto {
+    @ApiPropertyOptional({ description: '游标：上一页最后一条记录的 id，传入时忽略 skip' })
+    @IsOptional()
+    @IsString()
+    cursor?: string;
+
+    @ApiPropertyOptional({ description: '偏移量', minimum: 0, default: 0 })
+    @IsOptional()
+    @Type(() => Number)
+    @IsInt()
+    @Min(0)
+    skip?: number;
+
+    @ApiPropertyOptional({ description: '每页条数', minimum: 1, maximum: MAX_TAKE, default: DEFAULT_TAKE })
+    @IsOptional()
+    @Type(() => Number)
+    @IsInt()
+    @Min(1)
+    @Max(MAX_TAKE)
+    take?: number;
+}
+
+export interface Page<T> {
+    items: T[];
+    // 下一页的游标，没有更多数据时为 null
+    nextCursor: string | null;
+}
+
+/**
+ * 生成 prisma findMany 的分页参数
+ */
+export function paginationArgs(query: PaginationQueryDto = {}) {
+    const take = Math.min(query.take ?? DEFAULT_TAKE, MAX_TAKE);
+    const orderBy = { id: 'asc' as const };
+    if (query.cursor) {
+        return { take, skip: 1, cursor: { id: query.cursor }, orderBy };
+    }
+    return { take, skip: query.skip ?? 0, orderBy };
+}
+
+export function toPage<T extends { id: any }>(items: T[], take: number): Page<T> {
+    const last = items[items.length - 1];
+    return { items, nextCursor: items.length === take && last ? String(last.id) : null };
+}
@@ -12,7 +12,10 @@ async function bootstrap() {
   // 启用 Swagger UI
   SwaggerModule.setup('docs', app, document);
 
-  app.useGlobalPipes(new ValidationPipe());
+  // transform 将查询参数转换为 DTO 中声明的类型（例如分页的 skip、take）
+  app.useGlobalPipes(new ValidationPipe({ transform: true }));
+  // 收到 SIGTERM 等信号时执行 onModuleDestroy，关闭数据库连接
+  app.enableShutdownHooks();
   await app.listen(3000);
 }
 bootstrap();
@@ -1,10 +1,24 @@
-
-import { Injectable, OnModuleInit } from '@nestjs/common';
+import { Injectable, OnModuleDestroy, OnModuleInit } from '@nestjs/common';
 import { PrismaClient } from '@prisma/client';
 
 @Injectable()
-export class PrismaService extends PrismaClient implements OnModuleInit {
+export class PrismaService extends PrismaClient implements OnModuleInit, OnModuleDestroy {
+  constructor() {
+    // 连接池大小、连接超时和 statement_timeout 在 .env 的 DATABASE_URL 中配置，这里只配置交互式事务的超时（毫秒）
+    super({
+      transactionOptions: {
+        maxWait: Number(process.env.DB_TRANSACTION_MAX_WAIT ?? 2000),
+        timeout: Number(process.env.DB_TRANSACTION_TIMEOUT ?? 5000),
+      },
+    });
+  }
+
   async onModuleInit() {
     await this.$connect();
   }
+
+  // 应用关闭时释放连接（需要在 main.ts 中 enableShutdownHooks），滚动重启时不会遗留连接
+  async onModuleDestroy() {
+    await this.$disconnect();
+  }
 }
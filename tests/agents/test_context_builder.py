@@ -0,0 +1,41 @@
+import json
+import unittest
+from autostack.agents.context_builder import ContextBuilder
+from autostack.llm import Task, Action, ActionType
+
+
+def get_task(task_id, task_desc, size):
+    return Task(task_id=task_id, task_desc=task_desc, is_finished=True, result=[
+        Action(type=ActionType.FILE, content="x" * size, result="write success"),
+        Action(type=ActionType.COMMAND, content="npm run build", result="y" * size),
+    ])
+
+
+class TestContextBuilder(unittest.TestCase):
+
+    def setUp(self):
+        # 以字符数代替 token 数，避免依赖 tiktoken 的编码文件
+        self.builder = ContextBuilder(token_budget=4000, keep_recent=1, max_action_chars=100, count_tokens=len)
+
+    def test_all_tasks_fit(self):
+        """测试预算充足时保留全部内容"""
+        tasks = [get_task("1", "创建 user 模块", 10), get_task("2", "创建 order 模块", 10)]
+        context = json.loads(self.builder.build(tasks, stage="perform_task"))
+        self.assertEqual(context, [task.to_dict() for task in tasks])
+        self.assertEqual(self.builder.report(), {"perform_task": 0})
+
+    def test_budget_respected(self):
+        """测试超出预算时，最近和相关的任务保留完整内容，其余任务被压缩或丢弃"""
+        tasks = [get_task(str(i), f"task {i}", 1000) for i in range(5)]
+        tasks[1].task_desc = "实现 order 接口"
+        context = self.builder.build(tasks, query="修复 order 接口", stage="perform_task")
+        self.assertLessEqual(len(context), 4000)
+
+        by_id = {task["task_id"]: task for task in json.loads(context)}
+        self.assertEqual(by_id["4"], tasks[4].to_dict())
+        self.assertIn("省略", by_id["1"]["result"][0]["content"])
+        self.assertGreater(self.builder.report()["perform_task"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
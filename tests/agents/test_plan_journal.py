@@ -0,0 +1,84 @@
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+from autostack.agents.plan_journal import PlanJournal
+from autostack.agents.planner import Planner
+from autostack.llm import Task, Action, ActionType
+
+TASKS_RESPONSE = "```json\n" + json.dumps([
+    {"task_id": "1", "task_desc": "创建 user 模块"},
+    {"task_id": "2", "task_desc": "实现登录接口"},
+], ensure_ascii=False) + "\n```"
+
+
+class TestPlanJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.agent = MagicMock()
+        self.agent.llm.model = "gpt-4o"
+        self.agent.llm.completion.return_value = TASKS_RESPONSE
+        self.agent.project.resources = self.test_dir
+        # 仓库中没有 tasks_subdivision.prompt，这里不关心 prompt 内容
+        patcher = patch("autostack.agents.planner.PromptUtil.prompt_handle", return_value="prompt")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def run_first_task(self, planner):
+        planner.set_goal("实现一个商城")
+        planner.current_task.result = [Action(type=ActionType.FILE, content="export class User {}", result="ok")]
+        planner.record_task_result(planner.current_task)
+        planner.confirm_task()
+
+    def test_replay_journal(self):
+        """测试从事件日志恢复的计划与原计划一致"""
+        planner = Planner(self.agent)
+        self.run_first_task(planner)
+
+        restored = Planner.load(self.test_dir, agent=self.agent)
+        self.assertEqual(restored.plan.model_dump(), planner.plan.model_dump())
+        self.assertEqual(restored.current_task_id, "2")
+        self.assertEqual(len((self.test_dir / "plan_journal.jsonl").read_text(encoding="utf-8").splitlines()), 4)
+
+    def test_snapshot_and_truncated_line(self):
+        """测试快照后日志被清空，崩溃时写了一半的最后一行被忽略"""
+        planner = Planner(self.agent)
+        self.run_first_task(planner)
+        planner.save()
+        self.assertEqual((self.test_dir / "plan_journal.jsonl").read_text(encoding="utf-8"), "")
+
+        planner.journal.record_finish("2")
+        with open(self.test_dir / "plan_journal.jsonl", "a", encoding="utf-8") as f:
+            f.write('{"seq": 99, "event": "finish_')
+
+        plan = PlanJournal(self.test_dir).load()
+        self.assertEqual([task.is_finished for task in plan.tasks], [True, True])
+        self.assertEqual(plan.tasks[0].result[0].content, "export class User {}")
+        self.assertEqual(plan.current_task_id, "")
+
+    def test_append_after_truncated_line(self):
+        """测试从写了一半的日志恢复后继续追加的事件不会丢失"""
+        journal = PlanJournal(self.test_dir)
+        journal.record_goal("实现一个商城")
+        journal.record_tasks([Task(task_id="1", task_desc="user"), Task(task_id="2", task_desc="order")])
+        with open(self.test_dir / "plan_journal.jsonl", "a", encoding="utf-8") as f:
+            f.write('{"seq": 3, "event": "finish_ta')
+
+        resumed = PlanJournal(self.test_dir)
+        resumed.load()
+        resumed.record_finish("1")
+        resumed.record_finish("2")
+
+        plan = PlanJournal(self.test_dir).load()
+        self.assertEqual([task.is_finished for task in plan.tasks], [True, True])
+        self.assertEqual(len((self.test_dir / "plan_journal.jsonl").read_text(encoding="utf-8").splitlines()), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import hashlib
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+from autostack.agents.planner import Planner
+from autostack.agents.programmer import Programmer
+from autostack.llm import Plan, Task, Action, ActionType, BudgetExceededError
+
+
+def file_action(path: Path, content: str) -> Action:
+    return Action(type=ActionType.FILE, content=content, result="write success", path=str(path),
+                  content_hash=hashlib.sha256(content.encode("utf-8")).hexdigest())
+
+
+class TestProgrammerResume(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        # 不启动容器和 LLM，只组装 run 需要的属性
+        self.programmer = Programmer.__new__(Programmer)
+        self.programmer.llm = MagicMock(model="gpt-4o")
+        self.programmer.project = MagicMock(resources=self.test_dir)
+        self.programmer.planner = Planner(self.programmer)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_is_task_on_disk(self):
+        """测试只有文件内容与记录一致时才认为任务已完成"""
+        path = self.test_dir / "user.service.ts"
+        path.write_text("export class UserService {}", encoding="utf-8")
+        task = Task(task_desc="user", result=[file_action(path, "export class UserService {}")])
+        self.assertTrue(Programmer._is_task_on_disk(task))
+
+        path.write_text("export class UserService { changed }", encoding="utf-8")
+        self.assertFalse(Programmer._is_task_on_disk(task))
+        self.assertFalse(Programmer._is_task_on_disk(Task(task_desc="no result")))
+
+    def test_resume_skips_written_tasks(self):
+        """测试续跑时从保存的计划继续，已写入文件的任务不再调用 LLM"""
+        path = self.test_dir / "user.service.ts"
+        path.write_text("done", encoding="utf-8")
+        journal = self.programmer.planner.journal
+        journal.record_goal("实现一个商城")
+        journal.record_tasks([Task(task_id="1", task_desc="user"), Task(task_id="2", task_desc="order")])
+        journal.append("task_result", task_id="1", result=[file_action(path, "done").model_dump(mode="json")])
+
+        performed = []
+        self.programmer.perform_task = lambda: performed.append(self.programmer.planner.current_task_id)
+        self.programmer.planner.update_plan = MagicMock()
+        self.programmer.run(resume=True)
+
+        self.assertEqual(performed, ["2"])
+        self.assertEqual(self.programmer.planner.update_plan.call_count, 1)
+        self.assertTrue(all(task.is_finished for task in self.programmer.planner.plan.tasks))
+
+    def test_budget_exceeded_while_updating_plan_stops_run(self):
+        """测试在更新计划时超出预算，run 正常停止而不是抛出异常"""
+        journal = self.programmer.planner.journal
+        journal.record_goal("实现一个商城")
+        journal.record_tasks([Task(task_id="1", task_desc="user"), Task(task_id="2", task_desc="order")])
+
+        performed = []
+        self.programmer.perform_task = lambda: performed.append(self.programmer.planner.current_task_id)
+        self.programmer.planner.update_plan = MagicMock(side_effect=BudgetExceededError("budget"))
+        self.programmer.run(resume=True)
+
+        self.assertEqual(performed, ["1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+from unittest.mock import MagicMock
+from autostack.container import CommandResult, CommandResultClassifier
+
+
+class TestCommandResultClassifier(unittest.TestCase):
+
+    def setUp(self):
+        self.llm_judge = MagicMock(return_value=True)
+        self.classifier = CommandResultClassifier(llm_judge=self.llm_judge, max_log_chars=200)
+
+    def classify(self, output, exit_code):
+        return self.classifier.classify(CommandResult("npm run build", output, exit_code))
+
+    def test_exit_code(self):
+        """测试退出码可以确定结果时不询问 LLM"""
+        self.assertEqual(self.classify("npm WARN deprecated", 0)[:2], (True, "exit_code"))
+        self.assertEqual(self.classify("done", 1)[:2], (False, "exit_code"))
+        self.llm_judge.assert_not_called()
+
+    def test_rules(self):
+        """测试白名单和错误规则"""
+        basic_block = "assertion failed [block != nullptr]: BasicBlock requested for unrecognized address"
+        self.assertEqual(self.classify(basic_block, 133)[:2], (True, "allow_rule"))
+        self.assertEqual(self.classify("src/a.ts:1:1 - error TS2304: Cannot find name 'x'", None)[:2],
+                         (False, "error_rule"))
+        self.assertEqual(self.classify("Compiled successfully", None)[:2], (True, "no_error"))
+        self.llm_judge.assert_not_called()
+
+    def test_ambiguous_asks_llm_with_digest(self):
+        """测试无法确定时询问 LLM，只发送日志摘要"""
+        output = "\n".join(f"line {i}" for i in range(100)) + "\nerror-handler.ts compiled\n" + "tail " * 10
+        verdict = self.classify(output, None)
+        self.assertEqual(verdict[:2], (True, "llm"))
+        command, log = self.llm_judge.call_args.args
+        self.assertLessEqual(len(log), 210)
+        self.assertIn("error-handler.ts", log)
+        self.assertTrue(log.endswith("tail " * 10))
+
+        self.assertEqual(self.classifier.report()["llm"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+from autostack.container.container_pool import ContainerPool, wait_until_ready
+
+
+def make_client():
+    client = MagicMock()
+
+    def run(*args, **kwargs):
+        container = MagicMock(status="running")
+        container.id = container.short_id = f"container{client.containers.run.call_count}"
+        container.exec_run.return_value = MagicMock(exit_code=0, output=b"")
+        return container
+
+    client.containers.run.side_effect = run
+    return client
+
+
+class TestContainerPool(unittest.TestCase):
+
+    def setUp(self):
+        self.workspace = Path(tempfile.mkdtemp())
+        self.client = make_client()
+        self.pool = ContainerPool(self.client, size=2, workspace_root=self.workspace, ready_timeout=1)
+
+    def tearDown(self):
+        self.pool.shutdown()
+        shutil.rmtree(self.workspace)
+
+    def test_acquire_links_project_and_replenishes(self):
+        """测试取用容器时链接项目目录，并补充预热容器"""
+        self.pool.start(wait=True)
+        self.assertEqual(self.pool.idle_count, 2)
+        container = self.pool.acquire(self.workspace / "demo" / "demo")
+        self.assertIsNotNone(container)
+        # 预热时已启动 postgresql 并完成探测
+        self.assertIn("pg_isready", [c.args[0] for c in container.exec_run.call_args_list])
+        link_command = container.exec_run.call_args_list[-1].args[0][-1]
+        self.assertIn("ln -s /workspace/demo/demo /app", link_command)
+
+        self.pool.release(container)
+        container.remove.assert_called_once_with(force=True)
+
+    def test_acquire_quotes_project_path(self):
+        """测试项目路径中的空格和 shell 元字符被转义"""
+        self.pool.start(wait=True)
+        container = self.pool.acquire(self.workspace / "my demo; rm -rf x")
+        link_command = container.exec_run.call_args_list[-1].args[0][-1]
+        self.assertIn("ln -s '/workspace/my demo; rm -rf x' /app", link_command)
+
+    def test_shutdown_removes_warming_containers(self):
+        """测试关闭时删除正在预热的容器，并等待预热线程结束"""
+        started = threading.Semaphore(0)
+        containers = []
+
+        def run(*args, **kwargs):
+            container = MagicMock(status="running")
+            container.id = container.short_id = f"warming{len(containers)}"
+            # postgresql 一直未就绪，容器被删除后 reload 失败
+            container.exec_run.return_value = MagicMock(exit_code=1, output=b"")
+            container.remove.side_effect = lambda **kw: setattr(container, "reload", MagicMock(
+                side_effect=RuntimeError("removed")))
+            containers.append(container)
+            started.release()
+            return container
+
+        self.client.containers.run.side_effect = run
+        pool = ContainerPool(self.client, size=2, workspace_root=self.workspace, ready_timeout=30)
+        pool.start()
+        for _ in range(2):
+            self.assertTrue(started.acquire(timeout=5))
+        while len(pool._starting) < 2:
+            time.sleep(0.01)
+        pool.shutdown()
+
+        self.assertEqual(len(containers), 2)
+        for container in containers:
+            container.remove.assert_called_with(force=True)
+        self.assertEqual((pool.idle_count, len(pool._warmers), pool._warming), (0, 0, 0))
+
+    def test_project_outside_workspace(self):
+        """测试不在工作空间内的项目不从池中取用"""
+        self.assertIsNone(self.pool.acquire(Path(tempfile.gettempdir()) / "elsewhere"))
+        self.client.containers.run.assert_not_called()
+
+    def test_wait_until_ready_timeout(self):
+        """测试探测命令一直失败时超时返回 False"""
+        container = MagicMock(status="running")
+        container.exec_run.return_value = MagicMock(exit_code=2)
+        self.assertFalse(wait_until_ready(container, "pg_isready", timeout=0.05, interval=0.01))
+
+
+if __name__ == "__main__":
+    unittest.main()
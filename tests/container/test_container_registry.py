@@ -0,0 +1,74 @@
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+from autostack.container import ContainerRegistry, DockerContainer, CONTAINER_LABEL, remove_orphans
+from autostack.container.client import OWNER_LABEL, owner_labels
+
+
+class TestContainerRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.client = MagicMock()
+        self.client.containers.run.side_effect = lambda *args, **kwargs: MagicMock(
+            status="running", exec_run=MagicMock(return_value=MagicMock(exit_code=0, output=b""))
+        )
+        patcher = patch("autostack.container.docker_container.get_docker_client", return_value=self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(ContainerRegistry.release_all)
+        self.root = Path(tempfile.gettempdir())
+
+    def test_unique_names(self):
+        """测试每个项目启动独立的容器，名称唯一"""
+        first = DockerContainer(self.root / "shop")
+        second = DockerContainer(self.root / "shop")
+        self.assertIsNot(first, second)
+        self.assertTrue(first.name.startswith("autostack_shop_"))
+        self.assertNotEqual(first.name, second.name)
+        names = [c.kwargs["name"] for c in self.client.containers.run.call_args_list]
+        self.assertEqual(names, [first.name, second.name])
+        # 不自动重启，带有清理用的标签
+        kwargs = self.client.containers.run.call_args.kwargs
+        self.assertNotIn("restart_policy", kwargs)
+        self.assertEqual(kwargs["labels"], {CONTAINER_LABEL: second.name, **owner_labels()})
+
+    def test_remove_orphans(self):
+        """测试只删除创建进程已经退出的容器"""
+        alive = MagicMock(labels=owner_labels())
+        dead = MagicMock(labels={OWNER_LABEL: owner_labels()[OWNER_LABEL].rsplit(":", 1)[0] + ":999999999"})
+        unlabeled = MagicMock(labels={})
+        self.client.containers.list.return_value = [alive, dead, unlabeled]
+        self.assertEqual(remove_orphans(CONTAINER_LABEL, client=self.client), 2)
+        self.client.containers.list.assert_called_with(all=True, filters={"label": CONTAINER_LABEL})
+        alive.remove.assert_not_called()
+        dead.remove.assert_called_once_with(force=True)
+        unlabeled.remove.assert_called_once_with(force=True)
+
+    def test_registry_keyed_by_project(self):
+        """测试多线程获取时同一项目只启动一个容器，不同项目互不影响"""
+        projects = [self.root / f"project_{i % 3}" for i in range(12)]
+        results = [None] * len(projects)
+
+        def get(i):
+            results[i] = ContainerRegistry.get(projects[i])
+
+        threads = [threading.Thread(target=get, args=(i,)) for i in range(len(projects))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len({id(container) for container in results}), 3)
+        self.assertEqual(self.client.containers.run.call_count, 3)
+        self.assertIs(results[0], results[3])
+
+        container = results[0]
+        ContainerRegistry.release(projects[0])
+        self.assertEqual(len(ContainerRegistry.projects()), 2)
+        self.assertIsNone(container._container)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+from autostack.container import DockerContainer
+
+
+class TestDockerContainer(unittest.TestCase):
+
+    def setUp(self):
+        self.container = MagicMock(status="running", id="abc")
+        self.container.exec_run.return_value = MagicMock(exit_code=0, output=b"")
+        client = MagicMock()
+        client.containers.run.return_value = self.container
+        patcher = patch("autostack.container.docker_container.get_docker_client", return_value=client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.docker = DockerContainer(Path(tempfile.gettempdir()) / "shop")
+
+    def test_execute_async(self):
+        """测试后台执行命令，通过 Future 获取输出和退出码"""
+        release = threading.Event()
+        api = self.container.client.api
+        api.exec_create.return_value = {"Id": "exec1"}
+        api.exec_start.side_effect = lambda exec_id, stream: (release.wait(1) and [b"added 1 package\r\n"])
+        api.exec_inspect.return_value = {"ExitCode": 0}
+
+        future = self.docker.execute_async("npm install --force")
+        self.assertFalse(future.done())
+        release.set()
+        result = future.result(timeout=2)
+        self.assertEqual((result.output, result.exit_code), ("added 1 package", 0))
+
+    def test_execute_command_thread_propagates_exception(self):
+        """测试后台执行的异常在 result() 时抛出"""
+        with patch.object(DockerContainer, "execute_command", side_effect=RuntimeError("boom")):
+            future = self.docker.execute_command_thread("npm run build")
+            with self.assertRaises(RuntimeError):
+                future.result(timeout=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from autostack.container import CommandLogSink
+from autostack.container.log_sink import MAX_PARTIAL_CHARS
+
+
+class TestCommandLogSink(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_digest_keeps_head_tail_and_errors(self):
+        """测试摘要保留开头、结尾和中间的错误行，完整日志写入文件"""
+        spill_path = self.test_dir / "npm_install.log"
+        with CommandLogSink(head_lines=3, tail_lines=3, spill_path=spill_path, echo_interval=60) as sink:
+            for i in range(1000):
+                sink.write(f"line {i}\r\n".encode())
+                if i == 500:
+                    sink.write(b"npm ERR! code ERESOLVE\r\n")
+        self.assertEqual(sink.total_lines, 1001)
+        self.assertEqual(len(sink.tail), 3)
+
+        digest = sink.digest().splitlines()
+        self.assertEqual(digest[:3], ["line 0", "line 1", "line 2"])
+        self.assertIn("502: npm ERR! code ERESOLVE", digest)
+        self.assertEqual(digest[-3:], ["line 997", "line 998", "line 999"])
+        self.assertEqual(len(spill_path.read_text(encoding="utf-8").splitlines()), 1001)
+
+    def test_progress_bar_and_split_chunks(self):
+        """测试 \\r 重绘的进度条只保留最后一次，多字节字符跨 chunk 时正确解码"""
+        sink = CommandLogSink(echo_interval=60)
+        sink.write(b"\x1b[32m10%\r50%\r100%\x1b[0m\n")
+        data = "完成\n".encode("utf-8")
+        sink.write(data[:2])
+        sink.write(data[2:])
+        sink.close()
+        self.assertEqual(sink.digest(), "100%\n完成")
+
+    def test_progress_without_newline_is_bounded(self):
+        """测试只有 \\r 的进度输出不会累积，\\r\\n 跨 chunk 时不丢失内容，超长的行被截断处理"""
+        sink = CommandLogSink(echo_interval=60)
+        for i in range(10000):
+            sink.write(f"\rprogress {i}".encode())
+            self.assertLess(len(sink._partial), 20)
+        sink.write(b"\r\ndone\r")
+        sink.write(b"\n")
+        sink.write(b"x" * (MAX_PARTIAL_CHARS + 1))
+        self.assertEqual(sink._partial, "")
+        sink.close()
+        self.assertEqual(sink.digest().splitlines()[:2], ["progress 9999", "done"])
+        self.assertEqual(sink.total_lines, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from autostack.container import NodeModulesCache
+
+
+def write_project(path: Path, name: str, dependencies: dict):
+    path.mkdir(parents=True)
+    (path / "package.json").write_text(json.dumps({"name": name, "dependencies": dependencies}), encoding="utf-8")
+
+
+class TestNodeModulesCache(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.cache = NodeModulesCache(self.test_dir / "cache")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_key_ignores_project_name(self):
+        """测试 key 只与依赖有关"""
+        write_project(self.test_dir / "a", "a", {"@nestjs/core": "^10.0.0"})
+        write_project(self.test_dir / "b", "b", {"@nestjs/core": "^10.0.0"})
+        write_project(self.test_dir / "c", "c", {"@nestjs/core": "^11.0.0"})
+        self.assertEqual(self.cache.key(self.test_dir / "a"), self.cache.key(self.test_dir / "b"))
+        self.assertNotEqual(self.cache.key(self.test_dir / "a"), self.cache.key(self.test_dir / "c"))
+
+    def test_save_and_restore(self):
+        """测试安装后的 node_modules 存入缓存，依赖相同的新项目复制恢复，符号链接保持不变，生成的 .prisma 不进入缓存"""
+        source = self.test_dir / "a"
+        write_project(source, "a", {"prisma": "^5.0.0"})
+        package_dir = source / "node_modules" / "prisma"
+        package_dir.mkdir(parents=True)
+        (package_dir / "index.js").write_text("module.exports = 1", encoding="utf-8")
+        (source / "node_modules" / ".bin").mkdir()
+        os.symlink("../prisma/index.js", source / "node_modules" / ".bin" / "prisma")
+        (source / "node_modules" / ".prisma" / "client").mkdir(parents=True)
+        (source / "node_modules" / ".prisma" / "client" / "index.js").write_text("a", encoding="utf-8")
+        self.assertTrue(self.cache.save(source))
+        self.assertFalse(self.cache.save(source))
+
+        target = self.test_dir / "b"
+        write_project(target, "b", {"prisma": "^5.0.0"})
+        self.assertTrue(self.cache.restore(target))
+        restored = target / "node_modules" / "prisma" / "index.js"
+        self.assertEqual(restored.read_text(encoding="utf-8"), "module.exports = 1")
+        # 不与缓存和源项目共享 inode，原地改写不会影响其他项目
+        self.assertNotEqual(restored.stat().st_ino, (package_dir / "index.js").stat().st_ino)
+        restored.write_text("changed", encoding="utf-8")
+        self.assertEqual((package_dir / "index.js").read_text(encoding="utf-8"), "module.exports = 1")
+        self.assertFalse((target / "node_modules" / ".prisma").exists())
+        self.assertEqual(os.readlink(target / "node_modules" / ".bin" / "prisma"), "../prisma/index.js")
+        # 已有 node_modules 时不覆盖
+        self.assertFalse(self.cache.restore(target))
+
+    def test_restore_hits_after_install_writes_lockfile(self):
+        """测试 npm install 在 restore 和 save 之间写入 package-lock.json 时，同一模板的新项目仍能命中缓存"""
+        source = self.test_dir / "a"
+        write_project(source, "a", {"prisma": "^5.0.0"})
+        key = self.cache.key(source)
+        self.assertFalse(self.cache.restore(source))
+        # 模拟 npm install：写入 node_modules 和锁文件
+        (source / "node_modules" / "prisma").mkdir(parents=True)
+        (source / "node_modules" / "prisma" / "index.js").write_text("module.exports = 1", encoding="utf-8")
+        (source / "package-lock.json").write_text(json.dumps({
+            "name": "a", "lockfileVersion": 3,
+            "packages": {"": {"name": "a"}, "node_modules/prisma": {"version": "5.22.0"}},
+        }), encoding="utf-8")
+        self.assertEqual(self.cache.key(source), key)
+        self.assertTrue(self.cache.save(source))
+
+        target = self.test_dir / "b"
+        write_project(target, "b", {"prisma": "^5.0.0"})
+        self.assertTrue(self.cache.restore(target))
+        self.assertTrue((target / "node_modules" / "prisma" / "index.js").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+import asyncio
+import unittest
+from unittest.mock import MagicMock
+from autostack.llm import AsyncLLM, CostLedger
+
+
+class TestAsyncLLM(unittest.TestCase):
+
+    def test_batch_completion_keeps_order_and_limits_concurrency(self):
+        """测试批量请求结果顺序与输入一致，且并发数不超过 max_concurrency"""
+        llm = AsyncLLM(api_key="test_api_key", max_concurrency=2, ledger=CostLedger())
+        state = {"active": 0, "peak": 0}
+
+        async def create(model, messages, timeout):
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+            content = messages[-1]["content"]
+            # 让靠前的请求更晚返回，验证结果仍按输入顺序排列
+            await asyncio.sleep(0.01 * (5 - int(content)))
+            state["active"] -= 1
+            return MagicMock(choices=[MagicMock(message=MagicMock(content=f"reply {content}"))])
+
+        llm.aclient = MagicMock()
+        llm.aclient.chat.completions.create = create
+
+        responses = llm.batch_completion([str(i) for i in range(5)])
+        self.assertEqual(responses, [f"reply {i}" for i in range(5)])
+        self.assertEqual(state["peak"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
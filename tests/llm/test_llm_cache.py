@@ -0,0 +1,57 @@
+import shutil
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from autostack.llm.llm_cache import LLMCache
+
+
+class TestLLMCache(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.cache = LLMCache(self.test_dir / "llm_cache.db")
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.test_dir)
+
+    def test_make_key_ignores_message_metadata(self):
+        """测试缓存键只和 model、role、content 相关"""
+        messages = [{"role": "system", "content": "sys"}, {"role": "user", "content": "hi"}]
+        with_metadata = [dict(msg, id="x", timestamp="y") for msg in messages]
+        self.assertEqual(LLMCache.make_key("gpt-4o", messages), LLMCache.make_key("gpt-4o", with_metadata))
+        self.assertNotEqual(LLMCache.make_key("gpt-4o", messages), LLMCache.make_key("gpt-4o-mini", messages))
+
+    def test_get_and_set(self):
+        """测试写入后命中，并统计命中和节省的字节数"""
+        self.assertIsNone(self.cache.get("key"))
+        self.cache.set("key", "gpt-4o", "你好")
+        self.assertEqual(self.cache.get("key"), "你好")
+
+        stats = self.cache.stats
+        self.assertEqual((stats.hits, stats.misses, stats.entries), (1, 1, 1))
+        self.assertEqual(stats.bytes_saved, len("你好".encode("utf-8")))
+
+    def test_evict_by_age(self):
+        """测试过期的缓存不会命中"""
+        self.cache.max_age_seconds = 0.01
+        self.cache.set("key", "gpt-4o", "value")
+        time.sleep(0.02)
+        self.assertIsNone(self.cache.get("key"))
+        self.cache.evict()
+        self.assertEqual(self.cache.stats.entries, 0)
+
+    def test_evict_by_size(self):
+        """测试超出容量时淘汰最久未访问的缓存"""
+        self.cache.set("old", "gpt-4o", "a" * 100)
+        self.cache.set("new", "gpt-4o", "b" * 100)
+        self.cache.get("old")
+        self.cache.max_size_bytes = self.cache.stats.size_bytes - 1
+        self.cache.evict()
+        self.assertIsNotNone(self.cache.get("old"))
+        self.assertIsNone(self.cache.get("new"))
+
+
+if __name__ == "__main__":
+    unittest.main()
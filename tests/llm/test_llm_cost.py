@@ -0,0 +1,86 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+from openai import BadRequestError
+from autostack.llm import LLM, CostManager, CostLedger, BudgetExceededError
+from autostack.llm.llm_cost import LedgerEntry
+
+
+class TestCostLedger(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.ledger = CostLedger(self.test_dir / "llm_ledger.jsonl")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_report_by_stage(self):
+        """测试按阶段汇总调用次数、token 和耗时百分位，缓存命中不计入耗时"""
+        for latency in (1.0, 2.0, 3.0, 4.0, 5.0):
+            self.ledger.record(LedgerEntry(stage="gen_prd", prompt_tokens=10, completion_tokens=5, latency=latency))
+        self.ledger.record(LedgerEntry(stage="gen_prd", cached=True, latency=0.001))
+
+        report = self.ledger.report()["gen_prd"]
+        self.assertEqual((report["calls"], report["cached"]), (6, 1))
+        self.assertEqual((report["prompt_tokens"], report["completion_tokens"]), (50, 25))
+        self.assertAlmostEqual(report["latency_p50"], 3.0)
+        self.assertAlmostEqual(report["latency_p95"], 4.8)
+        self.assertEqual(len(self.ledger.load()), 6)
+
+    def test_budget_unlimited_by_default(self):
+        """测试未配置预算时不限制花费"""
+        cost_manager = CostManager(total_cost=1000.0)
+        cost_manager.check_budget()
+
+    def test_completion_records_usage_and_checks_budget(self):
+        """测试 completion 按阶段记账，累计花费达到预算后拒绝继续调用"""
+        cost_manager = CostManager(max_budget=0.001)
+        llm = LLM(api_key="test_api_key", model="gpt-4o", cost_manager=cost_manager, ledger=self.ledger)
+        llm.client = MagicMock()
+        llm.client.chat.completions.create.return_value = MagicMock(
+            choices=[MagicMock(message=MagicMock(content="ok"))],
+            usage=MagicMock(prompt_tokens=1000, completion_tokens=100)
+        )
+
+        self.assertEqual(llm.completion("hi", stage="gen_prd"), "ok")
+        entry = self.ledger.entries[0]
+        self.assertEqual((entry.stage, entry.prompt_tokens, entry.completion_tokens), ("gen_prd", 1000, 100))
+        self.assertAlmostEqual(entry.cost, cost_manager.total_cost)
+
+        with self.assertRaises(BudgetExceededError):
+            llm.completion("hi again", stage="gen_prd")
+        self.assertEqual(llm.client.chat.completions.create.call_count, 1)
+
+    def test_ledger_without_path(self):
+        """测试未指定路径时只记录在内存中，不写文件"""
+        ledger = CostLedger()
+        ledger.record(LedgerEntry(stage="gen_prd", latency=1.0))
+        self.assertIsNone(ledger.path)
+        self.assertEqual(len(ledger.load()), 1)
+        self.assertEqual(ledger.report()["gen_prd"]["calls"], 1)
+
+    def test_stream_retries_without_stream_options(self):
+        """测试服务端拒绝 stream_options 时不带该参数重试，usage 按字符串估算"""
+        llm = LLM(api_key="test_api_key", model="gpt-4o", cost_manager=CostManager(max_budget=10), ledger=self.ledger)
+        chunk = MagicMock(usage=None, choices=[MagicMock(delta=MagicMock(content="ok"))])
+        calls = []
+
+        def create(**kwargs):
+            calls.append(kwargs)
+            if "stream_options" in kwargs:
+                raise BadRequestError("unknown parameter", response=MagicMock(status_code=400), body=None)
+            return iter([chunk])
+
+        llm.client = MagicMock()
+        llm.client.chat.completions.create.side_effect = create
+        self.assertEqual("".join(llm.completion_stream("hi", stage="gen_prd")), "ok")
+        self.assertEqual(["stream_options" in kwargs for kwargs in calls], [True, False])
+        self.assertFalse(llm.stream_usage)
+        self.assertGreater(self.ledger.entries[0].completion_tokens, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
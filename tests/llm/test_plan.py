@@ -0,0 +1,85 @@
+import unittest
+from autostack.llm import Plan, Task
+
+
+class CountingList(list):
+    """统计遍历次数和元素访问次数的列表"""
+    iterations = 0
+    items = 0
+
+    def __iter__(self):
+        self.iterations += 1
+        return super().__iter__()
+
+    def __getitem__(self, index):
+        self.items += 1
+        return super().__getitem__(index)
+
+
+class TestPlan(unittest.TestCase):
+
+    def test_add_tasks(self):
+        """测试一次添加多个任务，当前任务为第一个任务"""
+        plan = Plan(goal="test")
+        tasks = [Task(task_desc=f"task {i}") for i in range(3)]
+        plan.add_tasks(tasks)
+        self.assertEqual(len(plan.tasks), 3)
+        self.assertIs(plan.current_task, tasks[0])
+        self.assertIs(plan.get_task(tasks[2].task_id), tasks[2])
+
+    def test_finish_current_task(self):
+        """测试完成任务后当前任务后移，全部完成后为空"""
+        plan = Plan(goal="test")
+        tasks = [Task(task_desc=f"task {i}") for i in range(3)]
+        plan.add_tasks(tasks)
+        plan.finish_current_task()
+        self.assertIs(plan.current_task, tasks[1])
+        self.assertEqual(plan.get_finished_tasks(), tasks[:1])
+        self.assertEqual(plan.get_unfinished_tasks(), tasks[1:])
+        plan.finish_current_task()
+        plan.finish_current_task()
+        self.assertEqual(plan.current_task_id, "")
+        self.assertIsNone(plan.current_task)
+        self.assertEqual(plan.get_finished_tasks(), tasks)
+
+    def test_finished_out_of_order(self):
+        """测试非当前任务被标记完成时，游标跳过连续已完成的任务"""
+        plan = Plan(goal="test")
+        tasks = [Task(task_desc=f"task {i}") for i in range(3)]
+        plan.add_tasks(tasks)
+        tasks[1].is_finished = True
+        self.assertEqual(plan.get_finished_tasks(), [tasks[1]])
+        plan.finish_current_task()
+        self.assertIs(plan.current_task, tasks[2])
+
+    def test_tasks_replaced(self):
+        """测试 tasks 被整体替换或从序列化数据恢复时重建索引"""
+        tasks = [Task(task_desc=f"task {i}", is_finished=i == 0) for i in range(3)]
+        plan = Plan(**Plan(goal="test", tasks=tasks).model_dump())
+        self.assertEqual(plan.get_task(tasks[1].task_id).task_desc, "task 1")
+        self.assertEqual(len(plan.get_unfinished_tasks()), 2)
+
+        new_task = Task(task_desc="new")
+        plan.tasks = [new_task]
+        self.assertIs(plan.get_task(new_task.task_id), new_task)
+        self.assertIsNone(plan.get_task(tasks[1].task_id))
+
+    def test_large_plan(self):
+        """测试逐个完成数千个任务时，查找当前任务和完成任务都不遍历任务列表"""
+        n = 5000
+        plan = Plan(goal="benchmark")
+        plan.add_tasks([Task(task_desc=f"task {i}") for i in range(n)])
+        plan.tasks = CountingList(plan.tasks)
+        _ = plan.current_task  # tasks 被替换，重建一次索引
+        plan.tasks.iterations = plan.tasks.items = 0
+        for _ in range(n):
+            _ = plan.current_task
+            plan.finish_current_task()
+        self.assertEqual(plan.current_task_id, "")
+        self.assertEqual(plan.tasks.iterations, 0)
+        # 每完成一个任务只访问常数个元素
+        self.assertLessEqual(plan.tasks.items, 3 * n)
+
+
+if __name__ == '__main__':
+    unittest.main()
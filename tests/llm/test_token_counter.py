@@ -0,0 +1,45 @@
+import unittest
+from unittest.mock import patch
+from autostack.llm import token_counter
+from autostack.llm.token_counter import count_approximate_tokens, count_batch, count_message_tokens, get_encoding
+
+
+class TestTokenCounter(unittest.TestCase):
+
+    def test_encoding_cached(self):
+        """测试编码按模型缓存，只加载一次"""
+        get_encoding.cache_clear()
+        with patch.object(token_counter.tiktoken, "encoding_for_model") as mock_encoding_for_model:
+            get_encoding("gpt-4o")
+            get_encoding("gpt-4o")
+        mock_encoding_for_model.assert_called_once_with("gpt-4o")
+        get_encoding.cache_clear()
+
+    def test_encoding_failure_not_cached(self):
+        """测试编码加载失败时退化为近似计数，且失败不缓存，之后可以重新加载"""
+        get_encoding.cache_clear()
+        with patch.object(token_counter.tiktoken, "encoding_for_model", side_effect=OSError("offline")):
+            self.assertEqual(count_batch(["abcdef"], "gpt-4o"), [2])
+        with patch.object(token_counter.tiktoken, "encoding_for_model") as mock_encoding_for_model:
+            mock_encoding_for_model.return_value.encode.return_value = [1]
+            self.assertEqual(count_batch(["abcdef"], "gpt-4o"), [1])
+        mock_encoding_for_model.assert_called_once_with("gpt-4o")
+        get_encoding.cache_clear()
+
+    def test_approximate(self):
+        """测试近似计数：中文按字计数，其余按 3 个字符计数"""
+        self.assertEqual(count_approximate_tokens("你好"), 2)
+        self.assertEqual(count_approximate_tokens("abcdef"), 2)
+        self.assertEqual(count_batch(["你好", "abcdefg"], "gpt-4o", approximate=True), [2, 3])
+
+    def test_count_message_tokens_alias(self):
+        """测试模型别名按固定版本计算"""
+        messages = [{"role": "user", "content": "hello"}]
+        self.assertEqual(
+            count_message_tokens(messages, "gpt-4", approximate=True),
+            count_message_tokens(messages, "gpt-4-0613", approximate=True)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
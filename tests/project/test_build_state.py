@@ -0,0 +1,54 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from autostack.project.build_state import BuildState
+
+
+class TestBuildState(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.home = self.test_dir / "demo"
+        for relative, content in {
+            "package.json": '{"name": "demo"}',
+            "prisma/schema.prisma": "model User { id String @id }",
+            "src/main.ts": "bootstrap();",
+        }.items():
+            (self.home / relative).parent.mkdir(parents=True, exist_ok=True)
+            (self.home / relative).write_text(content, encoding="utf-8")
+        (self.home / "node_modules").mkdir()
+        (self.home / "dist").mkdir()
+        self.resources = self.test_dir / "resources"
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def mark_all_done(self):
+        state = BuildState(self.home, self.resources)
+        for step in ("install", "migrate", "build"):
+            state.mark_done(step)
+
+    def test_unchanged_project_needs_nothing(self):
+        """测试新项目需要全部步骤，全部完成后重新加载不需要任何步骤"""
+        self.assertEqual(BuildState(self.home, self.resources).needed_steps(), ["install", "migrate", "build"])
+        self.mark_all_done()
+        self.assertEqual(BuildState(self.home, self.resources).needed_steps(), [])
+
+    def test_changed_inputs(self):
+        """测试修改源码只需要编译，修改 schema 需要迁移和编译，缺少产物时重新执行"""
+        self.mark_all_done()
+        (self.home / "src" / "user.ts").write_text("export class User {}", encoding="utf-8")
+        self.assertEqual(BuildState(self.home, self.resources).needed_steps(), ["build"])
+
+        self.mark_all_done()
+        (self.home / "prisma" / "schema.prisma").write_text("model Book { id String @id }", encoding="utf-8")
+        self.assertEqual(BuildState(self.home, self.resources).needed_steps(), ["migrate", "build"])
+
+        self.mark_all_done()
+        shutil.rmtree(self.home / "node_modules")
+        self.assertEqual(BuildState(self.home, self.resources).needed_steps(), ["install"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from autostack.project.index_inference import IndexInference
+from autostack.utils import FileUtil, PrismaParser
+
+SCHEMA = '''model User {
+  id        String   @id @default(uuid())
+  email     String
+  username  String   @unique
+  status    String
+  createdAt DateTime @default(now())
+  posts     Post[]
+}
+
+enum PostState {
+  DRAFT
+  PUBLISHED
+}
+
+model Post {
+  id        String    @id @default(uuid())
+  state     PostState @default(DRAFT)
+  author    User      @relation(fields: [authorId], references: [id])
+  authorId  String
+  updatedAt DateTime  @updatedAt
+
+  @@index([authorId, updatedAt])
+}
+'''
+
+
+class TestIndexInference(unittest.TestCase):
+
+    def test_infer(self):
+        """测试按外键、查找、枚举、状态和时间字段推断索引，只添加 @@index，已有索引覆盖的字段不再添加"""
+        indexes = IndexInference.infer(PrismaParser.parse(SCHEMA))
+        statements = [(index.model, index.statement) for index in indexes]
+        self.assertEqual(statements, [
+            ("User", "@@index([email])"),
+            ("User", "@@index([status])"),
+            ("User", "@@index([createdAt])"),
+            ("Post", "@@index([state])"),
+            ("Post", "@@index([updatedAt])"),
+        ])
+        self.assertTrue(all(index.reason for index in indexes))
+        self.assertFalse(any("@@unique" in index.statement for index in indexes))
+
+    def test_apply(self):
+        """测试索引写入对应 model，写入后的 schema 可以再次解析且不再推断出新的索引"""
+        content, indexes = IndexInference.apply(SCHEMA)
+        self.assertEqual(len(indexes), 5)
+        schema = PrismaParser.parse(content)
+        post = schema.get_model("Post")
+        self.assertIn("[state]", [attribute.args for attribute in post.attributes])
+        self.assertEqual(IndexInference.infer(schema), [])
+        self.assertEqual(IndexInference.apply(content), (content, []))
+
+    def test_apply_file(self):
+        """测试解析失败时不修改文件"""
+        test_dir = Path(tempfile.mkdtemp())
+        try:
+            schema_path = test_dir / "schema.prisma"
+            FileUtil.write_file(schema_path, "view UserInfo {\n  id String\n}\n")
+            self.assertEqual(IndexInference.apply_file(schema_path), [])
+            self.assertEqual(FileUtil.read_file(schema_path), "view UserInfo {\n  id String\n}\n")
+
+            FileUtil.write_file(schema_path, SCHEMA)
+            self.assertEqual(len(IndexInference.apply_file(schema_path)), 5)
+            self.assertIn("@@index([createdAt])", FileUtil.read_file(schema_path))
+        finally:
+            shutil.rmtree(test_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import threading
+import time
+import unittest
+from autostack.project.pipeline import Pipeline
+
+
+class TestPipeline(unittest.TestCase):
+
+    def test_independent_stages_run_concurrently(self):
+        """测试没有依赖关系的阶段并发执行，结果按依赖传递，关键路径为最长的依赖链"""
+        barrier = threading.Barrier(2, timeout=2)
+        d_done = threading.Event()
+
+        def a(results):
+            # a 和 b 必须同时在执行才能通过
+            barrier.wait()
+            return "a"
+
+        def b(results):
+            barrier.wait()
+            # a 完成后 d 才能开始，d 完成前 b 不结束：b 与 a、d 都重叠，且是最长的阶段
+            self.assertTrue(d_done.wait(timeout=2))
+            time.sleep(0.05)
+            return "b"
+
+        def d(results):
+            d_done.set()
+            return "d"
+
+        pipeline = (
+            Pipeline("test")
+            .add("a", a)
+            .add("b", b)
+            .add("c", lambda results: results["a"] + results["b"], ["a", "b"])
+            .add("d", d, ["a"])
+        )
+        results = pipeline.run()
+        self.assertEqual(results["c"], "ab")
+        self.assertGreaterEqual(pipeline.timings["d"].start, pipeline.timings["a"].end)
+        self.assertLess(pipeline.timings["d"].end, pipeline.timings["b"].end)
+
+        path, total = pipeline.critical_path()
+        self.assertEqual(path, ["b", "c"])
+
+    def test_failure_stops_dependents(self):
+        """测试阶段失败时依赖它的阶段不再执行，并抛出原异常"""
+        called = []
+
+        def fail(results):
+            raise RuntimeError("boom")
+
+        pipeline = Pipeline().add("a", fail).add("b", lambda results: called.append("b"), ["a"])
+        with self.assertRaises(RuntimeError):
+            pipeline.run()
+        self.assertEqual(called, [])
+
+    def test_invalid_graph(self):
+        """测试依赖不存在或存在环时报错"""
+        with self.assertRaises(ValueError):
+            Pipeline().add("a", print, ["missing"]).run()
+        with self.assertRaises(ValueError):
+            Pipeline().add("a", print, ["b"]).add("b", print, ["a"]).run()
+
+
+if __name__ == "__main__":
+    unittest.main()
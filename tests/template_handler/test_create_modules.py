@@ -0,0 +1,93 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from autostack.template_handler import NestTemplateHandler
+from autostack.utils import FileUtil
+
+
+def get_module_info(name):
+    return {
+        "name": name,
+        "entity": {
+            "name": name,
+            "description": f"{name} 实体",
+            "attributes": [{"name": "id", "type": "String", "required": True, "comment": "ID"}]
+        }
+    }
+
+
+class TestCreateModules(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.project_path = self.test_dir / "demo_project"
+        NestTemplateHandler.create_project(self.project_path, {
+            "project_name": "测试项目",
+            "project_name_by_snake": "demo_project",
+            "project_description": "测试"
+        })
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_create_modules(self):
+        """测试批量创建模块，app.module.ts 中按顺序导入全部模块"""
+        names = ["UserInfo", "Order", "Book"]
+        timings = NestTemplateHandler.create_modules(self.project_path, [get_module_info(name) for name in names])
+        self.assertEqual(set(timings), {"load_templates", "render_and_write", "patch_app_module"})
+
+        for name in ["user_info", "order", "book"]:
+            self.assertTrue((self.project_path / "src" / name / f"{name}.service.ts").exists())
+            self.assertTrue((self.project_path / "src" / name / "dto" / f"create-{name}.dto.ts").exists())
+
+        app_module = FileUtil.read_file(self.project_path / "src" / "app.module.ts")
+        self.assertIn("import { UserInfoModule } from './user_info/user_info.module';", app_module)
+        positions = [app_module.index(f"    {name}Module,") for name in names]
+        self.assertEqual(positions, sorted(positions))
+
+    def test_pagination(self):
+        """测试生成的 service 和 controller 使用分页查询和 count 接口，分页 DTO 随项目骨架生成"""
+        NestTemplateHandler.create_modules(self.project_path, [get_module_info("Order")])
+        self.assertTrue((self.project_path / "src" / "common" / "dto" / "pagination.dto.ts").exists())
+        service = FileUtil.read_file(self.project_path / "src" / "order" / "order.service.ts")
+        self.assertIn("this.prisma.order.findMany(args)", service)
+        self.assertIn("this.prisma.order.count()", service)
+        controller = FileUtil.read_file(self.project_path / "src" / "order" / "order.controller.ts")
+        self.assertIn("findAll(@Query() query: PaginationQueryDto)", controller)
+        self.assertLess(controller.index("@Get('count')"), controller.index("@Get(':id')"))
+
+    def test_cache_ttl(self):
+        """测试按模块的 cache_ttl 生成缓存配置，未设置时不缓存"""
+        cached = dict(get_module_info("Order"), cache_ttl=30)
+        NestTemplateHandler.create_modules(self.project_path, [cached, get_module_info("Book")])
+        self.assertTrue((self.project_path / "src" / "common" / "cache" / "lru-cache.ts").exists())
+        service = FileUtil.read_file(self.project_path / "src" / "order" / "order.service.ts")
+        self.assertIn("new LruCache<any>({ ttl: 30000 })", service)
+        self.assertEqual(service.count("this.cache.clear();"), 3)
+        service = FileUtil.read_file(self.project_path / "src" / "book" / "book.service.ts")
+        self.assertIn("new LruCache<any>({ ttl: 0 })", service)
+
+    def test_database_env(self):
+        """测试连接池配置写入 .env，DATABASE_URL 引用这些配置"""
+        env = FileUtil.read_file(self.project_path / ".env")
+        self.assertIn("DB_CONNECTION_LIMIT=10\n", env)
+        self.assertIn("&connection_limit=${DB_CONNECTION_LIMIT}&pool_timeout=${DB_POOL_TIMEOUT}", env)
+        self.assertIn("DB_STATEMENT_TIMEOUT=60000\n", env)
+        self.assertIn("&options=-c%20statement_timeout%3D${DB_STATEMENT_TIMEOUT}", env)
+        self.assertNotIn("socket_timeout", env)
+
+        project_path = self.test_dir / "pool_project"
+        NestTemplateHandler.create_project(project_path, {
+            "project_name": "测试项目",
+            "project_name_by_snake": "pool_project",
+            "database": {"connection_limit": 3, "transaction_timeout": 10000}
+        })
+        env = FileUtil.read_file(project_path / ".env")
+        self.assertIn("DB_CONNECTION_LIMIT=3\n", env)
+        self.assertIn("DB_TRANSACTION_TIMEOUT=10000\n", env)
+        self.assertIn("DB_POOL_TIMEOUT=10\n", env)
+
+
+if __name__ == "__main__":
+    unittest.main()
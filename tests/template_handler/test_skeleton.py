@@ -0,0 +1,52 @@
+import io
+import json
+import shutil
+import tarfile
+import tempfile
+import unittest
+from pathlib import Path
+from autostack.template_handler.nest_template_handler import BACKEND_TEMPLATE_DIR_PATH
+from autostack.template_handler import SkeletonManifest
+
+CONTEXT = {"project_name": "demo_project", "project_description": "测试"}
+
+
+class TestSkeletonManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.manifest = SkeletonManifest.get(BACKEND_TEMPLATE_DIR_PATH)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_manifest_excludes_templates(self):
+        """测试清单中不包含 .env、模块模板和 .templ 文件"""
+        self.assertIn("src/main.ts", self.manifest.files)
+        self.assertIn("src/app.module.ts", self.manifest.files)
+        for file in self.manifest.files:
+            self.assertFalse(file == ".env" or file.startswith("src/demo/") or file.endswith(".templ"), file)
+        self.assertEqual(self.manifest.renders, {"package.json.templ": "package.json"})
+        self.assertIs(SkeletonManifest.get(BACKEND_TEMPLATE_DIR_PATH), self.manifest)
+
+    def test_materialize(self):
+        """测试生成的项目骨架与清单一致，package.json 已渲染"""
+        self.manifest.materialize(self.test_dir, CONTEXT)
+        generated = sorted(path.relative_to(self.test_dir).as_posix()
+                           for path in self.test_dir.rglob("*") if path.is_file())
+        self.assertEqual(generated, sorted(self.manifest.files + ["package.json"]))
+        package = json.loads((self.test_dir / "package.json").read_text(encoding="utf-8"))
+        self.assertEqual(package["name"], "demo_project")
+
+    def test_to_tar(self):
+        """测试导出的 tar 包包含渲染后的文件和额外文件"""
+        data = self.manifest.to_tar(CONTEXT, extra_files={".env": "DB_HOST=localhost\n"})
+        with tarfile.open(fileobj=io.BytesIO(data)) as tar:
+            names = tar.getnames()
+            self.assertEqual(tar.extractfile(".env").read(), b"DB_HOST=localhost\n")
+        self.assertIn("package.json", names)
+        self.assertIn("src/main.ts", names)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+from autostack.utils.prisma_parser import PrismaParser, PrismaParseError
+
+SCHEMA = '''
+// schema.prisma
+datasource db {
+  provider = "postgresql" // 数据库
+  url      = env("DATABASE_URL")
+}
+
+generator client {
+  provider = "prisma-client-js"
+}
+
+/// 用户角色
+enum Role {
+  ADMIN
+  USER // 普通用户
+}
+
+/// 用户表
+model User {
+  id        String   @id @default(uuid()) // 用户ID
+  /// 邮箱
+  email     String   @unique
+  name      String?
+  role      Role     @default(USER)
+  tags      String[]
+  url       String   @default("http://example.com") // 个人主页
+  posts     Post[]
+  createdAt DateTime @default(now())
+}
+
+model Post {
+  id       Int    @id @default(autoincrement())
+  title    String @db.VarChar(200)
+  author   User   @relation(fields: [authorId], references: [id], onDelete: Cascade)
+  authorId String
+
+  @@index([authorId])
+  @@unique([title, authorId])
+}
+'''
+
+
+class TestPrismaParser(unittest.TestCase):
+
+    def test_parse(self):
+        """测试解析 model、enum、字段属性、块属性和注释"""
+        schema = PrismaParser.parse(SCHEMA)
+        self.assertEqual([model.name for model in schema.models], ["User", "Post"])
+        self.assertEqual(schema.get_enum("Role").values, ("ADMIN", "USER"))
+        self.assertEqual(schema.get_enum("Role").comment, "用户角色")
+
+        user = schema.get_model("User")
+        self.assertEqual(user.comment, "用户表")
+        fields = {field.name: field for field in user.fields}
+        self.assertEqual(fields["id"].comment, "用户ID")
+        self.assertEqual(fields["id"].get_attribute("default").args, "uuid()")
+        self.assertEqual(fields["email"].comment, "邮箱")
+        self.assertTrue(fields["name"].optional)
+        self.assertTrue(fields["tags"].is_list)
+        self.assertEqual(fields["url"].get_attribute("default").args, '"http://example.com"')
+        self.assertEqual(fields["url"].comment, "个人主页")
+        self.assertTrue(schema.is_relation(fields["posts"]))
+
+        post = schema.get_model("Post")
+        author = next(field for field in post.fields if field.name == "author")
+        self.assertEqual(author.get_attribute("relation").args,
+                         "fields: [authorId], references: [id], onDelete: Cascade")
+        self.assertEqual([(a.name, a.args) for a in post.attributes],
+                         [("index", "[authorId]"), ("unique", "[title, authorId]")])
+
+    def test_to_entities(self):
+        """测试转换为 entity_list.json 的格式"""
+        entities = PrismaParser.to_entities(SCHEMA)
+        user = entities[0]
+        self.assertEqual((user["name"], user["description"]), ("User", "用户表"))
+        attributes = {attribute["name"]: attribute for attribute in user["attributes"]}
+        self.assertEqual(attributes["id"], {"name": "id", "type": "String", "required": True, "comment": "用户ID"})
+        self.assertFalse(attributes["name"]["required"])
+        self.assertEqual(attributes["name"]["comment"], "name")
+        self.assertEqual(attributes["tags"]["type"], "StringArray")
+        self.assertEqual(attributes["role"]["type"], "String")
+        self.assertIn("ADMIN, USER", attributes["role"]["comment"])
+        self.assertEqual(attributes["posts"]["type"], "Post")
+        self.assertEqual(entities[1]["description"], "Post")
+
+    def test_parse_error(self):
+        """测试不支持或不合法的内容抛出 PrismaParseError"""
+        cases = [
+            "view UserInfo {\n  id String\n}",
+            "model User {\n  id String @id\n",
+            "model User {\n  id Strin\n}",
+            "model User {\n  id String @default(uuid()\n}",
+            "model User {\n  tags String[]?\n}",
+            "model User {\n  id Unsupported(\"point\")\n}",
+            "not a block",
+        ]
+        for content in cases:
+            with self.assertRaises(PrismaParseError, msg=content):
+                PrismaParser.parse(content)
+
+
+if __name__ == '__main__':
+    unittest.main()
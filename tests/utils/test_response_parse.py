@@ -0,0 +1,41 @@
+import unittest
+from autostack.utils.response_parse import BoltArtifactStreamParser, parse_bolt_artifacts
+
+CONTENT = """
+好的，下面创建文件并构建项目：
+<boltArtifact id="user-module" title="User Module">
+  <boltAction type="file" filePath="/app/src/user/user.service.ts">
+  export const limit = 1 < 2;
+  </boltAction>
+  <boltAction type="shell" shellPath="/app">
+  npm run build
+  </boltAction>
+</boltArtifact>
+<boltArtifact id="readme" title="Readme">
+  <boltAction type="file" filePath="/app/README.md">hello</boltAction>
+</boltArtifact>
+"""
+
+
+class TestBoltArtifactStreamParser(unittest.TestCase):
+
+    def test_same_result_as_parse_bolt_artifacts(self):
+        """测试任意切分的流式输入与一次性解析结果一致"""
+        for chunk_size in (1, 5, 17, len(CONTENT)):
+            parser = BoltArtifactStreamParser()
+            actions = []
+            for i in range(0, len(CONTENT), chunk_size):
+                actions.extend(parser.feed(CONTENT[i:i + chunk_size]))
+            self.assertEqual(parser.close(), parse_bolt_artifacts(CONTENT))
+            self.assertEqual([action["type"] for action in actions], ["file", "shell", "file"])
+
+    def test_action_emitted_when_closed(self):
+        """测试 boltAction 闭合时立即返回，不必等待 boltArtifact 结束"""
+        parser = BoltArtifactStreamParser()
+        self.assertEqual(parser.feed('<boltArtifact id="a" title="A"><boltAction type="shell" shellPath="/app">ls'), [])
+        actions = parser.feed("</boltAction>")
+        self.assertEqual(actions, [{"type": "shell", "shellpath": "/app", "content": "ls"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from autostack.utils import TemplateRegistry, FileUtil
+
+
+class TestTemplateRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.template_file = self.test_dir / "hello.templ"
+        FileUtil.write_file(self.template_file, "Hello, ${name}!")
+        TemplateRegistry.clear()
+
+    def tearDown(self):
+        TemplateRegistry.clear()
+        shutil.rmtree(self.test_dir)
+
+    def test_get_cached(self):
+        """测试模板只加载一次，之后命中缓存"""
+        first = TemplateRegistry.get(self.template_file)
+        second = FileUtil.get_template(self.template_file)
+        self.assertIs(first, second)
+        stats = TemplateRegistry.stats()[os.path.abspath(self.template_file)]
+        self.assertEqual(stats, {"hits": 1, "loads": 1})
+
+    def test_reload_when_modified(self):
+        """测试模板文件修改后重新加载"""
+        TemplateRegistry.get(self.template_file)
+        FileUtil.write_file(self.template_file, "Bye, ${name}!")
+        stat = os.stat(self.template_file)
+        os.utime(self.template_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        self.assertEqual(TemplateRegistry.get(self.template_file).substitute(name="World"), "Bye, World!")
+
+    def test_preload(self):
+        """测试预加载目录下的模板"""
+        FileUtil.write_file(self.test_dir / "sub" / "a.prompt", "${a}")
+        FileUtil.write_file(self.test_dir / "ignored.txt", "${a}")
+        self.assertEqual(TemplateRegistry.preload([self.test_dir]), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()